@@ -139,6 +139,12 @@ options:
       - The list of blue print packages to run on the server after its created.
     default: []
     required: False
+  parallelism:
+    description:
+      - The maximum number of server create requests submitted concurrently when C(count) is greater than one.
+    default: 4
+    required: False
+    version_added: "2.1"
   password:
     description:
       - Password for the administrator / root user
@@ -461,6 +467,8 @@ servers:
 
 __version__ = '${version}'
 
+import Queue
+import threading
 from time import sleep
 from distutils.version import LooseVersion
 
@@ -618,6 +626,7 @@ class ClcServer:
             alert_policy_id=dict(default=None),
             alert_policy_name=dict(default=None),
             packages=dict(type='list', default=[]),
+            parallelism=dict(type='int', default=4),
             state=dict(
                 default='present',
                 choices=[
@@ -1012,17 +1021,49 @@ class ClcServer:
 
         if not changed:
             return server_dict_array, created_server_ids, partial_created_servers_ids, changed
-        for i in range(0, count):
-            if not module.check_mode:
-                req = self._create_clc_server(clc=clc,
-                                              module=module,
-                                              server_params=params)
-                server = req.requests[0].Server()
-                request_list.append(req)
-                servers.append(server)
+        if not module.check_mode:
+            # Submit all create requests first, then look up their servers
+            submissions = ClcServer._run_in_pool(
+                lambda i: ClcServer._create_clc_server(clc=clc,
+                                                       server_params=params),
+                range(0, count),
+                p.get('parallelism'))
+
+            server_uuids = []
+            failures = []
+            for res, ex in submissions:
+                if ex is not None:
+                    failures.append(ex)
+                    continue
+                request_list.append(clc.v2.Requests(res))
+                # Find the server's UUID from the API response
+                server_uuids.append([obj['id']
+                                     for obj in res['links'] if obj['rel'] == 'self'][0])
+
+            if failures:
+                # The successful submissions still create their servers
+                partial_ids = []
+                if server_uuids:
+                    partial_ids = [server.id for server in self._find_servers_by_uuid_w_retry(
+                        clc,
+                        module,
+                        server_uuids,
+                        params.get('alias'))]
+                return module.fail_json(
+                    msg='Unable to create the server: {0}. {1}'.format(
+                        params.get('name'),
+                        getattr(failures[0], 'response_text', str(failures[0]))),
+                    server_ids=partial_ids,
+                    partially_created_server_ids=partial_ids)
+
+            servers = self._find_servers_by_uuid_w_retry(
+                clc,
+                module,
+                server_uuids,
+                params.get('alias'))
 
         self._wait_for_requests(module, request_list)
-        self._refresh_servers(module, servers)
+        self._refresh_servers(clc, module, servers)
 
         ip_failed_servers = self._add_public_ip_to_servers(
             module=module,
@@ -1034,12 +1075,13 @@ class ClcServer:
                                                               module=module,
                                                               servers=servers)
 
+        # reload server details
+        self._refresh_servers(clc, module, servers)
+
         for server in servers:
             if server in ip_failed_servers or server in ap_failed_servers:
                 partial_created_servers_ids.append(server.id)
             else:
-                # reload server details
-                server = clc.v2.Server(server.id)
                 server.data['ipaddress'] = server.details[
                     'ipAddresses'][0]['internal']
 
@@ -1117,20 +1159,78 @@ class ClcServer:
                     msg='Unable to process server request')
 
     @staticmethod
-    def _refresh_servers(module, servers):
+    def _refresh_servers(clc, module, servers):
         """
-        Loop through a list of servers and refresh them.
+        Refresh a list of servers, fetching the detailed server list of each of
+        their groups once. Servers missing from their group's list are refreshed
+        one by one.
+        :param clc: the clc-sdk instance to use
         :param module: the AnsibleModule object
         :param servers: list of clc-sdk.Server instances to refresh
         :return: none
         """
+        servers_by_group = {}
         for server in servers:
-            try:
-                server.Refresh()
-            except CLCException as ex:
-                module.fail_json(msg='Unable to refresh the server {0}. {1}'.format(
-                    server.id, ex.message
-                ))
+            key = (server.alias, server.data.get('groupId'))
+            servers_by_group.setdefault(key, []).append(server)
+
+        for (alias, group_id), group_servers in servers_by_group.items():
+            server_objs = {}
+            if group_id:
+                try:
+                    group_obj = clc.v2.API.Call(
+                        method='GET',
+                        url='groups/%s/%s?serverDetail=detailed' % (alias, group_id))
+                    for server_obj in group_obj.get('servers') or []:
+                        server_objs[server_obj['id'].lower()] = server_obj
+                except APIFailedResponse:
+                    pass
+
+            for server in group_servers:
+                server_obj = server_objs.get(server.id.lower())
+                if server_obj is not None:
+                    server.data = server_obj
+                    continue
+                try:
+                    server.Refresh()
+                except CLCException as ex:
+                    module.fail_json(msg='Unable to refresh the server {0}. {1}'.format(
+                        server.id, ex.message
+                    ))
+
+    @staticmethod
+    def _run_in_pool(func, items, parallelism):
+        """
+        Call func for each item using at most parallelism threads
+        :param func: the function to call with a single item
+        :param items: the list of items
+        :param parallelism: the maximum number of concurrent calls
+        :return: a list of (result, exception) tuples in the order of items
+        """
+        results = [None] * len(items)
+        work = Queue.Queue()
+        for i, item in enumerate(items):
+            work.put((i, item))
+
+        def worker():
+            while True:
+                try:
+                    i, item = work.get_nowait()
+                except Queue.Empty:
+                    return
+                try:
+                    results[i] = (func(item), None)
+                except Exception as ex:
+                    results[i] = (None, ex)
+
+        threads = [threading.Thread(target=worker)
+                   for _ in range(max(1, min(parallelism or 1, len(items))))]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
 
     @staticmethod
     def _add_public_ip_to_servers(
@@ -1304,7 +1404,7 @@ class ClcServer:
                 changed = True
 
         ClcServer._wait_for_requests(module, request_list)
-        ClcServer._refresh_servers(module, changed_servers)
+        ClcServer._refresh_servers(clc, module, changed_servers)
 
         for server in set(changed_servers + servers):
             try:
@@ -1429,70 +1529,45 @@ class ClcServer:
     @staticmethod
     def _create_clc_server(
             clc,
-            module,
             server_params):
         """
-        Call the CLC Rest API to Create a Server
+        Call the CLC Rest API to Create a Server. This does not call
+        fail_json, so it is safe to use from a worker thread.
         :param clc: the clc-python-sdk instance to use
-        :param module: the AnsibleModule instance to use
         :param server_params: a dictionary of params to use to create the servers
-        :return: clc-sdk.Request object linked to the queued server request
-        """
-
-        try:
-            res = clc.v2.API.Call(
-                method='POST',
-                url='servers/%s' %
-                (server_params.get('alias')),
-                payload=json.dumps(
-                    {
-                        'name': server_params.get('name'),
-                        'description': server_params.get('description'),
-                        'groupId': server_params.get('group_id'),
-                        'sourceServerId': server_params.get('template'),
-                        'isManagedOS': server_params.get('managed_os'),
-                        'primaryDNS': server_params.get('primary_dns'),
-                        'secondaryDNS': server_params.get('secondary_dns'),
-                        'networkId': server_params.get('network_id'),
-                        'ipAddress': server_params.get('ip_address'),
-                        'password': server_params.get('password'),
-                        'sourceServerPassword': server_params.get('source_server_password'),
-                        'cpu': server_params.get('cpu'),
-                        'cpuAutoscalePolicyId': server_params.get('cpu_autoscale_policy_id'),
-                        'memoryGB': server_params.get('memory'),
-                        'type': server_params.get('type'),
-                        'storageType': server_params.get('storage_type'),
-                        'antiAffinityPolicyId': server_params.get('anti_affinity_policy_id'),
-                        'customFields': server_params.get('custom_fields'),
-                        'additionalDisks': server_params.get('additional_disks'),
-                        'ttl': server_params.get('ttl'),
-                        'packages': server_params.get('packages'),
-                        'configurationId': server_params.get('configuration_id'),
-                        'osType': server_params.get('os_type')}))
-
-            result = clc.v2.Requests(res)
-        except APIFailedResponse as ex:
-            return module.fail_json(msg='Unable to create the server: {0}. {1}'.format(
-                server_params.get('name'),
-                ex.response_text
-            ))
-
-        #
-        # Patch the Request object so that it returns a valid server
-
-        # Find the server's UUID from the API response
-        server_uuid = [obj['id']
-                       for obj in res['links'] if obj['rel'] == 'self'][0]
-
-        # Change the request server method to a _find_server_by_uuid closure so
-        # that it will work
-        result.requests[0].Server = lambda: ClcServer._find_server_by_uuid_w_retry(
-            clc,
-            module,
-            server_uuid,
-            server_params.get('alias'))
-
-        return result
+        :return: the API response of the queued server request
+        :raises APIFailedResponse: if the API rejects the request
+        """
+
+        return clc.v2.API.Call(
+            method='POST',
+            url='servers/%s' %
+            (server_params.get('alias')),
+            payload=json.dumps(
+                {
+                    'name': server_params.get('name'),
+                    'description': server_params.get('description'),
+                    'groupId': server_params.get('group_id'),
+                    'sourceServerId': server_params.get('template'),
+                    'isManagedOS': server_params.get('managed_os'),
+                    'primaryDNS': server_params.get('primary_dns'),
+                    'secondaryDNS': server_params.get('secondary_dns'),
+                    'networkId': server_params.get('network_id'),
+                    'ipAddress': server_params.get('ip_address'),
+                    'password': server_params.get('password'),
+                    'sourceServerPassword': server_params.get('source_server_password'),
+                    'cpu': server_params.get('cpu'),
+                    'cpuAutoscalePolicyId': server_params.get('cpu_autoscale_policy_id'),
+                    'memoryGB': server_params.get('memory'),
+                    'type': server_params.get('type'),
+                    'storageType': server_params.get('storage_type'),
+                    'antiAffinityPolicyId': server_params.get('anti_affinity_policy_id'),
+                    'customFields': server_params.get('custom_fields'),
+                    'additionalDisks': server_params.get('additional_disks'),
+                    'ttl': server_params.get('ttl'),
+                    'packages': server_params.get('packages'),
+                    'configurationId': server_params.get('configuration_id'),
+                    'osType': server_params.get('os_type')}))
 
     @staticmethod
     def _get_anti_affinity_policy_id(clc, module, alias, aa_policy_name):
@@ -1520,50 +1595,55 @@ class ClcServer:
                         msg='multiple anti affinity policies were found with policy name : %s' % aa_policy_name)
         return aa_policy_id
 
-    #
-    #  This is the function that gets patched to the Request.server object using a lamda closure
-    #
-
     @staticmethod
-    def _find_server_by_uuid_w_retry(
-            clc, module, svr_uuid, alias=None, retries=5, back_out=2):
+    def _find_servers_by_uuid_w_retry(
+            clc, module, svr_uuids, alias=None, retries=5, back_out=2):
         """
-        Find the clc server by the UUID returned from the provisioning request.  Retry the request if a 404 is returned.
+        Find the clc servers by the UUIDs returned from the provisioning requests.  All UUIDs
+        not found yet are retried together if a 404 is returned.
         :param clc: the clc-sdk instance to use
         :param module: the AnsibleModule object
-        :param svr_uuid: UUID of the server
+        :param svr_uuids: list of server UUIDs
         :param retries: the number of retry attempts to make prior to fail. default is 5
         :param alias: the Account Alias to search
-        :return: a clc-sdk.Server instance
+        :return: a list of clc-sdk.Server instances in the order of svr_uuids
         """
         if not alias:
             alias = clc.v2.Account.GetAlias()
 
-        # Wait and retry if the api returns a 404
+        servers = {}
+        pending = list(svr_uuids)
+
+        # Wait and retry the servers the api returns a 404 for
         while True:
             retries -= 1
-            try:
-                server_obj = clc.v2.API.Call(
-                    method='GET', url='servers/%s/%s?uuid=true' %
-                    (alias, svr_uuid))
-                server_id = server_obj['id']
-                server = clc.v2.Server(
-                    id=server_id,
-                    alias=alias,
-                    server_obj=server_obj)
-                return server
-
-            except APIFailedResponse as e:
-                if e.response_status_code != 404:
-                    return module.fail_json(
-                        msg='A failure response was received from CLC API when '
-                        'attempting to get details for a server:  UUID=%s, Code=%i, Message=%s' %
-                        (svr_uuid, e.response_status_code, e.message))
-                if retries == 0:
-                    return module.fail_json(
-                        msg='Unable to reach the CLC API after 5 attempts')
-                sleep(back_out)
-                back_out *= 2
+            not_found = []
+            for svr_uuid in pending:
+                try:
+                    server_obj = clc.v2.API.Call(
+                        method='GET', url='servers/%s/%s?uuid=true' %
+                        (alias, svr_uuid))
+                    servers[svr_uuid] = clc.v2.Server(
+                        id=server_obj['id'],
+                        alias=alias,
+                        server_obj=server_obj)
+
+                except APIFailedResponse as e:
+                    if e.response_status_code != 404:
+                        return module.fail_json(
+                            msg='A failure response was received from CLC API when '
+                            'attempting to get details for a server:  UUID=%s, Code=%i, Message=%s' %
+                            (svr_uuid, e.response_status_code, e.message))
+                    not_found.append(svr_uuid)
+
+            pending = not_found
+            if not pending:
+                return [servers[svr_uuid] for svr_uuid in svr_uuids]
+            if retries == 0:
+                return module.fail_json(
+                    msg='Unable to reach the CLC API after 5 attempts')
+            sleep(back_out)
+            back_out *= 2
 
     @staticmethod
     def _set_user_agent(clc):
@@ -105,11 +105,36 @@ options:
       - If not set, default zone is used.
     required: false
     default: null
+  rules:
+    description:
+      - List of firewall rules to apply in one task, each a dictionary of C(cidr), C(protocol), C(start_port) (alias C(port)), C(end_port), C(icmp_type) and C(icmp_code).
+      - C(cidr) and C(protocol) default to the module options of the same name.
+      - All create or delete jobs are submitted first and then polled together.
+      - Mutually exclusive with C(start_port), C(end_port), C(icmp_type) and C(icmp_code).
+    required: false
+    default: null
+    version_added: "2.1"
+  purge_rules:
+    description:
+      - Remove all firewall rules of the C(ip_address) or C(network) not listed in C(rules).
+      - Considered if C(rules) is set and C(state=present).
+      - Firewall rules opened by M(cs_portforward) with C(open_firewall) are purged as well unless listed.
+    required: false
+    default: false
+    version_added: "2.1"
   poll_async:
     description:
       - Poll async jobs until job has finished.
     required: false
     default: true
+  poll_timeout:
+    description:
+      - Seconds to wait for the async jobs of C(rules) to finish if C(poll_async) is set.
+      - Rules whose jobs are still pending then are reported as failed.
+      - C(0) waits without a limit.
+    required: false
+    default: 600
+    version_added: "2.1"
 extends_documentation_fragment: cloudstack
 '''
 
@@ -154,6 +179,29 @@ EXAMPLES = '''
     type: egress
     port: 80
     cidr: 10.101.1.20
+
+# Allow inbound HTTP, HTTPS and a port range from a network in one task
+- local_action:
+    module: cs_firewall
+    ip_address: 4.3.2.1
+    cidr: 10.0.0.0/8
+    rules:
+    - port: 80
+    - port: 443
+    - start_port: 8000
+      end_port: 8080
+      protocol: udp
+
+# Ensure only SSH and ICMP echo are allowed inbound, remove all other rules
+- local_action:
+    module: cs_firewall
+    ip_address: 4.3.2.1
+    purge_rules: yes
+    rules:
+    - port: 22
+    - protocol: icmp
+      icmp_type: 8
+      icmp_code: 0
 '''
 
 RETURN = '''
@@ -208,8 +256,20 @@ network:
   returned: success
   type: string
   sample: my_network
+rules:
+  description: Per rule results if C(rules) is set, with the rule options, C(id) and C(changed).
+  returned: success
+  type: list
+  sample: [ { "cidr": "0.0.0.0/0", "protocol": "tcp", "start_port": 80, "end_port": 80, "icmp_type": null, "icmp_code": null, "id": "04589590-ac63-4ffc-93f5-b698b8ac38b6", "changed": true } ]
+purged_rules:
+  description: Rules removed because they are not listed in C(rules), if C(purge_rules=true).
+  returned: success
+  type: list
+  sample: [ { "cidr": "0.0.0.0/0", "protocol": "tcp", "start_port": 8080, "end_port": 8080, "icmp_type": null, "icmp_code": null, "id": "c2b3a1e4-ac63-4ffc-93f5-b698b8ac38b6" } ]
 '''
 
+import time
+
 try:
     from cs import CloudStack, CloudStackException, read_config
     has_lib_cs = True
@@ -220,6 +280,66 @@ except ImportError:
 from ansible.module_utils.cloudstack import *
 
 
+# Options a single firewall rule is made of, may be set per item in rules.
+RULE_OPTIONS = ['cidr', 'protocol', 'start_port', 'end_port', 'icmp_type', 'icmp_code']
+
+PROTOCOLS = ['tcp', 'udp', 'icmp', 'all']
+
+# Seconds between polls of pending async jobs, growing from min to max.
+CS_POLL_INTERVAL = (0.5, 5)
+
+
+def poll_jobs(cs, jobs, key=None, timeout=None):
+    '''
+    Polls the async `jobs`, a dict of API responses holding a jobid, together
+    until all of them finished or `timeout` seconds passed. Returns a dict of
+    the job results and a dict of the error texts of failed jobs, both keyed
+    like `jobs`. Jobs still pending at the timeout are failed jobs.
+    '''
+    results = {}
+    errors = {}
+    pending = {}
+    for job_key, job in jobs.iteritems():
+        if job and 'jobid' in job:
+            pending[job_key] = job['jobid']
+        else:
+            results[job_key] = job
+
+    deadline = None
+    if timeout:
+        deadline = time.time() + timeout
+    interval = CS_POLL_INTERVAL[0]
+    while pending:
+        for job_key, jobid in pending.items():
+            res = cs.queryAsyncJobResult(jobid=jobid)
+            if res['jobstatus'] == 0 or 'jobresult' not in res:
+                continue
+            del pending[job_key]
+            if 'errortext' in res['jobresult']:
+                errors[job_key] = res['jobresult']['errortext']
+            elif key and key in res['jobresult']:
+                results[job_key] = res['jobresult'][key]
+            else:
+                results[job_key] = res['jobresult']
+        if pending:
+            if deadline is not None and time.time() >= deadline:
+                for job_key, jobid in pending.iteritems():
+                    errors[job_key] = "Timed out after %s seconds waiting for job %s" % (timeout, jobid)
+                break
+            if deadline is not None:
+                time.sleep(max(min(interval, deadline - time.time()), 0))
+            else:
+                time.sleep(interval)
+            interval = min(interval * 2, CS_POLL_INTERVAL[1])
+    return results, errors
+
+
+def int_or_none(value):
+    if value is None or value == '':
+        return None
+    return int(value)
+
+
 class AnsibleCloudStackFirewall(AnsibleCloudStack):
 
     def __init__(self, module):
@@ -234,32 +354,61 @@ class AnsibleCloudStackFirewall(AnsibleCloudStack):
             'icmptype':     'icmp_type',
         }
         self.firewall_rule = None
+        self.firewall_rules = None
+        self.firewall_rule_index = None
+
+
+    def get_rule_spec(self, rule=None):
+        spec = {}
+        for option in RULE_OPTIONS:
+            spec[option] = self.module.params.get(option)
+
+        if rule is not None:
+            if not isinstance(rule, dict):
+                self.module.fail_json(msg="rule must be a dictionary of rule options, got: %s" % rule)
+            rule = rule.copy()
+            if 'port' in rule:
+                rule['start_port'] = rule.pop('port')
+            unknown = set(rule.keys()) - set(RULE_OPTIONS)
+            if unknown:
+                self.module.fail_json(msg="unsupported options in rule: %s" % ', '.join(sorted(unknown)))
+            spec.update(rule)
+            for option in ['start_port', 'end_port', 'icmp_type', 'icmp_code']:
+                if spec[option] is not None:
+                    try:
+                        spec[option] = int(spec[option])
+                    except (TypeError, ValueError):
+                        self.module.fail_json(msg="%s must be an integer in rule: %s" % (option, rule))
 
+        if spec['end_port'] is None:
+            spec['end_port'] = spec['start_port']
 
-    def get_firewall_rule(self):
-        if not self.firewall_rule:
-            cidr        = self.module.params.get('cidr')
-            protocol    = self.module.params.get('protocol')
-            start_port  = self.module.params.get('start_port')
-            end_port    = self.get_or_fallback('end_port', 'start_port')
-            icmp_code   = self.module.params.get('icmp_code')
-            icmp_type   = self.module.params.get('icmp_type')
-            fw_type     = self.module.params.get('type')
+        protocol    = spec['protocol']
+        fw_type     = self.module.params.get('type')
 
-            if protocol in ['tcp', 'udp'] and not (start_port and end_port):
-                self.module.fail_json(msg="missing required argument for protocol '%s': start_port or end_port" % protocol)
+        if protocol not in PROTOCOLS:
+            self.module.fail_json(msg="value of protocol must be one of: %s, got: %s" % (', '.join(PROTOCOLS), protocol))
 
-            if protocol == 'icmp' and not icmp_type:
-                self.module.fail_json(msg="missing required argument for protocol 'icmp': icmp_type")
+        if protocol in ['tcp', 'udp'] and not (spec['start_port'] and spec['end_port']):
+            self.module.fail_json(msg="missing required argument for protocol '%s': start_port or end_port" % protocol)
 
-            if protocol == 'all' and fw_type != 'egress':
-                self.module.fail_json(msg="protocol 'all' could only be used for type 'egress'" )
+        if protocol == 'icmp' and not spec['icmp_type']:
+            self.module.fail_json(msg="missing required argument for protocol 'icmp': icmp_type")
 
+        if protocol == 'all' and fw_type != 'egress':
+            self.module.fail_json(msg="protocol 'all' could only be used for type 'egress'" )
+
+        return spec
+
+
+    def get_firewall_rules(self):
+        if self.firewall_rules is None:
             args                = {}
             args['account']     = self.get_account('name')
             args['domainid']    = self.get_domain('id')
             args['projectid']   = self.get_project('id')
 
+            fw_type = self.module.params.get('type')
             if fw_type == 'egress':
                 args['networkid'] = self.get_network(key='id')
                 if not args['networkid']:
@@ -271,42 +420,45 @@ class AnsibleCloudStackFirewall(AnsibleCloudStack):
                     self.module.fail_json(msg="missing required argument for type ingress: ip_address")
                 firewall_rules = self.cs.listFirewallRules(**args)
 
+            self.firewall_rules = []
             if firewall_rules and 'firewallrule' in firewall_rules:
-                for rule in firewall_rules['firewallrule']:
-                    type_match = self._type_cidr_match(rule, cidr)
+                self.firewall_rules = firewall_rules['firewallrule']
+        return self.firewall_rules
 
-                    protocol_match = self._tcp_udp_match(rule, protocol, start_port, end_port) \
-                        or self._icmp_match(rule, protocol, icmp_code, icmp_type) \
-                        or self._egress_all_match(rule, protocol, fw_type)
 
-                    if type_match and protocol_match:
-                        self.firewall_rule = rule
-                        break
-        return self.firewall_rule
+    def get_firewall_rule_index(self):
+        if self.firewall_rule_index is None:
+            self.firewall_rule_index = {}
+            for rule in self.get_firewall_rules():
+                self.firewall_rule_index.setdefault(self._firewall_rule_key(rule), rule)
+        return self.firewall_rule_index
 
 
-    def _tcp_udp_match(self, rule, protocol, start_port, end_port):
-        return protocol in ['tcp', 'udp'] \
-            and protocol == rule['protocol'] \
-            and start_port == int(rule['startport']) \
-            and end_port == int(rule['endport'])
+    def get_firewall_rule(self, spec=None):
+        if spec is None:
+            if self.firewall_rule:
+                return self.firewall_rule
+            spec = self.get_rule_spec()
+        return self.get_firewall_rule_index().get(self._spec_key(spec))
 
 
-    def _egress_all_match(self, rule, protocol, fw_type):
-        return protocol in ['all'] \
-            and protocol == rule['protocol'] \
-            and fw_type == 'egress'
+    def _rule_key(self, protocol, cidr, start_port, end_port, icmp_type, icmp_code):
+        # only the options the protocol considers are part of the key
+        if protocol in ['tcp', 'udp']:
+            return (protocol, cidr, start_port, end_port, None, None)
+        if protocol == 'icmp':
+            return (protocol, cidr, None, None, icmp_type, icmp_code)
+        return (protocol, cidr, None, None, None, None)
 
 
-    def _icmp_match(self, rule, protocol, icmp_code, icmp_type):
-        return protocol == 'icmp' \
-           and protocol == rule['protocol'] \
-           and icmp_code == rule['icmpcode'] \
-           and icmp_type == rule['icmptype']
+    def _spec_key(self, spec):
+        return self._rule_key(spec['protocol'], spec['cidr'], spec['start_port'], spec['end_port'], spec['icmp_type'], spec['icmp_code'])
 
 
-    def _type_cidr_match(self, rule, cidr):
-        return cidr == rule['cidrlist']
+    def _firewall_rule_key(self, rule):
+        return self._rule_key(rule['protocol'], rule['cidrlist'],
+            int_or_none(rule.get('startport')), int_or_none(rule.get('endport')),
+            int_or_none(rule.get('icmptype')), int_or_none(rule.get('icmpcode')))
 
 
     def get_network(self, key=None, network=None):
@@ -333,30 +485,51 @@ class AnsibleCloudStackFirewall(AnsibleCloudStack):
         self.module.fail_json(msg="Network '%s' not found" % network)
 
 
+    def _submit_create(self, spec):
+        args                = {}
+        args['cidrlist']    = spec['cidr']
+        args['protocol']    = spec['protocol']
+        args['startport']   = spec['start_port']
+        args['endport']     = spec['end_port']
+        args['icmptype']    = spec['icmp_type']
+        args['icmpcode']    = spec['icmp_code']
+
+        fw_type = self.module.params.get('type')
+        if fw_type == 'egress':
+            args['networkid'] = self.get_network(key='id')
+            res = self.cs.createEgressFirewallRule(**args)
+        else:
+            args['ipaddressid'] = self.get_ip_address('id')
+            res = self.cs.createFirewallRule(**args)
+
+        if 'errortext' in res:
+            self.module.fail_json(msg="Failed: '%s'" % res['errortext'])
+        return res
+
+
+    def _submit_remove(self, firewall_rule):
+        args       = {}
+        args['id'] = firewall_rule['id']
+
+        fw_type = self.module.params.get('type')
+        if fw_type == 'egress':
+            res = self.cs.deleteEgressFirewallRule(**args)
+        else:
+            res = self.cs.deleteFirewallRule(**args)
+
+        if 'errortext' in res:
+            self.module.fail_json(msg="Failed: '%s'" % res['errortext'])
+        return res
+
+
     def create_firewall_rule(self):
         firewall_rule = self.get_firewall_rule()
         if not firewall_rule:
             self.result['changed'] = True
 
-            args                = {}
-            args['cidrlist']    = self.module.params.get('cidr')
-            args['protocol']    = self.module.params.get('protocol')
-            args['startport']   = self.module.params.get('start_port')
-            args['endport']     = self.get_or_fallback('end_port', 'start_port')
-            args['icmptype']    = self.module.params.get('icmp_type')
-            args['icmpcode']    = self.module.params.get('icmp_code')
-
-            fw_type = self.module.params.get('type')
+            spec = self.get_rule_spec()
             if not self.module.check_mode:
-                if fw_type == 'egress':
-                    args['networkid'] = self.get_network(key='id')
-                    res = self.cs.createEgressFirewallRule(**args)
-                else:
-                    args['ipaddressid'] = self.get_ip_address('id')
-                    res = self.cs.createFirewallRule(**args)
-
-                if 'errortext' in res:
-                    self.module.fail_json(msg="Failed: '%s'" % res['errortext'])
+                res = self._submit_create(spec)
 
                 poll_async = self.module.params.get('poll_async')
                 if poll_async:
@@ -369,18 +542,8 @@ class AnsibleCloudStackFirewall(AnsibleCloudStack):
         if firewall_rule:
             self.result['changed'] = True
 
-            args       = {}
-            args['id'] = firewall_rule['id']
-
-            fw_type = self.module.params.get('type')
             if not self.module.check_mode:
-                if fw_type == 'egress':
-                    res = self.cs.deleteEgressFirewallRule(**args)
-                else:
-                    res = self.cs.deleteFirewallRule(**args)
-
-                if 'errortext' in res:
-                    self.module.fail_json(msg="Failed: '%s'" % res['errortext'])
+                res = self._submit_remove(firewall_rule)
 
                 poll_async = self.module.params.get('poll_async')
                 if poll_async:
@@ -388,6 +551,82 @@ class AnsibleCloudStackFirewall(AnsibleCloudStack):
         return firewall_rule
 
 
+    def _firewall_rule_item(self, firewall_rule):
+        item = dict(zip(['protocol', 'cidr', 'start_port', 'end_port', 'icmp_type', 'icmp_code'],
+            self._firewall_rule_key(firewall_rule)))
+        item['id'] = firewall_rule['id']
+        return item
+
+
+    def ensure_firewall_rules(self, state):
+        index = self.get_firewall_rule_index()
+
+        # declared rules by key, the first of duplicates wins
+        items = []
+        declared = {}
+        for rule in self.module.params.get('rules'):
+            spec = self.get_rule_spec(rule)
+            key = self._spec_key(spec)
+
+            item = spec.copy()
+            item['changed'] = False
+            if key in index:
+                item['id'] = index[key]['id']
+            declared.setdefault(key, len(items))
+            items.append(item)
+
+        keys = sorted(declared, key=declared.get)
+        if state == 'absent':
+            to_add = []
+            to_remove = [k for k in keys if k in index]
+        else:
+            to_add = [k for k in keys if k not in index]
+            to_remove = []
+
+        purged = []
+        if state == 'present' and self.module.params.get('purge_rules'):
+            for firewall_rule in self.get_firewall_rules():
+                if self._firewall_rule_key(firewall_rule) not in declared:
+                    purged.append(self._firewall_rule_item(firewall_rule))
+
+        for key in to_add + to_remove:
+            items[declared[key]]['changed'] = True
+        if to_add or to_remove or purged:
+            self.result['changed'] = True
+
+        if not self.module.check_mode:
+            # All jobs are submitted before any is waited for.
+            jobs = {}
+            for key in to_add:
+                jobs[('rule', declared[key])] = self._submit_create(items[declared[key]])
+            for key in to_remove:
+                jobs[('rule', declared[key])] = self._submit_remove(index[key])
+            for i, item in enumerate(purged):
+                jobs[('purged', i)] = self._submit_remove(item)
+
+            poll_async = self.module.params.get('poll_async')
+            if jobs and poll_async:
+                results, errors = poll_jobs(self.cs, jobs, 'firewallrule', self.module.params.get('poll_timeout'))
+                for key in to_add:
+                    firewall_rule = results.get(('rule', declared[key]))
+                    if firewall_rule and 'id' in firewall_rule:
+                        items[declared[key]]['id'] = firewall_rule['id']
+                for (kind, i), errortext in errors.iteritems():
+                    if kind == 'rule':
+                        failed_item = items[i]
+                    else:
+                        failed_item = purged[i]
+                    failed_item['failed'] = True
+                    failed_item['msg'] = errortext
+                if errors:
+                    self.module.fail_json(msg="Failed: %d of %d firewall rule jobs" % (len(errors), len(jobs)),
+                        rules=items, purged_rules=purged)
+
+        self.result['rules'] = items
+        self.result['purged_rules'] = purged
+        return items
+
+
     def get_result(self, firewall_rule):
         super(AnsibleCloudStackFirewall, self).get_result(firewall_rule)
         if firewall_rule:
@@ -403,18 +642,21 @@ def main():
         ip_address = dict(default=None),
         network = dict(default=None),
         cidr = dict(default='0.0.0.0/0'),
-        protocol = dict(choices=['tcp', 'udp', 'icmp', 'all'], default='tcp'),
+        protocol = dict(choices=PROTOCOLS, default='tcp'),
         type = dict(choices=['ingress', 'egress'], default='ingress'),
         icmp_type = dict(type='int', default=None),
         icmp_code = dict(type='int', default=None),
         start_port = dict(type='int', aliases=['port'], default=None),
         end_port = dict(type='int', default=None),
+        rules = dict(type='list', default=None),
+        purge_rules = dict(type='bool', default=False),
         state = dict(choices=['present', 'absent'], default='present'),
         zone = dict(default=None),
         domain = dict(default=None),
         account = dict(default=None),
         project = dict(default=None),
         poll_async = dict(type='bool', default=True),
+        poll_timeout = dict(type='int', default=600),
     ))
 
     required_together = cs_required_together()
@@ -432,6 +674,9 @@ def main():
             ['icmp_type', 'start_port'],
             ['icmp_type', 'end_port'],
             ['ip_address', 'network'],
+            ['rules', 'start_port'],
+            ['rules', 'end_port'],
+            ['rules', 'icmp_type'],
         ),
         supports_check_mode=True
     )
@@ -443,7 +688,10 @@ def main():
         acs_fw = AnsibleCloudStackFirewall(module)
 
         state = module.params.get('state')
-        if state in ['absent']:
+        if module.params.get('rules') is not None:
+            acs_fw.ensure_firewall_rules(state)
+            fw_rule = None
+        elif state in ['absent']:
             fw_rule = acs_fw.remove_firewall_rule()
         else:
             fw_rule = acs_fw.create_firewall_rule()
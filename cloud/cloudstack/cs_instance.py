@@ -200,6 +200,29 @@ options:
       - Poll async jobs until job has finished.
     required: false
     default: true
+  cache_ttl:
+    description:
+      - Seconds a cached listing of service offerings, disk offerings, templates, ISOs and networks is reused.
+      - Listings are cached per API endpoint, account, domain, project and zone and shared between tasks on the same host.
+      - A name not found in a cached listing triggers a fresh listing before failing.
+      - If the API rejects a call using an ID of a cached listing, the cached listings are dropped and the call is retried once.
+      - C(0) disables the cache.
+    required: false
+    default: 0
+    version_added: "2.1"
+  cache_dir:
+    description:
+      - Directory the listing cache is stored in.
+    required: false
+    default: "~/.ansible/cache/cloudstack"
+    version_added: "2.1"
+  page_size:
+    description:
+      - Number of items requested per page when virtual machines are listed page by page.
+      - If not set, the default page size of the server is used.
+    required: false
+    default: null
+    version_added: "2.1"
 extends_documentation_fragment: cloudstack
 '''
 
@@ -386,6 +409,12 @@ instance_name:
 '''
 
 import base64
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
 
 try:
     from cs import CloudStack, CloudStackException, read_config
@@ -397,6 +426,163 @@ except ImportError:
 from ansible.module_utils.cloudstack import *
 
 
+CS_CACHE_DIR = '~/.ansible/cache/cloudstack'
+UUID_RE = re.compile(r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$')
+
+
+def iter_listing(cs_func, key, page_size=None, **args):
+    '''
+    Yields the items of a list API call page by page, until a page comes back
+    shorter than the page size. Without `page_size` the first page is listed
+    with the default page size of the server, which is used for the next pages
+    if the count of the response shows the listing was cut off.
+    '''
+    page = 1
+    if page_size:
+        args['pagesize'] = page_size
+        args['page'] = page
+    while True:
+        res = cs_func(**args) or {}
+        items = res.get(key) or []
+        for item in items:
+            yield item
+        if not page_size:
+            if not items or res.get('count', 0) <= len(items):
+                break
+            page_size = len(items)
+            args['pagesize'] = page_size
+        elif len(items) < page_size:
+            break
+        page += 1
+        args['page'] = page
+
+
+class CloudStackListing(object):
+    '''Items of a list API call, indexed by the fields looked up.'''
+
+    def __init__(self, items, cached=False):
+        self.items = items
+        self.cached = cached
+        self._indexes = {}
+
+    def get(self, value, fields=('name', 'id')):
+        index = self._indexes.get(fields)
+        if index is None:
+            # keep the first item matching a value, like a linear scan would
+            index = {}
+            for item in self.items:
+                for field in fields:
+                    if field in item:
+                        index.setdefault(item[field], item)
+            self._indexes[fields] = index
+        return index.get(value)
+
+
+class CloudStackListingCache(object):
+    '''
+    TTL bounded cache of reference listings, stored on disk so tasks on the
+    same host share it. Entries are keyed by API endpoint and key, the list
+    API and its arguments (account, domain, project, zone and filters).
+    '''
+
+    def __init__(self, cs, path, ttl):
+        self.cs = cs
+        self.path = os.path.expanduser(path)
+        self.ttl = ttl
+        self.listings = {}
+
+
+    def _cache_key(self, command, args):
+        scope = [getattr(self.cs, 'endpoint', None), getattr(self.cs, 'key', None), command, args]
+        return hashlib.sha1(json.dumps(scope, sort_keys=True)).hexdigest()
+
+
+    def _cache_file(self, cache_key):
+        return os.path.join(self.path, '%s.json' % cache_key)
+
+
+    def _read(self, cache_file):
+        if not self.ttl:
+            return None
+        try:
+            f = open(cache_file)
+            try:
+                data = json.load(f)
+            finally:
+                f.close()
+        except (IOError, ValueError):
+            return None
+        if time.time() - data.get('timestamp', 0) > self.ttl:
+            return None
+        return data.get('items')
+
+
+    def _write(self, cache_file, items):
+        if not self.ttl:
+            return
+        try:
+            if not os.path.isdir(self.path):
+                os.makedirs(self.path, 0700)
+            fd, tmp_file = tempfile.mkstemp(dir=self.path)
+            f = os.fdopen(fd, 'w')
+            try:
+                json.dump(dict(timestamp=time.time(), items=items), f)
+            finally:
+                f.close()
+            os.rename(tmp_file, cache_file)
+        except (IOError, OSError):
+            # the cache is an optimization only
+            pass
+
+
+    def listing(self, command, key, refresh=False, **args):
+        cache_key = self._cache_key(command, args)
+        if not refresh and cache_key in self.listings:
+            return self.listings[cache_key]
+
+        cache_file = self._cache_file(cache_key)
+        items = None
+        if not refresh:
+            items = self._read(cache_file)
+        cached = items is not None
+
+        if not cached:
+            res = getattr(self.cs, command)(**args)
+            items = (res or {}).get(key) or []
+            self._write(cache_file, items)
+
+        self.listings[cache_key] = CloudStackListing(items, cached)
+        return self.listings[cache_key]
+
+
+    def has_cached(self):
+        for listing in self.listings.values():
+            if listing.cached:
+                return True
+        return False
+
+
+    def invalidate(self):
+        '''Drops the listings read from the cache, they are listed again when used.'''
+        for cache_key, listing in self.listings.items():
+            if listing.cached:
+                try:
+                    os.remove(self._cache_file(cache_key))
+                except OSError:
+                    pass
+                del self.listings[cache_key]
+
+
+    def find(self, command, key, value, fields=('name', 'id'), **args):
+        listing = self.listing(command, key, **args)
+        item = listing.get(value, fields)
+        if item is None and listing.cached:
+            # the resource may be newer than the cached listing
+            listing = self.listing(command, key, refresh=True, **args)
+            item = listing.get(value, fields)
+        return item
+
+
 class AnsibleCloudStackInstance(AnsibleCloudStack):
 
     def __init__(self, module):
@@ -416,19 +602,42 @@ class AnsibleCloudStackInstance(AnsibleCloudStack):
         self.instance = None
         self.template = None
         self.iso = None
+        self.listings = CloudStackListingCache(self.cs,
+            module.params.get('cache_dir') or CS_CACHE_DIR,
+            module.params.get('cache_ttl'))
+
+
+    def _call_with_listings(self, command, args, get_args):
+        '''
+        Calls an API with IDs looked up in the listing cache. If the API rejects
+        the call while a listing came from the cache, the cached listings are
+        dropped and the call is retried once with args from fresh listings.
+        '''
+        try:
+            res = getattr(self.cs, command)(**args)
+        except CloudStackException:
+            if not self.listings.has_cached():
+                raise
+            res = None
+        if (res is None or 'errortext' in res) and self.listings.has_cached():
+            self.listings.invalidate()
+            self.template = None
+            self.iso = None
+            res = getattr(self.cs, command)(**get_args())
+        return res
 
 
     def get_service_offering_id(self):
         service_offering = self.module.params.get('service_offering')
 
-        service_offerings = self.cs.listServiceOfferings()
-        if service_offerings:
-            if not service_offering:
-                return service_offerings['serviceoffering'][0]['id']
-
-            for s in service_offerings['serviceoffering']:
-                if service_offering in [ s['name'], s['id'] ]:
-                    return s['id']
+        if not service_offering:
+            service_offerings = self.listings.listing('listServiceOfferings', 'serviceoffering')
+            if service_offerings.items:
+                return service_offerings.items[0]['id']
+        else:
+            s = self.listings.find('listServiceOfferings', 'serviceoffering', service_offering)
+            if s:
+                return s['id']
         self.module.fail_json(msg="Service offering '%s' not found" % service_offering)
 
 
@@ -451,24 +660,20 @@ class AnsibleCloudStackInstance(AnsibleCloudStack):
                 return self._get_by_key(key, self.template)
 
             args['templatefilter'] = 'executable'
-            templates = self.cs.listTemplates(**args)
-            if templates:
-                for t in templates['template']:
-                    if template in [ t['displaytext'], t['name'], t['id'] ]:
-                        self.template = t
-                        return self._get_by_key(key, self.template)
+            t = self.listings.find('listTemplates', 'template', template, ('displaytext', 'name', 'id'), **args)
+            if t:
+                self.template = t
+                return self._get_by_key(key, self.template)
             self.module.fail_json(msg="Template '%s' not found" % template)
 
         elif iso:
             if self.iso:
                 return self._get_by_key(key, self.iso)
             args['isofilter'] = 'executable'
-            isos = self.cs.listIsos(**args)
-            if isos:
-                for i in isos['iso']:
-                    if iso in [ i['displaytext'], i['name'], i['id'] ]:
-                        self.iso = i
-                        return self._get_by_key(key, self.iso)
+            i = self.listings.find('listIsos', 'iso', iso, ('displaytext', 'name', 'id'), **args)
+            if i:
+                self.iso = i
+                return self._get_by_key(key, self.iso)
             self.module.fail_json(msg="ISO '%s' not found" % iso)
 
 
@@ -478,11 +683,9 @@ class AnsibleCloudStackInstance(AnsibleCloudStack):
         if not disk_offering:
             return None
 
-        disk_offerings = self.cs.listDiskOfferings()
-        if disk_offerings:
-            for d in disk_offerings['diskoffering']:
-                if disk_offering in [ d['displaytext'], d['name'], d['id'] ]:
-                    return d['id']
+        d = self.listings.find('listDiskOfferings', 'diskoffering', disk_offering, ('displaytext', 'name', 'id'))
+        if d:
+            return d['id']
         self.module.fail_json(msg="Disk offering '%s' not found" % disk_offering)
 
 
@@ -496,15 +699,32 @@ class AnsibleCloudStackInstance(AnsibleCloudStack):
             args['domainid']    = self.get_domain(key='id')
             args['projectid']   = self.get_project(key='id')
             # Do not pass zoneid, as the instance name must be unique across zones.
-            instances = self.cs.listVirtualMachines(**args)
-            if instances:
-                for v in instances['virtualmachine']:
-                    if instance_name.lower() in [ v['name'].lower(), v['displayname'].lower(), v['id'] ]:
-                        self.instance = v
-                        break
+            self.instance = self._find_instance(instance_name, args)
         return self.instance
 
 
+    def _find_instance(self, instance_name, args):
+        instance_name_lower = instance_name.lower()
+
+        if UUID_RE.match(instance_name_lower):
+            instances = self.cs.listVirtualMachines(id=instance_name_lower, **args)
+            if instances and instances.get('virtualmachine'):
+                return instances['virtualmachine'][0]
+
+        page_size = self.module.params.get('page_size')
+
+        # The name filter is a substring match, the result is narrowed here.
+        for v in iter_listing(self.cs.listVirtualMachines, 'virtualmachine', page_size, name=instance_name, **args):
+            if instance_name_lower in [ v['name'].lower(), v['displayname'].lower() ]:
+                return v
+
+        # There is no display name filter, the keyword matches it among others.
+        for v in iter_listing(self.cs.listVirtualMachines, 'virtualmachine', page_size, keyword=instance_name, **args):
+            if instance_name_lower == v['displayname'].lower():
+                return v
+        return None
+
+
     def get_iptonetwork_mappings(self):
         network_mappings = self.module.params.get('ip_to_networks')
         if network_mappings is None:
@@ -534,18 +754,13 @@ class AnsibleCloudStackInstance(AnsibleCloudStack):
         args['projectid']   = self.get_project(key='id')
         args['zoneid']      = self.get_zone(key='id')
 
-        networks = self.cs.listNetworks(**args)
-        if not networks:
-            self.module.fail_json(msg="No networks available")
-
         network_ids = []
         network_displaytexts = []
         for network_name in network_names:
-            for n in networks['network']:
-                if network_name in [ n['displaytext'], n['name'], n['id'] ]:
-                    network_ids.append(n['id'])
-                    network_displaytexts.append(n['name'])
-                    break
+            n = self.listings.find('listNetworks', 'network', network_name, ('displaytext', 'name', 'id'), **args)
+            if n:
+                network_ids.append(n['id'])
+                network_displaytexts.append(n['name'])
 
         if len(network_ids) != len(network_names):
             self.module.fail_json(msg="Could not find all networks, networks list found: %s" % network_displaytexts)
@@ -592,8 +807,7 @@ class AnsibleCloudStackInstance(AnsibleCloudStack):
         return res
 
 
-    def deploy_instance(self, start_vm=True):
-        self.result['changed'] = True
+    def get_deploy_args(self, start_vm=True):
         networkids = self.get_network_ids()
         if networkids is not None:
             networkids = ','.join(networkids)
@@ -629,10 +843,17 @@ class AnsibleCloudStackInstance(AnsibleCloudStack):
         template_iso = self.get_template_or_iso()
         if 'hypervisor' not in template_iso:
             args['hypervisor'] = self.get_hypervisor()
+        return args
+
+
+    def deploy_instance(self, start_vm=True):
+        self.result['changed'] = True
+        args = self.get_deploy_args(start_vm=start_vm)
 
         instance = None
         if not self.module.check_mode:
-            instance = self.cs.deployVirtualMachine(**args)
+            instance = self._call_with_listings('deployVirtualMachine', args,
+                lambda: self.get_deploy_args(start_vm=start_vm))
 
             if 'errortext' in instance:
                 self.module.fail_json(msg="Failed: '%s'" % instance['errortext'])
@@ -685,7 +906,8 @@ class AnsibleCloudStackInstance(AnsibleCloudStack):
 
                     # Change service offering
                     if self._has_changed(args_service_offering, instance):
-                        res = self.cs.changeServiceForVirtualMachine(**args_service_offering)
+                        res = self._call_with_listings('changeServiceForVirtualMachine', args_service_offering,
+                            lambda: dict(args_service_offering, serviceofferingid=self.get_service_offering_id()))
                         if 'errortext' in res:
                             self.module.fail_json(msg="Failed: '%s'" % res['errortext'])
                         instance = res['virtualmachine']
@@ -836,7 +1058,8 @@ class AnsibleCloudStackInstance(AnsibleCloudStack):
             args = {}
             args['templateid'] = self.get_template_or_iso(key='id')
             args['virtualmachineid'] = instance['id']
-            res = self.cs.restoreVirtualMachine(**args)
+            res = self._call_with_listings('restoreVirtualMachine', args,
+                lambda: dict(args, templateid=self.get_template_or_iso(key='id')))
             if 'errortext' in res:
                 self.module.fail_json(msg="Failed: '%s'" % res['errortext'])
 
@@ -899,6 +1122,9 @@ def main():
         force = dict(type='bool', default=False),
         tags = dict(type='list', aliases=[ 'tag' ], default=None),
         poll_async = dict(type='bool', default=True),
+        cache_ttl = dict(type='int', default=0),
+        cache_dir = dict(default=None),
+        page_size = dict(type='int', default=None),
     ))
 
     required_together = cs_required_together()
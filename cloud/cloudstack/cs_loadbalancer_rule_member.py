@@ -280,10 +280,11 @@ class AnsibleCloudStackLBRuleMember(AnsibleCloudStack):
             return rule
 
         args = self._get_common_args()
-        vms = self.cs.listVirtualMachines(**args)
         to_change_ids = []
         for name in to_change:
-            for vm in vms.get('virtualmachine', []):
+            # The name filter is a substring match, the result is narrowed here.
+            vms = self.cs.listVirtualMachines(name=name, **args)
+            for vm in (vms or {}).get('virtualmachine', []):
                 if vm['name'] == name:
                     to_change_ids.append(vm['id'])
                     break
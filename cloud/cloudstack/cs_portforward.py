@@ -52,7 +52,9 @@ options:
   public_port:
     description:
       - Start public port for this rule.
-    required: true
+      - Required if C(rules) is not set.
+    required: false
+    default: null
   public_end_port:
     description:
       - End public port for this rule.
@@ -62,7 +64,9 @@ options:
   private_port:
     description:
       - Start private port for this rule.
-    required: true
+      - Required if C(rules) is not set.
+    required: false
+    default: null
   private_end_port:
     description:
       - End private port for this rule.
@@ -101,11 +105,28 @@ options:
       - If not set, default zone is used.
     required: false
     default: null
+  rules:
+    description:
+      - List of port forwarding rules to apply in one task, each a dictionary of C(public_port), C(public_end_port), C(private_port), C(private_end_port), C(protocol), C(vm), C(vm_guest_ip) and C(open_firewall).
+      - C(protocol), C(vm), C(vm_guest_ip) and C(open_firewall) default to the module options of the same name.
+      - All delete jobs are submitted first and polled together, then all create jobs.
+      - Mutually exclusive with C(public_port), C(public_end_port), C(private_port) and C(private_end_port).
+    required: false
+    default: null
+    version_added: "2.1"
   poll_async:
     description:
       - Poll async jobs until job has finished.
     required: false
     default: true
+  poll_timeout:
+    description:
+      - Seconds to wait for the async jobs of C(rules) to finish if C(poll_async) is set.
+      - Rules whose jobs are still pending then are reported as failed.
+      - C(0) waits without a limit.
+    required: false
+    default: 600
+    version_added: "2.1"
 extends_documentation_fragment: cloudstack
 '''
 
@@ -143,6 +164,15 @@ EXAMPLES = '''
     public_port: 22
     private_port: 22
     state: absent
+
+# forward several ports of one public IP in one task
+- local_action:
+    module: cs_portforward
+    ip_address: 1.2.3.4
+    rules:
+    - { vm: web01, public_port: 80, private_port: 8080 }
+    - { vm: web01, public_port: 443, private_port: 8443 }
+    - { vm: db01, public_port: 5432, private_port: 5432 }
 '''
 
 RETURN = '''
@@ -196,6 +226,11 @@ vm_display_name:
   returned: success
   type: string
   sample: web-01
+rules:
+  description: Per rule results if C(rules) is set, with the rule options, C(id) and C(changed).
+  returned: success
+  type: list
+  sample: [ { "protocol": "tcp", "public_port": 80, "public_end_port": 80, "private_port": 8080, "private_end_port": 8080, "vm": "web01", "id": "a6f7a5fc-43f8-11e5-a151-feff819cdc9f", "changed": true } ]
 vm_guest_ip:
   description: IP of the virtual machine.
   returned: success
@@ -203,6 +238,8 @@ vm_guest_ip:
   sample: 10.101.65.152
 '''
 
+import time
+
 try:
     from cs import CloudStack, CloudStackException, read_config
     has_lib_cs = True
@@ -213,6 +250,63 @@ except ImportError:
 from ansible.module_utils.cloudstack import *
 
 
+# Options a single port forwarding rule is made of, may be set per item in rules.
+RULE_OPTIONS = ['protocol', 'public_port', 'public_end_port', 'private_port', 'private_end_port', 'vm', 'vm_guest_ip', 'open_firewall']
+
+PROTOCOLS = ['tcp', 'udp']
+
+# CS_POLL_INTERVAL and poll_jobs are a deliberate copy of those in cs_firewall,
+# keep both in sync. Modules only share code through module_utils/cloudstack,
+# which is not in this repo.
+CS_POLL_INTERVAL = (0.5, 5)
+
+
+def poll_jobs(cs, jobs, key=None, timeout=None):
+    '''
+    Polls the async `jobs`, a dict of API responses holding a jobid, together
+    until all of them finished or `timeout` seconds passed. Returns a dict of
+    the job results and a dict of the error texts of failed jobs, both keyed
+    like `jobs`. Jobs still pending at the timeout are failed jobs.
+    '''
+    results = {}
+    errors = {}
+    pending = {}
+    for job_key, job in jobs.iteritems():
+        if job and 'jobid' in job:
+            pending[job_key] = job['jobid']
+        else:
+            results[job_key] = job
+
+    deadline = None
+    if timeout:
+        deadline = time.time() + timeout
+    interval = CS_POLL_INTERVAL[0]
+    while pending:
+        for job_key, jobid in pending.items():
+            res = cs.queryAsyncJobResult(jobid=jobid)
+            if res['jobstatus'] == 0 or 'jobresult' not in res:
+                continue
+            del pending[job_key]
+            if 'errortext' in res['jobresult']:
+                errors[job_key] = res['jobresult']['errortext']
+            elif key and key in res['jobresult']:
+                results[job_key] = res['jobresult'][key]
+            else:
+                results[job_key] = res['jobresult']
+        if pending:
+            if deadline is not None and time.time() >= deadline:
+                for job_key, jobid in pending.iteritems():
+                    errors[job_key] = "Timed out after %s seconds waiting for job %s" % (timeout, jobid)
+                break
+            if deadline is not None:
+                time.sleep(max(min(interval, deadline - time.time()), 0))
+            else:
+                time.sleep(interval)
+            interval = min(interval * 2, CS_POLL_INTERVAL[1])
+    return results, errors
+
+
+
 class AnsibleCloudStackPortforwarding(AnsibleCloudStack):
 
     def __init__(self, module):
@@ -233,12 +327,15 @@ class AnsibleCloudStackPortforwarding(AnsibleCloudStack):
             'privateendport':   'private_end_port',
         }
         self.portforwarding_rule = None
-        self.vm_default_nic = None
+        self.vm_default_nics = {}
+        self.vms = None
 
 
-    def get_vm_guest_ip(self):
-        vm_guest_ip = self.module.params.get('vm_guest_ip')
-        default_nic = self.get_vm_default_nic()
+    def get_vm_guest_ip(self, spec=None, vm=None):
+        if spec is None:
+            spec = self.module.params
+        vm_guest_ip = spec.get('vm_guest_ip')
+        default_nic = self.get_vm_default_nic(vm)
 
         if not vm_guest_ip:
             return default_nic['ipaddress']
@@ -249,17 +346,19 @@ class AnsibleCloudStackPortforwarding(AnsibleCloudStack):
         self.module.fail_json(msg="Secondary IP '%s' not assigned to VM" % vm_guest_ip)
 
 
-    def get_vm_default_nic(self):
-        if self.vm_default_nic:
-            return self.vm_default_nic
+    def get_vm_default_nic(self, vm=None):
+        if vm is None:
+            vm = self.get_vm()
+        if vm['id'] in self.vm_default_nics:
+            return self.vm_default_nics[vm['id']]
 
-        nics = self.cs.listNics(virtualmachineid=self.get_vm(key='id'))
+        nics = self.cs.listNics(virtualmachineid=vm['id'])
         if nics:
             for n in nics['nic']:
                 if n['isdefault']:
-                    self.vm_default_nic = n
-                    return self.vm_default_nic
-        self.module.fail_json(msg="No default IP address of VM '%s' found" % self.module.params.get('vm'))
+                    self.vm_default_nics[vm['id']] = n
+                    return n
+        self.module.fail_json(msg="No default IP address of VM '%s' found" % vm.get('name', vm['id']))
 
 
     def get_portforwarding_rule(self):
@@ -293,17 +392,157 @@ class AnsibleCloudStackPortforwarding(AnsibleCloudStack):
         return portforwarding_rule
 
 
-    def create_portforwarding_rule(self):
+    def get_rule_spec(self, rule):
+        if not isinstance(rule, dict):
+            self.module.fail_json(msg="rule must be a dictionary of rule options, got: %s" % rule)
+        unknown = set(rule.keys()) - set(RULE_OPTIONS)
+        if unknown:
+            self.module.fail_json(msg="unsupported options in rule: %s" % ', '.join(sorted(unknown)))
+
+        spec = {}
+        for option in RULE_OPTIONS:
+            spec[option] = self.module.params.get(option)
+        spec.update(rule)
+        for option in ['public_port', 'public_end_port', 'private_port', 'private_end_port']:
+            if spec[option] is not None:
+                try:
+                    spec[option] = int(spec[option])
+                except (TypeError, ValueError):
+                    self.module.fail_json(msg="%s must be an integer in rule: %s" % (option, rule))
+        for option in ['public_port', 'private_port']:
+            if spec[option] is None:
+                self.module.fail_json(msg="missing required argument in rule: %s" % option)
+        if spec['protocol'] not in PROTOCOLS:
+            self.module.fail_json(msg="value of protocol must be one of: %s, got: %s" % (', '.join(PROTOCOLS), spec['protocol']))
+
+        if spec['public_end_port'] is None:
+            spec['public_end_port'] = spec['public_port']
+        if spec['private_end_port'] is None:
+            spec['private_end_port'] = spec['private_port']
+        return spec
+
+
+    def get_rule_vm(self, vm):
+        if not vm:
+            self.module.fail_json(msg="missing required argument in rule: vm")
+
+        # The VMs are listed once for all rules.
+        if self.vms is None:
+            args = {}
+            args['account'] = self.get_account(key='name')
+            args['domainid'] = self.get_domain(key='id')
+            args['projectid'] = self.get_project(key='id')
+            args['zoneid'] = self.get_zone(key='id')
+            vms = self.cs.listVirtualMachines(**args)
+            self.vms = (vms or {}).get('virtualmachine', [])
+
+        for v in self.vms:
+            if vm in [ v['name'], v['displayname'], v['id'] ]:
+                return v
+        self.module.fail_json(msg="Virtual machine '%s' not found" % vm)
+
+
+    def _get_rule_args(self, spec=None):
+        if spec is None:
+            vm = self.get_vm()
+            spec = self.module.params.copy()
+            spec['public_end_port'] = self.get_or_fallback('public_end_port', 'public_port')
+            spec['private_end_port'] = self.get_or_fallback('private_end_port', 'private_port')
+        else:
+            vm = self.get_rule_vm(spec['vm'])
+
         args = {}
-        args['protocol']            = self.module.params.get('protocol')
-        args['publicport']          = self.module.params.get('public_port')
-        args['publicendport']       = self.get_or_fallback('public_end_port', 'public_port')
-        args['privateport']         = self.module.params.get('private_port')
-        args['privateendport']      = self.get_or_fallback('private_end_port', 'private_port')
-        args['openfirewall']        = self.module.params.get('open_firewall')
-        args['vmguestip']           = self.get_vm_guest_ip()
+        args['protocol']            = spec['protocol']
+        args['publicport']          = spec['public_port']
+        args['publicendport']       = spec['public_end_port']
+        args['privateport']         = spec['private_port']
+        args['privateendport']      = spec['private_end_port']
+        args['openfirewall']        = spec['open_firewall']
+        args['vmguestip']           = self.get_vm_guest_ip(spec, vm)
         args['ipaddressid']         = self.get_ip_address(key='id')
-        args['virtualmachineid']    = self.get_vm(key='id')
+        args['virtualmachineid']    = vm['id']
+        return args
+
+
+    def ensure_portforwarding_rules(self, state):
+        args = {}
+        args['ipaddressid'] = self.get_ip_address(key='id')
+        args['projectid'] = self.get_project(key='id')
+        portforwarding_rules = self.cs.listPortForwardingRules(**args)
+
+        existing = {}
+        if portforwarding_rules and 'portforwardingrule' in portforwarding_rules:
+            for rule in portforwarding_rules['portforwardingrule']:
+                existing.setdefault((rule['protocol'], int(rule['publicport'])), rule)
+
+        items = []
+        deletes = {}
+        creates = {}
+        seen = set()
+        for rule in self.module.params.get('rules'):
+            spec = self.get_rule_spec(rule)
+
+            item = {}
+            for option in ['protocol', 'public_port', 'public_end_port', 'private_port', 'private_end_port', 'vm']:
+                item[option] = spec[option]
+            item['changed'] = False
+
+            key = (item['protocol'], item['public_port'])
+            portforwarding_rule = existing.get(key)
+            if portforwarding_rule:
+                item['id'] = portforwarding_rule['id']
+
+            if key not in seen:
+                seen.add(key)
+                if state == 'absent':
+                    if portforwarding_rule:
+                        deletes[len(items)] = portforwarding_rule
+                else:
+                    args = self._get_rule_args(spec)
+                    if not portforwarding_rule:
+                        creates[len(items)] = args
+                    elif self._has_changed(args, portforwarding_rule):
+                        # API broken in 4.2.1?, workaround using remove/create instead of update
+                        deletes[len(items)] = portforwarding_rule
+                        creates[len(items)] = args
+                if len(items) in deletes or len(items) in creates:
+                    item['changed'] = True
+                    self.result['changed'] = True
+            items.append(item)
+
+        if not self.module.check_mode:
+            # Deletes have to be done before a rule on the same port is created again.
+            errors = {}
+            jobs = {}
+            for i, portforwarding_rule in deletes.iteritems():
+                jobs[i] = self.cs.deletePortForwardingRule(id=portforwarding_rule['id'])
+            if jobs and (creates or self.module.params.get('poll_async')):
+                results, errors = poll_jobs(self.cs, jobs, timeout=self.module.params.get('poll_timeout'))
+
+            jobs = {}
+            for i, args in creates.iteritems():
+                if i not in errors:
+                    jobs[i] = self.cs.createPortForwardingRule(**args)
+            if jobs and self.module.params.get('poll_async'):
+                results, create_errors = poll_jobs(self.cs, jobs, 'portforwardingrule', self.module.params.get('poll_timeout'))
+                errors.update(create_errors)
+                for i, portforwarding_rule in results.iteritems():
+                    if portforwarding_rule and 'id' in portforwarding_rule:
+                        items[i]['id'] = portforwarding_rule['id']
+
+            for i, errortext in errors.iteritems():
+                items[i]['failed'] = True
+                items[i]['msg'] = errortext
+            if errors:
+                changes = set(deletes) | set(creates)
+                self.module.fail_json(msg="Failed: %d of %d port forwarding rule changes" % (len(errors), len(changes)), rules=items)
+
+        self.result['rules'] = items
+        return items
+
+
+    def create_portforwarding_rule(self):
+        args = self._get_rule_args()
 
         portforwarding_rule = None
         self.result['changed'] = True
@@ -369,11 +608,12 @@ def main():
     argument_spec = cs_argument_spec()
     argument_spec.update(dict(
         ip_address = dict(required=True),
-        protocol= dict(choices=['tcp', 'udp'], default='tcp'),
-        public_port = dict(type='int', required=True),
+        protocol= dict(choices=PROTOCOLS, default='tcp'),
+        public_port = dict(type='int', default=None),
         public_end_port = dict(type='int', default=None),
-        private_port = dict(type='int', required=True),
+        private_port = dict(type='int', default=None),
         private_end_port = dict(type='int', default=None),
+        rules = dict(type='list', default=None),
         state = dict(choices=['present', 'absent'], default='present'),
         open_firewall = dict(type='bool', default=False),
         vm_guest_ip = dict(default=None),
@@ -383,11 +623,26 @@ def main():
         account = dict(default=None),
         project = dict(default=None),
         poll_async = dict(type='bool', default=True),
+        poll_timeout = dict(type='int', default=600),
     ))
 
+    required_together = cs_required_together()
+    required_together.extend([
+        ['public_port', 'private_port'],
+    ])
+
     module = AnsibleModule(
         argument_spec=argument_spec,
-        required_together=cs_required_together(),
+        required_together=required_together,
+        required_one_of = (
+            ['rules', 'public_port'],
+        ),
+        mutually_exclusive = (
+            ['rules', 'public_port'],
+            ['rules', 'public_end_port'],
+            ['rules', 'private_port'],
+            ['rules', 'private_end_port'],
+        ),
         supports_check_mode=True
     )
 
@@ -397,7 +652,10 @@ def main():
     try:
         acs_pf = AnsibleCloudStackPortforwarding(module)
         state = module.params.get('state')
-        if state in ['absent']:
+        if module.params.get('rules') is not None:
+            acs_pf.ensure_portforwarding_rules(state)
+            pf_rule = None
+        elif state in ['absent']:
             pf_rule = acs_pf.absent_portforwarding_rule()
         else:
             pf_rule = acs_pf.present_portforwarding_rule()
@@ -122,6 +122,13 @@ options:
       - Poll async jobs until job has finished.
     required: false
     default: true
+  page_size:
+    description:
+      - Number of items requested per page when volumes are listed page by page.
+      - If not set, the default page size of the server is used.
+    required: false
+    default: null
+    version_added: "2.1"
 extends_documentation_fragment: cloudstack
 '''
 
@@ -240,6 +247,35 @@ except ImportError:
 from ansible.module_utils.cloudstack import *
 
 
+# Deliberate copy of iter_listing in cs_instance, keep both in sync. Modules
+# only share code through module_utils/cloudstack, which is not in this repo.
+def iter_listing(cs_func, key, page_size=None, **args):
+    '''
+    Yields the items of a list API call page by page, until a page comes back
+    shorter than the page size. Without `page_size` the first page is listed
+    with the default page size of the server, which is used for the next pages
+    if the count of the response shows the listing was cut off.
+    '''
+    page = 1
+    if page_size:
+        args['pagesize'] = page_size
+        args['page'] = page
+    while True:
+        res = cs_func(**args) or {}
+        items = res.get(key) or []
+        for item in items:
+            yield item
+        if not page_size:
+            if not items or res.get('count', 0) <= len(items):
+                break
+            page_size = len(items)
+            args['pagesize'] = page_size
+        elif len(items) < page_size:
+            break
+        page += 1
+        args['page'] = page
+
+
 class AnsibleCloudStackVolume(AnsibleCloudStack):
 
     def __init__(self, module):
@@ -279,13 +315,13 @@ class AnsibleCloudStackVolume(AnsibleCloudStack):
             args['displayvolume'] = self.module.params.get('display_volume')
             args['type'] = 'DATADISK'
 
-            volumes = self.cs.listVolumes(**args)
-            if volumes:
-                volume_name = self.module.params.get('name')
-                for v in volumes['volume']:
-                    if volume_name.lower() == v['name'].lower():
-                        self.volume = v
-                        break
+            # The name filter is a substring match, the result is narrowed here.
+            volume_name = self.module.params.get('name')
+            args['name'] = volume_name
+            for v in iter_listing(self.cs.listVolumes, 'volume', self.module.params.get('page_size'), **args):
+                if volume_name.lower() == v['name'].lower():
+                    self.volume = v
+                    break
         return self.volume
 
 
@@ -458,6 +494,7 @@ def main():
         account = dict(default=None),
         project = dict(default=None),
         poll_async = dict(type='bool', default=True),
+        page_size = dict(type='int', default=None),
     ))
 
     module = AnsibleModule(
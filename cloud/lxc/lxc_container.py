@@ -30,8 +30,27 @@ author: "Kevin Carter (@cloudnull)"
 options:
     name:
         description:
-          - Name of a container.
-        required: true
+          - Name of a container. Either I(name) or I(names) is required.
+        required: false
+    names:
+        version_added: "2.1"
+        description:
+          - List of containers to manage concurrently, all with the same
+            options. Can not be used with I(lv_name) or I(clone_name), the
+            logical volume of each container is named after it. The result
+            holds the data of each container in "lxc_containers" instead of
+            "lxc_container".
+        required: false
+    parallelism:
+        version_added: "2.1"
+        description:
+          - Number of containers from I(names) managed at the same time.
+            Each container is managed in its own worker process, as the
+            commands run for a container change the process environment
+            and working directory. Set to 1 to manage the containers one
+            after another.
+        required: false
+        default: 4
     backing_store:
         choices:
           - dir
@@ -150,10 +169,27 @@ options:
           - gzip
           - bzip2
           - none
+          - pigz
+          - pxz
+          - zstd
         description:
           - Type of compression to use when creating an archive of a running
-            container.
+            container. C(pigz), C(pxz) and C(zstd) compress with all the
+            available CPU cores and require the matching program on the host.
         default: gzip
+    archive_mode:
+        version_added: "2.1"
+        choices:
+          - copy
+          - stream
+        description:
+          - How the archive is created. C(copy) first copies the container
+            to a temporary directory with rsync and archives the copy.
+            C(stream) archives the container directory directly while the
+            container is frozen, or the mounted snapshot for LVM and
+            overlayfs backed containers, without a staging copy. Containers
+            on other backing stores are always copied.
+        default: copy
     state:
         choices:
           - started
@@ -194,6 +230,12 @@ notes:
     tarball of the running container. The "archive" option supports LVM backed
     containers and will create a snapshot of the running container when
     creating the archive.
+  - When an archive is created the result contains its size in bytes as
+    "archive_size", the time taken to create it in seconds as
+    "archive_duration" and the archive bytes written per second as
+    "archive_throughput".
+  - State changes are awaited with the lxc bindings when they support it,
+    otherwise the container state is polled at a growing interval.
   - If your distro does not have a package for "python2-lxc", which is a
     requirement for this module, it can be installed from source at
     "https://github.com/lxc/python2-lxc" or installed via pip using the package
@@ -227,6 +269,17 @@ EXAMPLES = """
     container_command: |
       echo 'hello world.' | tee /opt/started-frozen
 
+- name: Create several started containers, two at a time
+  lxc_container:
+    names:
+      - test-container-web1
+      - test-container-web2
+      - test-container-web3
+    parallelism: 2
+    template: ubuntu
+    state: started
+    template_options: --release trusty
+
 # Create filesystem container, configure it, and archive it, and start it.
 - name: Create filesystem container
   lxc_container:
@@ -316,6 +369,16 @@ EXAMPLES = """
     archive: true
     archive_path: /opt/archives
 
+# Stream an archive of a container straight into zstd running on all cores,
+# without copying the container to a staging directory first.
+- name: Create a zstd compressed archive of a container
+  lxc_container:
+    name: test-container-existing
+    archive: true
+    archive_mode: stream
+    archive_compression: zstd
+    archive_path: /opt/archives
+
 # Create a container using overlayfs, create an archive of it, create a
 # snapshot clone of the container and and finally leave the container
 # in a frozen state. The container archive will be compressed using gzip.
@@ -381,6 +444,7 @@ EXAMPLES = """
     - test-container-new-archive-destroyed-clone
 """
 
+import multiprocessing
 
 try:
     import lxc
@@ -391,7 +455,8 @@ else:
 
 
 # LXC_COMPRESSION_MAP is a map of available compression types when creating
-# an archive of a container.
+# an archive of a container. Types with a "program" are compressed by that
+# external, multi-threaded, compressor.
 LXC_COMPRESSION_MAP = {
     'gzip': {
         'extension': 'tar.tgz',
@@ -404,6 +469,21 @@ LXC_COMPRESSION_MAP = {
     'none': {
         'extension': 'tar',
         'argument': '-cf'
+    },
+    'pigz': {
+        'extension': 'tar.tgz',
+        'argument': '-cf',
+        'program': ['pigz']
+    },
+    'pxz': {
+        'extension': 'tar.xz',
+        'argument': '-cf',
+        'program': ['pxz']
+    },
+    'zstd': {
+        'extension': 'tar.zst',
+        'argument': '-cf',
+        'program': ['zstd', '-T0']
     }
 }
 
@@ -482,6 +562,12 @@ LXC_ANSIBLE_STATES = {
 }
 
 
+# LXC_POLL_INTERVAL holds the shortest and longest interval, in seconds,
+# between polls of a container state when the lxc bindings can not wait for
+# a state themselves. The interval doubles after every poll.
+LXC_POLL_INTERVAL = (0.1, 2)
+
+
 # This is used to attach to a running container and execute commands from
 # within the container on the host.  This will provide local access to a
 # container without using SSH.  The template will attempt to work within the
@@ -556,6 +642,65 @@ def create_script(command):
         os.remove(script_file)
 
 
+def poll_intervals(timeout):
+    """Yield the intervals to sleep between polls until a timeout passes.
+
+    :param timeout: Time in seconds before polling is abandoned.
+    :type timeout: ``int``
+    """
+
+    interval, max_interval = LXC_POLL_INTERVAL
+    deadline = time.time() + timeout
+    while True:
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            return
+        yield min(interval, remaining)
+        interval = min(interval * 2, max_interval)
+
+
+class _LxcContainerFailure(Exception):
+    """A failure managing one of several containers."""
+
+    def __init__(self, result):
+        Exception.__init__(self, result.get('msg'))
+        self.result = result
+
+
+class _ContainerModule(object):
+    def __init__(self, module, name):
+        """View of the Ansible Module for one of several containers.
+
+        Internal to ``manage_containers``. The parameters are copied with
+        the container name set and failures raise ``_LxcContainerFailure``
+        instead of exiting, so that the other containers can still be
+        managed.
+
+        :param module: Processed Ansible Module.
+        :type module: ``object``
+        :param name: Name of the container.
+        :type name: ``str``
+        """
+        self.module = module
+        self.params = module.params.copy()
+        self.params['name'] = name
+        self.params['lv_name'] = name
+
+    def __getattr__(self, attr):
+        return getattr(self.module, attr)
+
+    def get_bin_path(self, arg, required=False, opt_dirs=[]):
+        bin_path = self.module.get_bin_path(arg, False, opt_dirs)
+        if required and bin_path is None:
+            self.fail_json(
+                msg='Failed to find required executable %s' % arg
+            )
+        return bin_path
+
+    def fail_json(self, **kwargs):
+        raise _LxcContainerFailure(kwargs)
+
+
 class LxcContainerManagement(object):
     def __init__(self, module):
         """Management of LXC containers via Ansible.
@@ -923,6 +1068,34 @@ class LxcContainerManagement(object):
             self.container.attach_wait(create_script, container_command)
             self.state_change = True
 
+    def _wait_for_state(self, state, timeout=60):
+        """Wait for a container to reach a state.
+
+        The lxc bindings are used to wait for the state when they can,
+        otherwise the state is polled at an interval growing from the first
+        to the last value of ``LXC_POLL_INTERVAL``.
+
+        :param state: State to wait for, such as "running".
+        :type state: ``str``
+        :param timeout: Time before the wait is abandoned.
+        :type timeout: ``int``
+        :returns: True or False based on if the state was reached.
+        :rtype: ``bol``
+        """
+
+        if self._get_state() == state:
+            return True
+
+        if hasattr(self.container, 'wait'):
+            return self.container.wait(state.upper(), int(timeout))
+
+        for interval in poll_intervals(timeout):
+            time.sleep(interval)
+            if self._get_state() == state:
+                return True
+        else:
+            return False
+
     def _container_startup(self, timeout=60):
         """Ensure a container is started.
 
@@ -931,14 +1104,12 @@ class LxcContainerManagement(object):
         """
 
         self.container = self.get_container_bind()
-        for _ in xrange(timeout):
-            if self._get_state() != 'running':
-                self.container.start()
-                self.state_change = True
-                # post startup sleep for 1 second.
-                time.sleep(1)
-            else:
-                return True
+        if self._get_state() != 'running':
+            self.container.start()
+            self.state_change = True
+
+        if self._wait_for_state('running', timeout):
+            return True
         else:
             self.failure(
                 lxc_container=self._container_data(),
@@ -957,8 +1128,19 @@ class LxcContainerManagement(object):
         """
 
         if self.module.params.get('archive') in BOOLEANS_TRUE:
+            start_time = time.time()
+            archive_name = self._container_create_tar()
+            duration = time.time() - start_time
+            archive_size = os.path.getsize(archive_name)
+            if duration > 0:
+                throughput = int(archive_size / duration)
+            else:
+                throughput = archive_size
             self.archive_info = {
-                'archive': self._container_create_tar()
+                'archive': archive_name,
+                'archive_size': archive_size,
+                'archive_duration': round(duration, 2),
+                'archive_throughput': throughput
             }
 
     def _check_clone(self):
@@ -985,7 +1167,7 @@ class LxcContainerManagement(object):
         :type timeout: ``int``
         """
 
-        for _ in xrange(timeout):
+        for interval in poll_intervals(timeout):
             if not self._container_exists(container_name=self.container_name):
                 break
 
@@ -1001,10 +1183,11 @@ class LxcContainerManagement(object):
 
             if self.container.destroy():
                 self.state_change = True
+            else:
+                # wait before the next destroy attempt.
+                time.sleep(interval)
 
-            # post destroy attempt sleep for 1 second.
-            time.sleep(1)
-        else:
+        if self._container_exists(container_name=self.container_name):
             self.failure(
                 lxc_container=self._container_data(),
                 error='Failed to destroy container'
@@ -1015,148 +1198,138 @@ class LxcContainerManagement(object):
                     ' functional state.' % self.container_name
             )
 
-    def _frozen(self, count=0):
-        """Ensure a container is frozen.
-
-        If the container does not exist the container will be created.
+    def _ensure_exists(self, method):
+        """Create a container if it does not exist.
 
-        :param count: number of times this command has been called by itself.
-        :type count: ``int``
+        :param method: Name of the operation requiring the container.
+        :type method: ``str``
         """
 
-        self.check_count(count=count, method='frozen')
         if self._container_exists(container_name=self.container_name):
-            self._execute_command()
+            return
 
-            # Perform any configuration updates
-            self._config()
+        self._create()
+        if self._container_exists(container_name=self.container_name):
+            self.container = self.get_container_bind()
+        else:
+            self.failure(
+                error='Failed to %s container' % method,
+                rc=1,
+                msg='The container [ %s ] failed to %s. Check to lxc is'
+                    ' available and that the container is in a functional'
+                    ' state.' % (self.container_name, method)
+            )
 
-            container_state = self._get_state()
-            if container_state == 'frozen':
-                pass
-            elif container_state == 'running':
-                self.container.freeze()
-                self.state_change = True
-            else:
-                self._container_startup()
-                self.container.freeze()
-                self.state_change = True
+    def _frozen(self):
+        """Ensure a container is frozen.
 
-            # Check if the container needs to have an archive created.
-            self._check_archive()
+        If the container does not exist the container will be created.
+        """
 
-            # Check if the container is to be cloned
-            self._check_clone()
+        self._ensure_exists(method='frozen')
+        self._execute_command()
+
+        # Perform any configuration updates
+        self._config()
+
+        container_state = self._get_state()
+        if container_state == 'frozen':
+            pass
+        elif container_state == 'running':
+            self.container.freeze()
+            self.state_change = True
         else:
-            self._create()
-            count += 1
-            self._frozen(count)
+            self._container_startup()
+            self.container.freeze()
+            self.state_change = True
+
+        # Check if the container needs to have an archive created.
+        self._check_archive()
 
-    def _restarted(self, count=0):
+        # Check if the container is to be cloned
+        self._check_clone()
+
+    def _restarted(self):
         """Ensure a container is restarted.
 
         If the container does not exist the container will be created.
-
-        :param count: number of times this command has been called by itself.
-        :type count: ``int``
         """
 
-        self.check_count(count=count, method='restart')
-        if self._container_exists(container_name=self.container_name):
-            self._execute_command()
+        self._ensure_exists(method='restart')
+        self._execute_command()
 
-            # Perform any configuration updates
-            self._config()
+        # Perform any configuration updates
+        self._config()
 
-            if self._get_state() != 'stopped':
-                self.container.stop()
-                self.state_change = True
+        if self._get_state() != 'stopped':
+            self.container.stop()
+            self.state_change = True
 
-            # Run container startup
-            self._container_startup()
+        # Run container startup
+        self._container_startup()
 
-            # Check if the container needs to have an archive created.
-            self._check_archive()
+        # Check if the container needs to have an archive created.
+        self._check_archive()
 
-            # Check if the container is to be cloned
-            self._check_clone()
-        else:
-            self._create()
-            count += 1
-            self._restarted(count)
+        # Check if the container is to be cloned
+        self._check_clone()
 
-    def _stopped(self, count=0):
+    def _stopped(self):
         """Ensure a container is stopped.
 
         If the container does not exist the container will be created.
-
-        :param count: number of times this command has been called by itself.
-        :type count: ``int``
         """
 
-        self.check_count(count=count, method='stop')
-        if self._container_exists(container_name=self.container_name):
-            self._execute_command()
+        self._ensure_exists(method='stop')
+        self._execute_command()
 
-            # Perform any configuration updates
-            self._config()
+        # Perform any configuration updates
+        self._config()
 
-            if self._get_state() != 'stopped':
-                self.container.stop()
-                self.state_change = True
+        if self._get_state() != 'stopped':
+            self.container.stop()
+            self.state_change = True
 
-            # Check if the container needs to have an archive created.
-            self._check_archive()
+        # Check if the container needs to have an archive created.
+        self._check_archive()
 
-            # Check if the container is to be cloned
-            self._check_clone()
-        else:
-            self._create()
-            count += 1
-            self._stopped(count)
+        # Check if the container is to be cloned
+        self._check_clone()
 
-    def _started(self, count=0):
+    def _started(self):
         """Ensure a container is started.
 
         If the container does not exist the container will be created.
-
-        :param count: number of times this command has been called by itself.
-        :type count: ``int``
         """
 
-        self.check_count(count=count, method='start')
-        if self._container_exists(container_name=self.container_name):
-            container_state = self._get_state()
-            if container_state == 'running':
-                pass
-            elif container_state == 'frozen':
-                self._unfreeze()
-            elif not self._container_startup():
-                self.failure(
-                    lxc_container=self._container_data(),
-                    error='Failed to start container'
-                          ' [ %s ]' % self.container_name,
-                    rc=1,
-                    msg='The container [ %s ] failed to start. Check to lxc is'
-                        ' available and that the container is in a functional'
-                        ' state.' % self.container_name
-                )
+        self._ensure_exists(method='start')
+        container_state = self._get_state()
+        if container_state == 'running':
+            pass
+        elif container_state == 'frozen':
+            self._unfreeze()
+        elif not self._container_startup():
+            self.failure(
+                lxc_container=self._container_data(),
+                error='Failed to start container'
+                      ' [ %s ]' % self.container_name,
+                rc=1,
+                msg='The container [ %s ] failed to start. Check to lxc is'
+                    ' available and that the container is in a functional'
+                    ' state.' % self.container_name
+            )
 
-            # Return data
-            self._execute_command()
+        # Return data
+        self._execute_command()
 
-            # Perform any configuration updates
-            self._config()
+        # Perform any configuration updates
+        self._config()
 
-            # Check if the container needs to have an archive created.
-            self._check_archive()
+        # Check if the container needs to have an archive created.
+        self._check_archive()
 
-            # Check if the container is to be cloned
-            self._check_clone()
-        else:
-            self._create()
-            count += 1
-            self._started(count)
+        # Check if the container is to be cloned
+        self._check_clone()
 
     def _get_lxc_vg(self):
         """Return the name of the Volume Group used in LXC."""
@@ -1324,11 +1497,15 @@ class LxcContainerManagement(object):
                     % (vg, lv_name, mount_point)
             )
 
-    def _create_tar(self, source_dir):
+    def _create_tar(self, source_dir, rootfs_parent=None):
         """Create an archive of a given ``source_dir`` to ``output_path``.
 
         :param source_dir:  Path to the directory to be archived.
         :type source_dir: ``str``
+        :param rootfs_parent: Path of a directory holding a ``rootfs``
+                              directory to add to the archive, such as a
+                              mounted snapshot.
+        :type rootfs_parent: ``str``
         """
 
         archive_path = self.module.params.get('archive_path')
@@ -1351,11 +1528,35 @@ class LxcContainerManagement(object):
             self.module.get_bin_path('tar', True),
             '--directory=%s' % os.path.realpath(
                 os.path.expanduser(source_dir)
-            ),
+            )
+        ]
+        if 'program' in compression_type:
+            program = [
+                self.module.get_bin_path(compression_type['program'][0], True)
+            ]
+            program.extend(compression_type['program'][1:])
+            build_command.append(
+                "--use-compress-program='%s'" % ' '.join(program)
+            )
+        if rootfs_parent:
+            # The rootfs is taken from rootfs_parent, leave out the mount
+            # point and the overlayfs upper directory found in source_dir.
+            # Anchored patterns do not match the "rootfs" member added below.
+            build_command.extend([
+                '--anchored',
+                '--exclude=./rootfs',
+                '--exclude=./delta0'
+            ])
+        build_command.extend([
             compression_type['argument'],
             archive_name,
             '.'
-        ]
+        ])
+        if rootfs_parent:
+            build_command.extend([
+                '--directory=%s' % rootfs_parent,
+                'rootfs'
+            ])
 
         rc, stdout, err = self._run_command(
             build_command=build_command,
@@ -1483,12 +1684,15 @@ class LxcContainerManagement(object):
         The process is as follows:
             * Stop or Freeze the container
             * Create temporary dir
-            * Copy container and config to temporary directory
+            * Copy container and config to temporary directory, unless
+              streaming the archive
             * If LVM backed:
                 * Create LVM snapshot of LV backing the container
                 * Mount the snapshot to tmpdir/rootfs
+                * When streaming, restore the state of the container
+            * Create tar of tmpdir, or of the container directory and the
+              mounted rootfs when streaming
             * Restore the state of the container
-            * Create tar of tmpdir
             * Clean up
         """
 
@@ -1507,7 +1711,23 @@ class LxcContainerManagement(object):
         # Test if the container is using overlayfs
         overlayfs_backed = lxc_rootfs.startswith('overlayfs')
 
-        mount_point = os.path.join(work_dir, 'rootfs')
+        # The container directory holds the config and, when directory
+        # backed, the rootfs
+        container_dir = os.path.dirname(self.container.config_file_name)
+
+        # Directory backed containers can be archived in place
+        dir_backed = not (block_backed or overlayfs_backed) and \
+            os.path.dirname(os.path.normpath(lxc_rootfs)) == container_dir
+
+        # Stream the container data into the archive instead of copying it
+        # to the temp dir first, where the backing store allows it
+        stream = self.module.params.get('archive_mode') == 'stream' and \
+            (block_backed or overlayfs_backed or dir_backed)
+
+        if stream:
+            mount_point = os.path.join(temp_dir, 'rootfs')
+        else:
+            mount_point = os.path.join(work_dir, 'rootfs')
 
         # Set the snapshot name if needed
         snapshot_name = '%s_lxc_snapshot' % self.container_name
@@ -1522,7 +1742,8 @@ class LxcContainerManagement(object):
                     self.container.stop()
 
             # Sync the container data from the container_path to work_dir
-            self._rsync_data(lxc_rootfs, temp_dir)
+            if not stream:
+                self._rsync_data(lxc_rootfs, temp_dir)
 
             if block_backed:
                 if snapshot_name not in self._lvm_lv_list():
@@ -1544,6 +1765,11 @@ class LxcContainerManagement(object):
                         lv_name=snapshot_name,
                         mount_point=mount_point
                     )
+
+                    # The snapshot is consistent, the container can resume
+                    # while it is archived
+                    if stream:
+                        self._restore_state(container_state)
                 else:
                     self.failure(
                         err='snapshot [ %s ] already exists' % snapshot_name,
@@ -1553,6 +1779,8 @@ class LxcContainerManagement(object):
                             % snapshot_name
                     )
             elif overlayfs_backed:
+                if stream and not os.path.exists(mount_point):
+                    os.makedirs(mount_point)
                 lowerdir, upperdir = lxc_rootfs.split(':')[1:]
                 self._overlayfs_mount(
                     lowerdir=lowerdir,
@@ -1562,7 +1790,16 @@ class LxcContainerManagement(object):
 
             # Set the state as changed and set a new fact
             self.state_change = True
-            return self._create_tar(source_dir=work_dir)
+            if not stream:
+                return self._create_tar(source_dir=work_dir)
+            if dir_backed:
+                return self._create_tar(source_dir=container_dir)
+            else:
+                # The rootfs comes from the mounted snapshot
+                return self._create_tar(
+                    source_dir=container_dir,
+                    rootfs_parent=temp_dir
+                )
         finally:
             if block_backed or overlayfs_backed:
                 # unmount snapshot
@@ -1573,24 +1810,24 @@ class LxcContainerManagement(object):
                 self._lvm_lv_remove(snapshot_name)
 
             # Restore original state of container
-            if container_state == 'running':
-                if self._get_state() == 'frozen':
-                    self.container.unfreeze()
-                else:
-                    self.container.start()
+            self._restore_state(container_state)
 
             # Remove tmpdir
             shutil.rmtree(temp_dir)
 
-    def check_count(self, count, method):
-        if count > 1:
-            self.failure(
-                error='Failed to %s container' % method,
-                rc=1,
-                msg='The container [ %s ] failed to %s. Check to lxc is'
-                    ' available and that the container is in a functional'
-                    ' state.' % (self.container_name, method)
-            )
+    def _restore_state(self, container_state):
+        """Restore the state of a container stopped or frozen for archiving.
+
+        :param container_state: State of the container before archiving.
+        :type container_state: ``str``
+        """
+
+        if container_state == 'running':
+            current_state = self._get_state()
+            if current_state == 'frozen':
+                self.container.unfreeze()
+            elif current_state != 'running':
+                self.container.start()
 
     def failure(self, **kwargs):
         """Return a Failure when running an Ansible command.
@@ -1602,8 +1839,12 @@ class LxcContainerManagement(object):
 
         self.module.fail_json(**kwargs)
 
-    def run(self):
-        """Run the main method."""
+    def manage(self):
+        """Ensure the requested state of the container.
+
+        :returns: Data of the container, with any archive and clone details.
+        :rtype: ``dict``
+        """
 
         action = getattr(self, LXC_ANSIBLE_STATES[self.state])
         action()
@@ -1615,20 +1856,112 @@ class LxcContainerManagement(object):
         if self.clone_info:
             outcome.update(self.clone_info)
 
+        return outcome
+
+    def run(self):
+        """Run the main method."""
+
+        outcome = self.manage()
         self.module.exit_json(
             changed=self.state_change,
             lxc_container=outcome
         )
 
 
+# The module managing several containers, inherited by the worker processes
+# of manage_containers.
+_MANAGED_MODULE = None
+
+
+def _manage_container(name):
+    """Manage one of several containers in a worker process.
+
+    :param name: Name of the container.
+    :type name: ``str``
+    :returns: name, container data, failure and whether it changed.
+    :rtype: ``tuple``
+    """
+
+    lxc_manage = LxcContainerManagement(
+        module=_ContainerModule(module=_MANAGED_MODULE, name=name)
+    )
+    try:
+        return name, lxc_manage.manage(), None, lxc_manage.state_change
+    except _LxcContainerFailure as e:
+        return name, None, e.result, lxc_manage.state_change
+    except Exception as e:
+        return name, None, dict(msg=str(e)), lxc_manage.state_change
+
+
+def manage_containers(module):
+    """Manage several containers concurrently.
+
+    Up to ``parallelism`` containers are managed at the same time, each by
+    its own ``LxcContainerManagement`` in a forked worker process. Commands
+    run for a container change the environment and working directory of
+    the process, so containers are never managed by threads of one process.
+    The module fails once all of the containers have been handled if any
+    of them failed.
+
+    :param module: Processed Ansible Module.
+    :type module: ``object``
+    """
+
+    global _MANAGED_MODULE
+    _MANAGED_MODULE = module
+
+    names = module.params['names']
+    parallelism = max(1, min(module.params['parallelism'], len(names)))
+    if parallelism == 1:
+        results = [_manage_container(name) for name in names]
+    else:
+        pool = multiprocessing.Pool(processes=parallelism)
+        try:
+            results = pool.map(_manage_container, names, 1)
+        finally:
+            pool.close()
+            pool.join()
+
+    containers = dict()
+    failures = dict()
+    changes = []
+    for name, outcome, failure, changed in results:
+        if failure is not None:
+            failures[name] = failure
+        else:
+            containers[name] = outcome
+        if changed:
+            changes.append(name)
+
+    if failures:
+        module.fail_json(
+            changed=bool(changes),
+            lxc_containers=containers,
+            failed_containers=failures,
+            msg='Failed to manage the containers [ %s ]'
+                % ', '.join(sorted(failures))
+        )
+
+    module.exit_json(
+        changed=bool(changes),
+        lxc_containers=containers
+    )
+
+
 def main():
     """Ansible Main module."""
 
     module = AnsibleModule(
         argument_spec=dict(
             name=dict(
-                type='str',
-                required=True
+                type='str'
+            ),
+            names=dict(
+                type='list'
+            ),
+            parallelism=dict(
+                type='int',
+                default=4
             ),
             template=dict(
                 type='str',
@@ -1710,8 +2043,18 @@ def main():
             archive_compression=dict(
                 choices=LXC_COMPRESSION_MAP.keys(),
                 default='gzip'
+            ),
+            archive_mode=dict(
+                choices=['copy', 'stream'],
+                default='copy'
             )
         ),
+        required_one_of=[['name', 'names']],
+        mutually_exclusive=[
+            ['name', 'names'],
+            ['names', 'lv_name'],
+            ['names', 'clone_name']
+        ],
         supports_check_mode=False,
     )
 
@@ -1720,6 +2063,9 @@ def main():
             msg='The `lxc` module is not importable. Check the requirements.'
         )
 
+    if module.params.get('names'):
+        manage_containers(module)
+
     lv_name = module.params.get('lv_name')
     if not lv_name:
         module.params['lv_name'] = module.params.get('name')
@@ -35,6 +35,8 @@ options:
       - Note that there may be some lag for state requests like C(shutdown)
         since these refer only to VM states. After starting a guest, it may not
         be immediately accessible.
+      - With the C(list_vms) and C(info) commands, only the guests in this
+        state are returned.
     required: false
     choices: [ "running", "shutdown", "destroyed", "paused" ]
     default: "no"
@@ -72,6 +74,7 @@ EXAMPLES = '''
 ansible host -m virt -a "name=alpha command=status"
 ansible host -m virt -a "name=alpha command=get_xml"
 ansible host -m virt -a "name=alpha command=create uri=lxc:///"
+ansible host -m virt -a "command=info state=running"
 
 # a playbook example of defining and launching an LXC guest
 tasks:
@@ -114,6 +117,9 @@ VIRT_STATE_NAME_MAP = {
    6 : "crashed"
 }
 
+# states of the VIRT_STATE_NAME_MAP only active domains can be in
+ACTIVE_STATES = ['running', 'paused']
+
 class VMNotFound(Exception):
     pass
 
@@ -135,35 +141,137 @@ class LibvirtConnection(object):
             raise Exception("hypervisor connection failure")
 
         self.conn = conn
+        # domains by name and by UUID, filled in as they are looked up
+        self.domains = {}
+        # all domains of the hypervisor, once listed
+        self.all_domains = None
 
-    def find_vm(self, vmid):
+    def list_domains(self):
         """
-        Extra bonus feature: vmid = -1 returns a list of everything
+        List all domains with a single listAllDomains call when the libvirt
+        bindings provide it, and index them by name and UUID.
         """
+        if self.all_domains is not None:
+            return self.all_domains
+
         conn = self.conn
 
-        vms = []
+        if hasattr(conn, 'listAllDomains'):
+            vms = conn.listAllDomains(0)
+        else:
+            vms = []
+            # this block of code borrowed from virt-manager:
+            # get working domain's name
+            ids = conn.listDomainsID()
+            for id in ids:
+                vm = conn.lookupByID(id)
+                vms.append(vm)
+            # get defined domain
+            names = conn.listDefinedDomains()
+            for name in names:
+                vm = conn.lookupByName(name)
+                vms.append(vm)
 
-        # this block of code borrowed from virt-manager:
-        # get working domain's name
-        ids = conn.listDomainsID()
-        for id in ids:
-            vm = conn.lookupByID(id)
-            vms.append(vm)
-        # get defined domain
-        names = conn.listDefinedDomains()
-        for name in names:
-            vm = conn.lookupByName(name)
-            vms.append(vm)
+        for vm in vms:
+            self.index_domain(vm)
+        self.all_domains = vms
+        return vms
 
-        if vmid == -1:
+    def list_domains_in_state(self, state=None):
+        """
+        List all domains, leaving out the inactive ones when only active
+        domains can be in the given state.
+        """
+        if state in ACTIVE_STATES and hasattr(self.conn, 'listAllDomains'):
+            vms = self.conn.listAllDomains(libvirt.VIR_CONNECT_LIST_DOMAINS_ACTIVE)
+            for vm in vms:
+                self.index_domain(vm)
             return vms
+        return self.list_domains()
 
-        for vm in vms:
-            if vm.name() == vmid:
-                return vm
+    def get_all_info(self, state=None, state_only=False):
+        """
+        Return (domain, info) pairs for all domains that may be in the given
+        state, info being the [state, maxMem, memory, nrVirtCpu, cpuTime]
+        list of virDomain.info(). With state_only, only info[0] is set.
+        Everything is fetched with a single getAllDomainStats call when the
+        libvirt bindings provide it.
+        """
+        if not hasattr(self.conn, 'getAllDomainStats'):
+            result = []
+            for vm in self.list_domains_in_state(state):
+                try:
+                    result.append((vm, vm.info()))
+                except libvirt.libvirtError:
+                    # the domain went away since it was listed
+                    pass
+            return result
+
+        stats = libvirt.VIR_DOMAIN_STATS_STATE
+        if not state_only:
+            stats |= libvirt.VIR_DOMAIN_STATS_CPU_TOTAL | \
+                     libvirt.VIR_DOMAIN_STATS_BALLOON | \
+                     libvirt.VIR_DOMAIN_STATS_VCPU
+        flags = 0
+        if state in ACTIVE_STATES:
+            flags = libvirt.VIR_CONNECT_GET_ALL_DOMAINS_STATS_ACTIVE
+
+        result = []
+        for vm, record in self.conn.getAllDomainStats(stats, flags):
+            self.index_domain(vm)
+            if state_only:
+                data = [record['state.state'], None, None, None, None]
+            else:
+                try:
+                    data = [record['state.state'],
+                            record['balloon.maximum'],
+                            record['balloon.current'],
+                            record['vcpu.current'],
+                            record.get('cpu.time', 0)]
+                except KeyError:
+                    # hypervisor drivers that do not report these stats
+                    data = vm.info()
+            result.append((vm, data))
+        return result
+
+    def get_autostart_names(self):
+        """
+        Return the names of all autostarted domains with a single call, or
+        None when the libvirt bindings can not list them at once.
+        """
+        if not hasattr(self.conn, 'listAllDomains'):
+            return None
+        vms = self.conn.listAllDomains(libvirt.VIR_CONNECT_LIST_DOMAINS_AUTOSTART)
+        return set([vm.name() for vm in vms])
+
+    def index_domain(self, vm):
+        self.domains[vm.name()] = vm
+        self.domains[vm.UUIDString()] = vm
+
+    def find_vm(self, vmid):
+        """
+        Extra bonus feature: vmid = -1 returns a list of everything
+        """
+        if vmid == -1:
+            return self.list_domains()
+
+        if vmid in self.domains:
+            return self.domains[vmid]
+        if self.all_domains is not None:
+            raise VMNotFound("virtual machine %s not found" % vmid)
+
+        try:
+            vm = self.conn.lookupByName(vmid)
+        except libvirt.libvirtError, e:
+            if e.get_error_code() != libvirt.VIR_ERR_NO_DOMAIN:
+                raise
+            try:
+                vm = self.conn.lookupByUUIDString(vmid)
+            except libvirt.libvirtError:
+                raise VMNotFound("virtual machine %s not found" % vmid)
 
-        raise VMNotFound("virtual machine %s not found" % vmid)
+        self.index_domain(vm)
+        return vm
 
     def shutdown(self, vmid):
         return self.find_vm(vmid).shutdown()
@@ -187,7 +295,13 @@ class LibvirtConnection(object):
         return self.find_vm(vmid).destroy()
 
     def undefine(self, vmid):
-        return self.find_vm(vmid).undefine()
+        vm = self.find_vm(vmid)
+        res = vm.undefine()
+        self.domains.pop(vm.name(), None)
+        self.domains.pop(vm.UUIDString(), None)
+        if self.all_domains is not None:
+            self.all_domains.remove(vm)
+        return res
 
     def get_status2(self, vm):
         state = vm.info()[0]
@@ -204,30 +318,34 @@ class LibvirtConnection(object):
         return self.conn.getType()
 
     def get_xml(self, vmid):
-        vm = self.conn.lookupByName(vmid)
+        vm = self.find_vm(vmid)
         return vm.XMLDesc(0)
 
     def get_maxVcpus(self, vmid):
-        vm = self.conn.lookupByName(vmid)
+        vm = self.find_vm(vmid)
         return vm.maxVcpus()
 
     def get_maxMemory(self, vmid):
-        vm = self.conn.lookupByName(vmid)
+        vm = self.find_vm(vmid)
         return vm.maxMemory()
 
     def getFreeMemory(self):
         return self.conn.getFreeMemory()
 
     def get_autostart(self, vmid):
-        vm = self.conn.lookupByName(vmid)
+        vm = self.find_vm(vmid)
         return vm.autostart()
 
     def set_autostart(self, vmid, val):
-        vm = self.conn.lookupByName(vmid)
+        vm = self.find_vm(vmid)
         return vm.setAutostart(val)
 
     def define_from_xml(self, xml):
-        return self.conn.defineXML(xml)
+        vm = self.conn.defineXML(xml)
+        self.index_domain(vm)
+        if self.all_domains is not None:
+            self.all_domains.append(vm)
+        return vm
 
 
 class Virt(object):
@@ -237,7 +355,9 @@ class Virt(object):
         self.uri = uri
 
     def __get_conn(self):
-        self.conn = LibvirtConnection(self.uri, self.module)
+        # one connection, and thus one domain index, per module run
+        if getattr(self, 'conn', None) is None:
+            self.conn = LibvirtConnection(self.uri, self.module)
         return self.conn
 
     def get_vm(self, vmid):
@@ -252,24 +372,31 @@ class Virt(object):
             state.append("%s %s" % (vm,state_blurb))
         return state
 
-    def info(self):
-        vms = self.list_vms()
+    def info(self, state=None):
+        self.__get_conn()
+        autostart = self.conn.get_autostart_names()
         info = dict()
-        for vm in vms:
-            data = self.conn.find_vm(vm).info()
+        for vm, data in self.conn.get_all_info(state):
+            vm_state = VIRT_STATE_NAME_MAP.get(data[0],"unknown")
+            if state and vm_state != state:
+                continue
+            name = vm.name()
             # libvirt returns maxMem, memory, and cpuTime as long()'s, which
             # xmlrpclib tries to convert to regular int's during serialization.
             # This throws exceptions, so convert them to strings here and
             # assume the other end of the xmlrpc connection can figure things
             # out or doesn't care.
-            info[vm] = {
-                "state"     : VIRT_STATE_NAME_MAP.get(data[0],"unknown"),
+            info[name] = {
+                "state"     : vm_state,
                 "maxMem"    : str(data[1]),
                 "memory"    : str(data[2]),
                 "nrVirtCpu" : data[3],
                 "cpuTime"   : str(data[4]),
             }
-            info[vm]["autostart"] = self.conn.get_autostart(vm)
+            if autostart is None:
+                info[name]["autostart"] = vm.autostart()
+            else:
+                info[name]["autostart"] = int(name in autostart)
 
         return info
 
@@ -291,18 +418,14 @@ class Virt(object):
 
     def list_vms(self, state=None):
         self.conn = self.__get_conn()
-        vms = self.conn.find_vm(-1)
         results = []
-        for x in vms:
-            try:
-                if state:
-                    vmstate = self.conn.get_status2(x)
-                    if vmstate == state:
-                        results.append(x.name())
-                else:
-                    results.append(x.name())
-            except:
-                pass
+        if state:
+            for vm, data in self.conn.get_all_info(state, state_only=True):
+                if VIRT_STATE_NAME_MAP.get(data[0],"unknown") == state:
+                    results.append(vm.name())
+        else:
+            for vm in self.conn.find_vm(-1):
+                results.append(vm.name())
         return results
 
     def virttype(self):
@@ -408,8 +531,8 @@ def core(module):
     v = Virt(uri, module)
     res = {}
 
-    if state and command=='list_vms':
-        res = v.list_vms(state=state)
+    if state and command in ('list_vms', 'info'):
+        res = getattr(v, command)(state=state)
         if type(res) != dict:
             res = { command: res }
         return VIRT_SUCCESS, res
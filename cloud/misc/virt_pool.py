@@ -71,6 +71,31 @@ options:
         choices: [ 'new', 'repair', 'resize', 'no_overwrite', 'overwrite', 'normal', 'zeroed' ]
         description:
             - Pass additional parameters to 'build' or 'delete' commands.
+    list_volumes:
+        required: false
+        default: "yes"
+        choices: ["yes", "no"]
+        version_added: "2.1"
+        description:
+            - Whether the C(facts) and C(info) commands list the volume names
+              of active pools. The volume count is returned in any case.
+    volume_offset:
+        required: false
+        default: 0
+        version_added: "2.1"
+        description:
+            - Number of volume names, in sorted order, to skip for each pool
+              when listing volumes. Must be 0 or greater.
+    volume_limit:
+        required: false
+        default: 0
+        version_added: "2.1"
+        description:
+            - Maximum number of volume names returned for each pool when
+              listing volumes, 0 meaning no limit. Use with volume_offset to
+              page through pools with many volumes. Must be 0 or greater.
+            - This only limits the returned result; the full volume list of
+              the pool is still read from libvirt and then sliced.
 requirements:
     - "python >= 2.6"
     - "python-libvirt"
@@ -106,6 +131,12 @@ EXAMPLES = '''
 # Facts will be available as 'ansible_libvirt_pools'
 - virt_pool: command=facts
 
+# Gather facts about storage pools without listing their volumes
+- virt_pool: command=facts list_volumes=no
+
+# Get the second hundred volume names of every pool
+- virt_pool: command=info volume_offset=100 volume_limit=100
+
 # Gather information about pools managed by 'libvirt' remotely using uri
 - virt_pool: command=info uri='{{ item }}'
   with_items: libvirt_uris
@@ -208,30 +239,59 @@ class LibvirtConnection(object):
             raise Exception("hypervisor connection failure")
 
         self.conn = conn
+        # storage pools by name, filled in as they are looked up
+        self.entries = {}
+        # all storage pools, once listed
+        self.all_entries = None
 
-    def find_entry(self, entryid):
-        # entryid = -1 returns a list of everything
+    def list_entries(self):
+        if self.all_entries is not None:
+            return self.all_entries
 
-        results = []
+        if hasattr(self.conn, 'listAllStoragePools'):
+            results = self.conn.listAllStoragePools(0)
+        else:
+            results = []
 
-        # Get active entries
-        for name in self.conn.listStoragePools():
-            entry = self.conn.storagePoolLookupByName(name)
-            results.append(entry)
+            # Get active entries
+            for name in self.conn.listStoragePools():
+                entry = self.conn.storagePoolLookupByName(name)
+                results.append(entry)
 
-        # Get inactive entries
-        for name in self.conn.listDefinedStoragePools():
-            entry = self.conn.storagePoolLookupByName(name)
-            results.append(entry)
+            # Get inactive entries
+            for name in self.conn.listDefinedStoragePools():
+                entry = self.conn.storagePoolLookupByName(name)
+                results.append(entry)
+
+        for entry in results:
+            self.entries[entry.name()] = entry
+        self.all_entries = results
+        return results
 
+    def find_entry(self, entryid):
+        # entryid = -1 returns a list of everything
         if entryid == -1:
-            return results
+            return self.list_entries()
 
-        for entry in results:
-            if entry.name() == entryid:
-                return entry
+        if entryid in self.entries:
+            return self.entries[entryid]
+        if self.all_entries is not None:
+            raise EntryNotFound("storage pool %s not found" % entryid)
+
+        try:
+            entry = self.conn.storagePoolLookupByName(entryid)
+        except libvirt.libvirtError, e:
+            if e.get_error_code() != libvirt.VIR_ERR_NO_STORAGE_POOL:
+                raise
+            raise EntryNotFound("storage pool %s not found" % entryid)
+
+        self.entries[entryid] = entry
+        return entry
 
-        raise EntryNotFound("storage pool %s not found" % entryid)
+    def forget_entry(self, entryid):
+        entry = self.entries.pop(entryid, None)
+        if entry is not None and self.all_entries is not None:
+            self.all_entries.remove(entry)
 
     def create(self, entryid):
         if not self.module.check_mode:
@@ -253,7 +313,9 @@ class LibvirtConnection(object):
 
     def undefine(self, entryid):
         if not self.module.check_mode:
-            return self.find_entry(entryid).undefine()
+            res = self.find_entry(entryid).undefine()
+            self.forget_entry(entryid)
+            return res
         else:
             if not self.find_entry(entryid):
                 return self.module.exit_json(changed=True)
@@ -288,47 +350,42 @@ class LibvirtConnection(object):
     def get_volume_names(self, entryid):
         return self.find_entry(entryid).listVolumes()
 
-    def get_devices(self, entryid):
-        xml = etree.fromstring(self.find_entry(entryid).XMLDesc(0))
-        if xml.xpath('/pool/source/device'):
-            result = []
-            for device in xml.xpath('/pool/source/device'):
-                result.append(device.get('path'))
-        try:
-            return result
-        except:
+    # The following take the parsed XML description of a pool, so that it is
+    # fetched and parsed only once for all of them
+
+    def get_devices(self, xml):
+        result = []
+        for device in xml.xpath('/pool/source/device'):
+            result.append(device.get('path'))
+        if not result:
             raise ValueError('No devices specified')
+        return result
 
-    def get_format(self, entryid):
-        xml = etree.fromstring(self.find_entry(entryid).XMLDesc(0))
+    def get_format(self, xml):
         try:
             result = xml.xpath('/pool/source/format')[0].get('type')
         except:
             raise ValueError('Format not specified')
         return result
 
-    def get_host(self, entryid):
-        xml = etree.fromstring(self.find_entry(entryid).XMLDesc(0))
+    def get_host(self, xml):
         try:
             result = xml.xpath('/pool/source/host')[0].get('name')
         except:
             raise ValueError('Host not specified')
         return result
 
-    def get_source_path(self, entryid):
-        xml = etree.fromstring(self.find_entry(entryid).XMLDesc(0))
+    def get_source_path(self, xml):
         try:
             result = xml.xpath('/pool/source/dir')[0].get('path')
         except:
             raise ValueError('Source path not specified')
         return result
 
-    def get_path(self, entryid):
-        xml = etree.fromstring(self.find_entry(entryid).XMLDesc(0))
+    def get_path(self, xml):
         return xml.xpath('/pool/target/path')[0].text
 
-    def get_type(self, entryid):
-        xml = etree.fromstring(self.find_entry(entryid).XMLDesc(0))
+    def get_type(self, xml):
         return xml.get('type')
 
     def build(self, entryid, flags):
@@ -386,7 +443,11 @@ class LibvirtConnection(object):
 
     def define_from_xml(self, entryid, xml):
         if not self.module.check_mode:
-            return self.conn.storagePoolDefineXML(xml)
+            entry = self.conn.storagePoolDefineXML(xml)
+            self.entries[entry.name()] = entry
+            if self.all_entries is not None:
+                self.all_entries.append(entry)
+            return entry
         else:
             try:
                 state = self.find_entry(entryid)
@@ -396,10 +457,14 @@ class LibvirtConnection(object):
 
 class VirtStoragePool(object):
 
-    def __init__(self, uri, module):
+    def __init__(self, uri, module, list_volumes=True, volume_offset=0,
+                 volume_limit=0):
         self.module = module
         self.uri = uri
         self.conn = LibvirtConnection(self.uri, self.module)
+        self.list_volumes = list_volumes
+        self.volume_offset = volume_offset
+        self.volume_limit = volume_limit
 
     def get_pool(self, entryid):
         return self.conn.find_entry(entryid)
@@ -468,58 +533,63 @@ class VirtStoragePool(object):
 
     def facts(self, facts_mode='facts'):
         results = dict()
-        for entry in self.list_pools():
-            results[entry] = dict()
-            if self.conn.find_entry(entry):
-                data = self.conn.get_info(entry)
-                # libvirt returns maxMem, memory, and cpuTime as long()'s, which
-                # xmlrpclib tries to convert to regular int's during serialization.
-                # This throws exceptions, so convert them to strings here and
-                # assume the other end of the xmlrpc connection can figure things
-                # out or doesn't care.
-                results[entry] = {
-                    "status"    : ENTRY_STATE_INFO_MAP.get(data[0],"unknown"),
-                    "size_total"  : str(data[1]),
-                    "size_used"  : str(data[2]),
-                    "size_available"  : str(data[3]),
-                }
-                results[entry]["autostart"] = self.conn.get_autostart(entry)
-                results[entry]["persistent"] = self.conn.get_persistent(entry)
-                results[entry]["state"] = self.conn.get_status(entry)
-                results[entry]["path"] = self.conn.get_path(entry)
-                results[entry]["type"] = self.conn.get_type(entry)
-                results[entry]["uuid"] = self.conn.get_uuid(entry)
-                if self.conn.find_entry(entry).isActive():
-                    results[entry]["volume_count"] = self.conn.get_volume_count(entry)
-                    results[entry]["volumes"] = list()
-                    for volume in self.conn.get_volume_names(entry):
-                        results[entry]["volumes"].append(volume)
+        for pool in self.conn.find_entry(-1):
+            entry = pool.name()
+            data = pool.info()
+            active = pool.isActive()
+            xml = etree.fromstring(pool.XMLDesc(0))
+            # libvirt returns maxMem, memory, and cpuTime as long()'s, which
+            # xmlrpclib tries to convert to regular int's during serialization.
+            # This throws exceptions, so convert them to strings here and
+            # assume the other end of the xmlrpc connection can figure things
+            # out or doesn't care.
+            results[entry] = {
+                "status"    : ENTRY_STATE_INFO_MAP.get(data[0],"unknown"),
+                "size_total"  : str(data[1]),
+                "size_used"  : str(data[2]),
+                "size_available"  : str(data[3]),
+            }
+            results[entry]["autostart"] = ENTRY_STATE_AUTOSTART_MAP.get(pool.autostart(),"unknown")
+            results[entry]["persistent"] = ENTRY_STATE_PERSISTENT_MAP.get(pool.isPersistent(),"unknown")
+            results[entry]["state"] = ENTRY_STATE_ACTIVE_MAP.get(active,"unknown")
+            results[entry]["path"] = self.conn.get_path(xml)
+            results[entry]["type"] = self.conn.get_type(xml)
+            results[entry]["uuid"] = pool.UUIDString()
+            if active:
+                if self.list_volumes:
+                    volumes = pool.listVolumes()
+                    volumes.sort()
+                    results[entry]["volume_count"] = len(volumes)
+                    if self.volume_limit:
+                        volumes = volumes[self.volume_offset:self.volume_offset + self.volume_limit]
+                    else:
+                        volumes = volumes[self.volume_offset:]
+                    results[entry]["volumes"] = volumes
                 else:
-                    results[entry]["volume_count"] = -1
-
-                try:
-                    results[entry]["host"] = self.conn.get_host(entry)
-                except ValueError as e:
-                    pass
+                    results[entry]["volume_count"] = pool.numOfVolumes()
+            else:
+                results[entry]["volume_count"] = -1
 
-                try:
-                    results[entry]["source_path"] = self.conn.get_source_path(entry)
-                except ValueError as e:
-                    pass
+            try:
+                results[entry]["host"] = self.conn.get_host(xml)
+            except ValueError as e:
+                pass
 
-                try:
-                    results[entry]["format"] = self.conn.get_format(entry)
-                except ValueError as e:
-                    pass
+            try:
+                results[entry]["source_path"] = self.conn.get_source_path(xml)
+            except ValueError as e:
+                pass
 
-                try:
-                    devices = self.conn.get_devices(entry)
-                    results[entry]["devices"] = devices
-                except ValueError as e:
-                    pass
+            try:
+                results[entry]["format"] = self.conn.get_format(xml)
+            except ValueError as e:
+                pass
 
-            else:
-                results[entry]["state"] = self.conn.get_status(entry)
+            try:
+                devices = self.conn.get_devices(xml)
+                results[entry]["devices"] = devices
+            except ValueError as e:
+                pass
 
         facts = dict()
         if facts_mode == 'facts':
@@ -540,7 +610,10 @@ def core(module):
     autostart = module.params.get('autostart', None)
     mode      = module.params.get('mode', None)
 
-    v = VirtStoragePool(uri, module)
+    v = VirtStoragePool(uri, module,
+                        list_volumes=module.params.get('list_volumes'),
+                        volume_offset=module.params.get('volume_offset'),
+                        volume_limit=module.params.get('volume_limit'))
     res = {}
 
     if state and command == 'list_pools':
@@ -659,6 +732,9 @@ def main():
             xml = dict(),
             autostart = dict(choices=['yes', 'no']),
             mode = dict(choices=ALL_MODES),
+            list_volumes = dict(default='yes', type='bool'),
+            volume_offset = dict(default=0, type='int'),
+            volume_limit = dict(default=0, type='int'),
         ),
         supports_check_mode = True
     )
@@ -673,6 +749,10 @@ def main():
             msg='The `lxml` module is not importable. Check the requirements.'
         )
 
+    for option in ('volume_offset', 'volume_limit'):
+        if module.params.get(option) < 0:
+            module.fail_json(msg='%s must be 0 or greater' % option)
+
     rc = VIRT_SUCCESS
     try:
         rc, result = core(module)
@@ -91,6 +91,57 @@ options:
         default: null
         choices: []
         aliases: []
+    concurrency:
+        description:
+            - Number of iControl connections used to collect facts. With a
+              value greater than 1, fact categories are collected in parallel
+              and the attribute getters of each category are issued
+              concurrently, never using more than this many connections.
+              The active folder and recursive query state are set once per
+              connection and restored when collection finishes.
+        required: false
+        default: 1
+        version_added: 2.1
+    fields:
+        description:
+            - Restrict the attributes collected for fact categories. A
+              dictionary mapping a category to the list of attributes to
+              collect, e.g. C({"pool": ["member", "lb_method"]}). Only the
+              iControl getters of the listed attributes are called;
+              categories not present in the dictionary collect every
+              attribute. Not applicable for software, certificate and key
+              fact categories.
+        required: false
+        default: null
+        version_added: 2.1
+    cache_dir:
+        description:
+            - Directory of an on-disk cache of collected facts. When set,
+              the facts of every category are stored per device, user,
+              category, filter and attribute selection, and served from the
+              cache while they are younger than C(cache_ttl) and the device
+              configuration has not changed since they were collected (as
+              reported by the C(Configsync.LocalConfigTime) database
+              variable). The cache is not used when that variable can not
+              be read. The number of categories served from the cache and
+              collected from the device is returned in the C(fact_cache)
+              fact.
+        required: false
+        default: null
+        version_added: 2.1
+    cache_ttl:
+        description:
+            - Maximum age in seconds of cached facts.
+        required: false
+        default: 300
+        version_added: 2.1
+    cache_invalidate:
+        description:
+            - Remove all cached facts of the device before collecting facts.
+        required: false
+        default: 'no'
+        choices: ['yes', 'no']
+        version_added: 2.1
 '''
 
 EXAMPLES = '''
@@ -110,6 +161,35 @@ EXAMPLES = '''
       password=mysecret
       include=interface,vlan
 
+  - name: Collect large BIG-IP fact categories over four connections
+    local_action: >
+      bigip_facts
+      server=lb.mydomain.com
+      user=admin
+      password=mysecret
+      include=virtual_server,pool,node,rule
+      concurrency=4
+
+  - name: Collect only the members and load balancing method of pools
+    local_action:
+      module: bigip_facts
+      server: lb.mydomain.com
+      user: admin
+      password: mysecret
+      include: pool
+      fields:
+        pool: [member, lb_method]
+
+  - name: Collect virtual servers, reusing facts cached in the last ten minutes
+    local_action: >
+      bigip_facts
+      server=lb.mydomain.com
+      user=admin
+      password=mysecret
+      include=virtual_server
+      cache_dir=~/.ansible/bigip_facts
+      cache_ttl=600
+
 '''
 
 try:
@@ -121,8 +201,24 @@ else:
     bigsuds_found = True
 
 import fnmatch
+import os
+import sys
+import tempfile
+import threading
+import time
 import traceback
 import re
+import Queue
+
+try:
+    from hashlib import sha1
+except ImportError:
+    from sha import sha as sha1
+
+try:
+    import json
+except ImportError:
+    import simplejson as json
 
 # ===========================================
 # bigip_facts module specific support methods.
@@ -139,6 +235,8 @@ class F5(object):
 
     def __init__(self, host, user, password, session=False, validate_certs=True):
         self.api = bigip_api(host, user, password, validate_certs)
+        self.saved_active_folder = None
+        self.saved_recursive_query_state = None
         if session:
             self.start_session()
 
@@ -166,6 +264,208 @@ class F5(object):
     def get_active_folder(self):
         return self.api.System.Session.get_active_folder()
 
+    def enter_root_folder(self):
+        """Switch to the root folder with recursive queries enabled.
+
+        The previous active folder and recursive query state are saved so
+        they can be put back with restore_folder().
+        """
+        self.saved_active_folder = self.get_active_folder()
+        self.saved_recursive_query_state = self.get_recursive_query_state()
+        if self.saved_active_folder != "/":
+            self.set_active_folder("/")
+        if self.saved_recursive_query_state != "STATE_ENABLED":
+            self.enable_recursive_query_state()
+
+    def restore_folder(self):
+        if self.saved_active_folder and self.saved_active_folder != "/":
+            self.set_active_folder(self.saved_active_folder)
+        if self.saved_recursive_query_state and \
+           self.saved_recursive_query_state != "STATE_ENABLED":
+            self.set_recursive_query_state(self.saved_recursive_query_state)
+
+
+class F5Pool(object):
+    """F5 iControl connection pool class.
+
+    Bounded pool of F5 connections shared by the threads collecting facts.
+    Every connection is switched to the root folder once when it is opened
+    and restored by restore_folder().
+
+    Attributes:
+        size: Number of connections in the pool.
+        connections: A list of all F5 connections of the pool.
+    """
+
+    def __init__(self, size, host, user, password, session=False, validate_certs=True):
+        self.size = size
+        self.connections = []
+        self.idle = Queue.Queue()
+        try:
+            for i in range(size):
+                f5 = F5(host, user, password, session, validate_certs)
+                self.connections.append(f5)
+                f5.enter_root_folder()
+                self.idle.put(f5)
+        except:
+            # put back the folder state of the connections opened so far
+            exc_info = sys.exc_info()
+            try:
+                self.restore_folder()
+            except:
+                pass
+            raise exc_info[0], exc_info[1], exc_info[2]
+
+    def get_api(self):
+        return PooledAPI(self)
+
+    def call(self, func, *args):
+        f5 = self.idle.get()
+        try:
+            return func(f5, *args)
+        finally:
+            self.idle.put(f5)
+
+    def map(self, func, items):
+        """Return [func(item) for item in items], computed by at most size threads.
+
+        func does not hold a connection by itself; connections are only
+        taken for the duration of each iControl call, so map() may be nested.
+        """
+        items = list(items)
+        results = [None] * len(items)
+        errors = []
+        pending = Queue.Queue()
+        for i in range(len(items)):
+            pending.put(i)
+
+        def worker():
+            while not errors:
+                try:
+                    i = pending.get_nowait()
+                except Queue.Empty:
+                    return
+                try:
+                    results[i] = func(items[i])
+                except:
+                    errors.append(sys.exc_info())
+
+        threads = []
+        for i in range(min(self.size, len(items))):
+            thread = threading.Thread(target=worker)
+            thread.setDaemon(True)
+            thread.start()
+            threads.append(thread)
+        for thread in threads:
+            thread.join()
+        if errors:
+            raise errors[0][0], errors[0][1], errors[0][2]
+        return results
+
+    def restore_folder(self):
+        for f5 in self.connections:
+            f5.restore_folder()
+
+
+class PooledAPI(object):
+    """Pooled iControl API class.
+
+    Stands in for a bigsuds API instance: every iControl call made through
+    it runs on a connection taken from the pool for the duration of the
+    call.
+
+    Attributes:
+        pool: The F5Pool serving the calls.
+        path: Attribute path of the iControl method, e.g.
+              ('LocalLB', 'Pool', 'get_list').
+    """
+
+    def __init__(self, pool, path=()):
+        self.pool = pool
+        self.path = path
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return PooledAPI(self.pool, self.path + (name,))
+
+    def __call__(self, *args, **kwargs):
+        def icontrol_call(f5):
+            method = f5.get_api()
+            for name in self.path:
+                method = getattr(method, name)
+            return method(*args, **kwargs)
+        return self.pool.call(icontrol_call)
+
+
+class FactCache(object):
+    """On-disk fact cache class.
+
+    Stores the facts of each category in a JSON file per device, user,
+    category, filter and attribute selection, along with the configuration
+    generation of the device they were collected at. An entry is served
+    while it is younger than the TTL and the generation is unchanged.
+
+    Attributes:
+        path: Cache directory.
+        ttl: Maximum age of an entry in seconds.
+        hits: Number of categories served from the cache.
+        misses: Number of categories collected from the device.
+    """
+
+    def __init__(self, path, ttl, server, user, regex):
+        self.path = os.path.expanduser(path)
+        self.ttl = ttl
+        self.server = server
+        self.user = user
+        self.regex = regex
+        self.hits = 0
+        self.misses = 0
+        if not os.path.isdir(self.path):
+            os.makedirs(self.path)
+
+    def get_prefix(self):
+        return re.sub(r'[^\w.-]', '_', self.server) + '-'
+
+    def get_entry_path(self, category, wanted):
+        key = repr((self.server, self.user, category, self.regex, wanted))
+        return os.path.join(self.path, "%s%s.json" % (self.get_prefix(),
+                                                      sha1(key).hexdigest()))
+
+    def get(self, category, generation, wanted=None):
+        try:
+            entry_file = open(self.get_entry_path(category, wanted))
+            try:
+                entry = json.load(entry_file)
+            finally:
+                entry_file.close()
+        except (IOError, ValueError):
+            entry = None
+        if entry is None or time.time() - entry['time'] >= self.ttl or \
+           entry['generation'] != generation:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry['facts']
+
+    def put(self, category, generation, wanted, facts):
+        entry = {'time': time.time(), 'generation': generation,
+                 'facts': facts}
+        fd, tmp_path = tempfile.mkstemp(dir=self.path)
+        tmp_file = os.fdopen(fd, 'w')
+        try:
+            json.dump(entry, tmp_file)
+        finally:
+            tmp_file.close()
+        os.rename(tmp_path, self.get_entry_path(category, wanted))
+
+    def invalidate(self):
+        """Remove all entries of the device."""
+        prefix = self.get_prefix()
+        for name in os.listdir(self.path):
+            if name.startswith(prefix) and name.endswith('.json'):
+                os.remove(os.path.join(self.path, name))
+
 
 class Interfaces(object):
     """Interfaces class.
@@ -1365,37 +1665,59 @@ class SystemInfo(object):
         return self.api.System.SystemInfo.get_uptime()
 
 
-def generate_dict(api_obj, fields):
-    result_dict = {}
-    lists = []
-    supported_fields = []
-    if api_obj.get_list():
-        for field in fields:
-            try:
-                api_response = getattr(api_obj, "get_" + field)()
-            except (MethodNotFound, WebFault):
-                pass
-            else:
-                lists.append(api_response)
-                supported_fields.append(field)
-        for i, j in enumerate(api_obj.get_list()):
-            temp = {}
-            temp.update([(item[0], item[1][i]) for item in zip(supported_fields, lists)])
-            result_dict[j] = temp
-    return result_dict
-
-def generate_simple_dict(api_obj, fields):
-    result_dict = {}
-    for field in fields:
+# Marks getters the device does not implement.
+unsupported_field = object()
+
+def get_fields(api_obj, fields):
+    """Return (field, value) pairs for the fields supported by the device.
+
+    When api_obj talks to a connection pool, the getters are called
+    concurrently.
+    """
+    def get_field(field):
         try:
-            api_response = getattr(api_obj, "get_" + field)()
+            return getattr(api_obj, "get_" + field)()
         except (MethodNotFound, WebFault):
-            pass
-        else:
-            result_dict[field] = api_response
-    return result_dict
+            return unsupported_field
 
-def generate_interface_dict(f5, regex):
+    if isinstance(api_obj.api, PooledAPI):
+        values = api_obj.api.pool.map(get_field, fields)
+    else:
+        values = map(get_field, fields)
+    return [(field, value) for field, value in zip(fields, values)
+            if value is not unsupported_field]
+
+def project_fields(fields, wanted):
+    """Return the fields of a category selected by the wanted projection."""
+    if wanted is None:
+        return fields
+    unknown = [field for field in wanted if field not in fields]
+    if unknown:
+        raise ValueError("unsupported fields: %s; valid fields are: %s" %
+                         (", ".join(unknown), ", ".join(fields)))
+    return [field for field in fields if field in wanted]
+
+def generate_dict(api_obj, fields, wanted=None):
+    fields = project_fields(fields, wanted)
+    names = api_obj.get_list()
+    if not names:
+        return {}
+    supported_fields = []
+    columns = []
+    for field, api_response in get_fields(api_obj, fields):
+        supported_fields.append(field)
+        columns.append(api_response)
+    if not columns:
+        return dict([(name, {}) for name in names])
+    # one list per field; transpose them into one row per object at once
+    rows = zip(*columns)
+    return dict([(name, dict(zip(supported_fields, row)))
+                 for name, row in zip(names, rows)])
+
+def generate_simple_dict(api_obj, fields, wanted=None):
+    return dict(get_fields(api_obj, project_fields(fields, wanted)))
+
+def generate_interface_dict(f5, regex, wanted=None):
     interfaces = Interfaces(f5.get_api(), regex)
     fields = ['active_media', 'actual_flow_control', 'bundle_state',
               'description', 'dual_media_state', 'enabled_state', 'if_index',
@@ -1407,26 +1729,26 @@ def generate_interface_dict(f5, regex):
               'sfp_media_state', 'stp_active_edge_port_state',
               'stp_enabled_state', 'stp_link_type',
               'stp_protocol_detection_reset_state']
-    return generate_dict(interfaces, fields)
+    return generate_dict(interfaces, fields, wanted)
 
-def generate_self_ip_dict(f5, regex):
+def generate_self_ip_dict(f5, regex, wanted=None):
     self_ips = SelfIPs(f5.get_api(), regex)
     fields = ['address', 'allow_access_list', 'description',
               'enforced_firewall_policy', 'floating_state', 'fw_rule',
               'netmask', 'staged_firewall_policy', 'traffic_group',
               'vlan', 'is_traffic_group_inherited']
-    return generate_dict(self_ips, fields)
+    return generate_dict(self_ips, fields, wanted)
 
-def generate_trunk_dict(f5, regex):
+def generate_trunk_dict(f5, regex, wanted=None):
     trunks = Trunks(f5.get_api(), regex)
     fields = ['active_lacp_state', 'configured_member_count', 'description',
               'distribution_hash_option', 'interface', 'lacp_enabled_state',
               'lacp_timeout_option', 'link_selection_policy', 'media_speed',
               'media_status', 'operational_member_count', 'stp_enabled_state',
               'stp_protocol_detection_reset_state']
-    return generate_dict(trunks, fields)
+    return generate_dict(trunks, fields, wanted)
 
-def generate_vlan_dict(f5, regex):
+def generate_vlan_dict(f5, regex, wanted=None):
     vlans = Vlans(f5.get_api(), regex)
     fields = ['auto_lasthop', 'cmp_hash_algorithm', 'description',
               'dynamic_forwarding', 'failsafe_action', 'failsafe_state',
@@ -1435,9 +1757,9 @@ def generate_vlan_dict(f5, regex):
               'sflow_poll_interval', 'sflow_poll_interval_global',
               'sflow_sampling_rate', 'sflow_sampling_rate_global',
               'source_check_state', 'true_mac_address', 'vlan_id']
-    return generate_dict(vlans, fields)
+    return generate_dict(vlans, fields, wanted)
 
-def generate_vs_dict(f5, regex):
+def generate_vs_dict(f5, regex, wanted=None):
     virtual_servers = VirtualServers(f5.get_api(), regex)
     fields = ['actual_hardware_acceleration', 'authentication_profile',
               'auto_lasthop', 'bw_controller_policy', 'clone_pool',
@@ -1455,9 +1777,9 @@ def generate_vs_dict(f5, regex):
               'source_address_translation_type', 'source_port_behavior',
               'staged_firewall_policy', 'translate_address_state',
               'translate_port_state', 'type', 'vlan', 'wildmask']
-    return generate_dict(virtual_servers, fields)
+    return generate_dict(virtual_servers, fields, wanted)
 
-def generate_pool_dict(f5, regex):
+def generate_pool_dict(f5, regex, wanted=None):
     pools = Pools(f5.get_api(), regex)
     fields = ['action_on_service_down', 'active_member_count',
               'aggregate_dynamic_ratio', 'allow_nat_state',
@@ -1471,9 +1793,9 @@ def generate_pool_dict(f5, regex):
               'queue_on_connection_limit_state', 'queue_time_limit',
               'reselect_tries', 'server_ip_tos', 'server_link_qos',
               'simple_timeout', 'slow_ramp_time']
-    return generate_dict(pools, fields)
+    return generate_dict(pools, fields, wanted)
 
-def generate_device_dict(f5, regex):
+def generate_device_dict(f5, regex, wanted=None):
     devices = Devices(f5.get_api(), regex)
     fields = ['active_modules', 'base_mac_address', 'blade_addresses',
               'build', 'chassis_id', 'chassis_type', 'comment',
@@ -1483,49 +1805,49 @@ def generate_device_dict(f5, regex):
               'optional_modules', 'platform_id', 'primary_mirror_address',
               'product', 'secondary_mirror_address', 'software_version',
               'timelimited_modules', 'timezone', 'unicast_addresses']
-    return generate_dict(devices, fields)
+    return generate_dict(devices, fields, wanted)
 
-def generate_device_group_dict(f5, regex):
+def generate_device_group_dict(f5, regex, wanted=None):
     device_groups = DeviceGroups(f5.get_api(), regex)
     fields = ['all_preferred_active', 'autosync_enabled_state','description',
               'device', 'full_load_on_sync_state',
               'incremental_config_sync_size_maximum',
               'network_failover_enabled_state', 'sync_status', 'type']
-    return generate_dict(device_groups, fields)
+    return generate_dict(device_groups, fields, wanted)
 
-def generate_traffic_group_dict(f5, regex):
+def generate_traffic_group_dict(f5, regex, wanted=None):
     traffic_groups = TrafficGroups(f5.get_api(), regex)
     fields = ['auto_failback_enabled_state', 'auto_failback_time',
               'default_device', 'description', 'ha_load_factor',
               'ha_order', 'is_floating', 'mac_masquerade_address',
               'unit_id']
-    return generate_dict(traffic_groups, fields)
+    return generate_dict(traffic_groups, fields, wanted)
 
-def generate_rule_dict(f5, regex):
+def generate_rule_dict(f5, regex, wanted=None):
     rules = Rules(f5.get_api(), regex)
     fields = ['definition', 'description', 'ignore_vertification',
               'verification_status']
-    return generate_dict(rules, fields)
+    return generate_dict(rules, fields, wanted)
 
-def generate_node_dict(f5, regex):
+def generate_node_dict(f5, regex, wanted=None):
     nodes = Nodes(f5.get_api(), regex)
     fields = ['address', 'connection_limit', 'description', 'dynamic_ratio',
               'monitor_instance', 'monitor_rule', 'monitor_status',
               'object_status', 'rate_limit', 'ratio', 'session_status']
-    return generate_dict(nodes, fields)
+    return generate_dict(nodes, fields, wanted)
 
-def generate_virtual_address_dict(f5, regex):
+def generate_virtual_address_dict(f5, regex, wanted=None):
     virtual_addresses = VirtualAddresses(f5.get_api(), regex)
     fields = ['address', 'arp_state', 'auto_delete_state', 'connection_limit',
               'description', 'enabled_state', 'icmp_echo_state',
               'is_floating_state', 'netmask', 'object_status',
               'route_advertisement_state', 'traffic_group']
-    return generate_dict(virtual_addresses, fields)
+    return generate_dict(virtual_addresses, fields, wanted)
 
-def generate_address_class_dict(f5, regex):
+def generate_address_class_dict(f5, regex, wanted=None):
     address_classes = AddressClasses(f5.get_api(), regex)
     fields = ['address_class', 'description']
-    return generate_dict(address_classes, fields)
+    return generate_dict(address_classes, fields, wanted)
 
 def generate_certificate_dict(f5, regex):
     certificates = Certificates(f5.get_api(), regex)
@@ -1535,7 +1857,7 @@ def generate_key_dict(f5, regex):
     keys = Keys(f5.get_api(), regex)
     return dict(zip(keys.get_list(), keys.get_key_list()))
 
-def generate_client_ssl_profile_dict(f5, regex):
+def generate_client_ssl_profile_dict(f5, regex, wanted=None):
     profiles = ProfileClientSSL(f5.get_api(), regex)
     fields = ['alert_timeout', 'allow_nonssl_state', 'authenticate_depth',
               'authenticate_once_state', 'ca_file', 'cache_size',
@@ -1556,9 +1878,9 @@ def generate_client_ssl_profile_dict(f5, regex):
               'server_name', 'session_ticket_state', 'sni_default_state',
               'sni_require_state', 'ssl_option', 'strict_resume_state',
               'unclean_shutdown_state', 'is_base_profile', 'is_system_profile']
-    return generate_dict(profiles, fields)
+    return generate_dict(profiles, fields, wanted)
 
-def generate_system_info_dict(f5):
+def generate_system_info_dict(f5, wanted=None):
     system_info = SystemInfo(f5.get_api())
     fields = ['base_mac_address',
               'blade_temperature', 'chassis_slot_information',
@@ -1568,13 +1890,55 @@ def generate_system_info_dict(f5):
               'product_information', 'pva_version', 'system_id',
               'system_information', 'time',
               'time_zone', 'uptime']
-    return generate_simple_dict(system_info, fields)
+    return generate_simple_dict(system_info, fields, wanted)
 
 def generate_software_list(f5):
     software = Software(f5.get_api())
     software_list = software.get_all_software_status()
     return software_list
 
+def get_config_generation(f5):
+    """Return the time of the last configuration change of the device.
+
+    Returns None when it can not be read for any reason, in which case the
+    fact cache is not used.
+    """
+    try:
+        variables = f5.get_api().Management.DBVariable.query(['Configsync.LocalConfigTime'])
+    except Exception:
+        return None
+    if not variables:
+        return None
+    return variables[0]['value']
+
+def generate_facts(f5, category, regex, wanted=None):
+    if category == 'software':
+        return generate_software_list(f5)
+    if category == 'system_info':
+        return generate_system_info_dict(f5, wanted)
+    if category in ('certificate', 'key'):
+        return fact_generators[category](f5, regex)
+    return fact_generators[category](f5, regex, wanted)
+
+fact_generators = {
+    'address_class': generate_address_class_dict,
+    'certificate': generate_certificate_dict,
+    'client_ssl_profile': generate_client_ssl_profile_dict,
+    'device': generate_device_dict,
+    'device_group': generate_device_group_dict,
+    'interface': generate_interface_dict,
+    'key': generate_key_dict,
+    'node': generate_node_dict,
+    'pool': generate_pool_dict,
+    'rule': generate_rule_dict,
+    'self_ip': generate_self_ip_dict,
+    'traffic_group': generate_traffic_group_dict,
+    'trunk': generate_trunk_dict,
+    'virtual_address': generate_virtual_address_dict,
+    'virtual_server': generate_vs_dict,
+    'vlan': generate_vlan_dict,
+}
+
 
 def main():
     module = AnsibleModule(
@@ -1586,6 +1950,11 @@ def main():
             session = dict(type='bool', default=False),
             include = dict(type='list', required=True),
             filter = dict(type='str', required=False),
+            concurrency = dict(type='int', default=1),
+            fields = dict(type='dict', required=False),
+            cache_dir = dict(type='str', required=False),
+            cache_ttl = dict(type='int', default=300),
+            cache_invalidate = dict(type='bool', default=False),
         )
     )
 
@@ -1598,6 +1967,10 @@ def main():
     validate_certs = module.params['validate_certs']
     session = module.params['session']
     fact_filter = module.params['filter']
+    concurrency = module.params['concurrency']
+    cache_dir = module.params['cache_dir']
+    cache_ttl = module.params['cache_ttl']
+    cache_invalidate = module.params['cache_invalidate']
 
     if validate_certs:
         import ssl
@@ -1617,62 +1990,78 @@ def main():
     include_test = map(lambda x: x in valid_includes, include)
     if not all(include_test):
         module.fail_json(msg="value of include must be one or more of: %s, got: %s" % (",".join(valid_includes), ",".join(include)))
+    if concurrency < 1:
+        module.fail_json(msg="concurrency must be at least 1, got: %s" % concurrency)
+    if cache_ttl < 0:
+        module.fail_json(msg="cache_ttl must not be negative, got: %s" % cache_ttl)
+
+    projections = {}
+    for category, wanted in (module.params['fields'] or {}).items():
+        category = category.lower()
+        if category not in valid_includes or \
+           category in ('certificate', 'key', 'software'):
+            module.fail_json(msg="fields can not be selected for fact category: %s" % category)
+        if isinstance(wanted, basestring):
+            wanted = wanted.split(',')
+        projections[category] = [field.strip().lower() for field in wanted]
 
     try:
         facts = {}
 
+        cache = None
+        if cache_dir:
+            cache = FactCache(cache_dir, cache_ttl, server, user, regex)
+            if cache_invalidate:
+                cache.invalidate()
+
         if len(include) > 0:
-            f5 = F5(server, user, password, session, validate_certs)
-            saved_active_folder = f5.get_active_folder()
-            saved_recursive_query_state = f5.get_recursive_query_state()
-            if saved_active_folder != "/":
-                f5.set_active_folder("/")
-            if saved_recursive_query_state != "STATE_ENABLED":
-                f5.enable_recursive_query_state()
-
-            if 'interface' in include:
-                facts['interface'] = generate_interface_dict(f5, regex)
-            if 'self_ip' in include:
-                facts['self_ip'] = generate_self_ip_dict(f5, regex)
-            if 'trunk' in include:
-                facts['trunk'] = generate_trunk_dict(f5, regex)
-            if 'vlan' in include:
-                facts['vlan'] = generate_vlan_dict(f5, regex)
-            if 'virtual_server' in include:
-                facts['virtual_server'] = generate_vs_dict(f5, regex)
-            if 'pool' in include:
-                facts['pool'] = generate_pool_dict(f5, regex)
-            if 'device' in include:
-                facts['device'] = generate_device_dict(f5, regex)
-            if 'device_group' in include:
-                facts['device_group'] = generate_device_group_dict(f5, regex)
-            if 'traffic_group' in include:
-                facts['traffic_group'] = generate_traffic_group_dict(f5, regex)
-            if 'rule' in include:
-                facts['rule'] = generate_rule_dict(f5, regex)
-            if 'node' in include:
-                facts['node'] = generate_node_dict(f5, regex)
-            if 'virtual_address' in include:
-                facts['virtual_address'] = generate_virtual_address_dict(f5, regex)
-            if 'address_class' in include:
-                facts['address_class'] = generate_address_class_dict(f5, regex)
-            if 'software' in include:
-                facts['software'] = generate_software_list(f5)
-            if 'certificate' in include:
-                facts['certificate'] = generate_certificate_dict(f5, regex)
-            if 'key' in include:
-                facts['key'] = generate_key_dict(f5, regex)
-            if 'client_ssl_profile' in include:
-                facts['client_ssl_profile'] = generate_client_ssl_profile_dict(f5, regex)
-            if 'system_info' in include:
-                facts['system_info'] = generate_system_info_dict(f5)
-
-            # restore saved state
-            if saved_active_folder and saved_active_folder != "/":
-                f5.set_active_folder(saved_active_folder)
-            if saved_recursive_query_state and \
-               saved_recursive_query_state != "STATE_ENABLED":
-                f5.set_recursive_query_state(saved_recursive_query_state)
+            # remove duplicates so that no category is collected twice
+            categories = []
+            for category in include:
+                if category not in categories:
+                    categories.append(category)
+
+            if concurrency > 1:
+                f5 = F5Pool(concurrency, server, user, password, session,
+                            validate_certs)
+            else:
+                f5 = F5(server, user, password, session, validate_certs)
+            try:
+                if concurrency <= 1:
+                    f5.enter_root_folder()
+                if cache:
+                    generation = get_config_generation(f5)
+                    if generation is None:
+                        cache = None
+                if cache:
+                    for category in categories:
+                        cached = cache.get(category, generation,
+                                           projections.get(category))
+                        if cached is not None:
+                            facts[category] = cached
+                pending = [category for category in categories
+                           if category not in facts]
+
+                if concurrency > 1:
+                    values = f5.map(lambda category:
+                                    generate_facts(f5, category, regex,
+                                                   projections.get(category)),
+                                    pending)
+                else:
+                    values = [generate_facts(f5, category, regex,
+                                             projections.get(category))
+                              for category in pending]
+
+                for category, value in zip(pending, values):
+                    facts[category] = value
+                    if cache:
+                        cache.put(category, generation,
+                                  projections.get(category), value)
+            finally:
+                f5.restore_folder()
+
+        if cache:
+            facts['fact_cache'] = {'hits': cache.hits, 'misses': cache.misses}
 
         result = {'ansible_facts': facts}
 
@@ -30,8 +30,17 @@ requirements:
 options:
     host:
         description:
-            - Set to target snmp server (normally {{inventory_hostname}})
-        required: true
+            - Set to target snmp server (normally {{inventory_hostname}}),
+              required unless hosts is set
+        required: false
+    hosts:
+        description:
+            - List of snmp servers to poll concurrently instead of a single
+              host. The facts of every host that answered are returned in
+              the snmp_hosts fact, keyed by host; hosts that did not answer
+              are listed with their error in failed_hosts.
+        required: false
+        version_added: "2.1"
     version:
         description:
             - SNMP Version to use, v2/v2c or v3
@@ -68,6 +77,37 @@ options:
         description:
             - Encryption key, required if version is authPriv
         required: false
+    max_repetitions:
+        description:
+            - Number of table rows requested per GETBULK request while
+              walking the tables. Set to 0 to walk the tables with one
+              GETNEXT request per row instead.
+        required: false
+        default: 25
+        version_added: "2.1"
+    tables:
+        description:
+            - Tables to collect. C(interfaces) walks the interface table
+              (index, name, MTU, speed, MAC address, status and alias),
+              C(ipv4) walks the IPv4 address table and C(ifxtable) walks the
+              high capacity counters and high speed column of the extended
+              interface table.
+        choices: [ 'interfaces', 'ipv4', 'ifxtable' ]
+        required: false
+        default: [ 'interfaces', 'ipv4' ]
+        version_added: "2.1"
+    timeout:
+        description:
+            - Response timeout in seconds of each SNMP request, per host.
+        required: false
+        default: 1
+        version_added: "2.1"
+    retries:
+        description:
+            - Number of times an unanswered SNMP request is retried, per host.
+        required: false
+        default: 5
+        version_added: "2.1"
 '''
 
 EXAMPLES = '''
@@ -86,6 +126,26 @@ EXAMPLES = '''
     authkey=abc12345
     privkey=def6789
   delegate_to: localhost
+
+# Collect the interface table and the 64-bit counters, but no IPv4 addresses,
+# fetching 50 rows per request
+- snmp_facts:
+    host={{ inventory_hostname }}
+    version=v2c
+    community=public
+    tables=interfaces,ifxtable
+    max_repetitions=50
+  delegate_to: localhost
+
+# Inventory all the switches of a site in a single task
+- snmp_facts:
+    hosts: "{{ groups['site1_switches'] }}"
+    version: v2c
+    community: public
+    timeout: 2
+    retries: 1
+  run_once: true
+  delegate_to: localhost
 '''
 
 from ansible.module_utils.basic import *
@@ -93,6 +153,7 @@ from collections import defaultdict
 
 try:
     from pysnmp.entity.rfc3413.oneliner import cmdgen
+    from pyasn1.type import univ
     has_pysnmp = True
 except:
     has_pysnmp = False
@@ -122,6 +183,12 @@ class DefineOid(object):
         self.ifAdminStatus = dp + "1.3.6.1.2.1.2.2.1.7"
         self.ifOperStatus  = dp + "1.3.6.1.2.1.2.2.1.8"
         self.ifAlias       = dp + "1.3.6.1.2.1.31.1.1.1.18"
+        self.ifName           = dp + "1.3.6.1.2.1.31.1.1.1.1"
+        self.ifHCInOctets     = dp + "1.3.6.1.2.1.31.1.1.1.6"
+        self.ifHCInUcastPkts  = dp + "1.3.6.1.2.1.31.1.1.1.7"
+        self.ifHCOutOctets    = dp + "1.3.6.1.2.1.31.1.1.1.10"
+        self.ifHCOutUcastPkts = dp + "1.3.6.1.2.1.31.1.1.1.11"
+        self.ifHighSpeed      = dp + "1.3.6.1.2.1.31.1.1.1.15"
 
         # From IP-MIB
         self.ipAdEntAddr    = dp + "1.3.6.1.2.1.4.20.1.1"
@@ -129,6 +196,40 @@ class DefineOid(object):
         self.ipAdEntNetMask = dp + "1.3.6.1.2.1.4.20.1.3"
 
 
+# Columns walked for each of the tables that can be selected
+TABLE_COLUMNS = {
+    'interfaces': ['ifIndex', 'ifDescr', 'ifMtu', 'ifSpeed', 'ifPhysAddress',
+                   'ifAdminStatus', 'ifOperStatus', 'ifAlias'],
+    'ipv4':       ['ipAdEntAddr', 'ipAdEntIfIndex', 'ipAdEntNetMask'],
+    'ifxtable':   ['ifName', 'ifHCInOctets', 'ifHCInUcastPkts',
+                   'ifHCOutOctets', 'ifHCOutUcastPkts', 'ifHighSpeed'],
+}
+
+# Interface facts set from interface table columns
+INTERFACE_COLUMNS = {
+    'ifIndex':          'ifindex',
+    'ifDescr':          'name',
+    'ifMtu':            'mtu',
+    'ifSpeed':          'speed',
+    'ifPhysAddress':    'mac',
+    'ifAdminStatus':    'adminstatus',
+    'ifOperStatus':     'operstatus',
+    'ifAlias':          'description',
+    'ifName':           'ifname',
+    'ifHCInOctets':     'hc_in_octets',
+    'ifHCInUcastPkts':  'hc_in_ucast_pkts',
+    'ifHCOutOctets':    'hc_out_octets',
+    'ifHCOutUcastPkts': 'hc_out_ucast_pkts',
+    'ifHighSpeed':      'high_speed',
+}
+
+# IPv4 network facts set from IPv4 address table columns
+IPV4_COLUMNS = {
+    'ipAdEntAddr':    'address',
+    'ipAdEntIfIndex': 'interface',
+    'ipAdEntNetMask': 'netmask',
+}
+
 def decode_hex(hexstring):
 
     if len(hexstring) < 3:
@@ -173,10 +274,210 @@ def lookup_operstatus(int_operstatus):
     else:
         return ""
 
+def Tree():
+    return defaultdict(Tree)
+
+def walk_columns(cmdGen, snmp_auth, transport, columns, max_repetitions):
+    """Walk table columns, with GETBULK requests unless max_repetitions is 0."""
+    options = dict(lookupMib=False)
+    if max_repetitions > 0:
+        return cmdGen.bulkCmd(snmp_auth, transport, 0, max_repetitions,
+                              *columns, **options)
+    return cmdGen.nextCmd(snmp_auth, transport, *columns, **options)
+
+def parse_system(varBinds, v, results):
+    for oid, val in varBinds:
+        current_oid = oid.prettyPrint()
+        current_val = val.prettyPrint()
+        if current_oid == v.sysDescr:
+            results['ansible_sysdescr'] = decode_hex(current_val)
+        elif current_oid == v.sysObjectId:
+            results['ansible_sysobjectid'] = current_val
+        elif current_oid == v.sysUpTime:
+            results['ansible_sysuptime'] = current_val
+        elif current_oid == v.sysContact:
+            results['ansible_syscontact'] = current_val
+        elif current_oid == v.sysName:
+            results['ansible_sysname'] = current_val
+        elif current_oid == v.sysLocation:
+            results['ansible_syslocation'] = current_val
+
+def parse_tables(varTable, tables, v, results):
+    # Match on the column OID followed by a dot, as some column OIDs are
+    # prefixes of others (ifName and ifAlias for instance)
+    prefixes = []
+    for table in tables:
+        for column in TABLE_COLUMNS[table]:
+            prefixes.append((getattr(v, column) + '.', column))
+
+    all_ipv4_addresses = []
+    ipv4_networks = {}
+
+    for varBinds in varTable:
+        for oid, val in varBinds:
+            # endOfMibView and friends
+            if isinstance(val, univ.Null):
+                continue
+            current_oid = oid.prettyPrint()
+            current_val = val.prettyPrint()
+            for prefix, column in prefixes:
+                if current_oid.startswith(prefix):
+                    break
+            else:
+                continue
+            index = current_oid[len(prefix):]
+
+            if column in INTERFACE_COLUMNS:
+                if column == 'ifPhysAddress':
+                    current_val = decode_mac(current_val)
+                elif column == 'ifAdminStatus':
+                    current_val = lookup_adminstatus(int(current_val))
+                elif column == 'ifOperStatus':
+                    current_val = lookup_operstatus(int(current_val))
+                results['ansible_interfaces'][int(index)][INTERFACE_COLUMNS[column]] = current_val
+            elif column in IPV4_COLUMNS:
+                ipv4_networks.setdefault(index, {})[IPV4_COLUMNS[column]] = current_val
+                if column == 'ipAdEntAddr':
+                    all_ipv4_addresses.append(current_val)
+
+    if 'ipv4' not in tables:
+        return
+
+    interface_to_ipv4 = {}
+    for ipv4_network in ipv4_networks.values():
+        current_interface = ipv4_network.get('interface')
+        current_network = {
+                            'address':  ipv4_network.get('address'),
+                            'netmask':  ipv4_network.get('netmask')
+                          }
+        if not current_interface in interface_to_ipv4:
+            interface_to_ipv4[current_interface] = []
+            interface_to_ipv4[current_interface].append(current_network)
+        else:
+            interface_to_ipv4[current_interface].append(current_network)
+
+    for interface in interface_to_ipv4:
+        results['ansible_interfaces'][int(interface)]['ipv4'] = interface_to_ipv4[interface]
+
+    results['ansible_all_ipv4_addresses'] = all_ipv4_addresses
+
+class HostPoller(object):
+    """Collects the facts of one host through an asynchronous command generator.
+
+    The system group is fetched first and the table columns are walked from
+    its callback, so that the requests of many hosts are in flight at once
+    while the dispatcher runs.
+    """
+
+    def __init__(self, cmdGen, snmp_auth, host, tables, max_repetitions,
+                 timeout, retries):
+        self.cmdGen = cmdGen
+        self.snmp_auth = snmp_auth
+        self.host = host
+        self.tables = tables
+        self.max_repetitions = max_repetitions
+        self.transport = cmdgen.UdpTransportTarget((host, 161),
+                                                   timeout=timeout,
+                                                   retries=retries)
+        self.p = DefineOid(dotprefix=True)
+        self.v = DefineOid(dotprefix=False)
+        self.prefixes = []
+        for table in tables:
+            for column in TABLE_COLUMNS[table]:
+                self.prefixes.append(getattr(self.v, column) + '.')
+        self.varTable = []
+        self.results = Tree()
+        self.error = None
+
+    def start(self):
+        p = self.p
+        self.cmdGen.asyncGetCmd(
+            self.snmp_auth,
+            self.transport,
+            (cmdgen.MibVariable(p.sysDescr,),
+             cmdgen.MibVariable(p.sysObjectId,),
+             cmdgen.MibVariable(p.sysUpTime,),
+             cmdgen.MibVariable(p.sysContact,),
+             cmdgen.MibVariable(p.sysName,),
+             cmdgen.MibVariable(p.sysLocation,)),
+            (self.system_received, None)
+        )
+
+    def system_received(self, sendRequestHandle, errorIndication,
+                        errorStatus, errorIndex, varBinds, cbCtx):
+        if errorIndication:
+            self.error = str(errorIndication)
+            return
+        if errorStatus:
+            self.error = errorStatus.prettyPrint()
+            return
+
+        parse_system(varBinds, self.v, self.results)
+
+        columns = []
+        for table in self.tables:
+            for column in TABLE_COLUMNS[table]:
+                columns.append(cmdgen.MibVariable(getattr(self.p, column),))
+        if not columns:
+            return
+
+        if self.max_repetitions > 0:
+            self.cmdGen.asyncBulkCmd(self.snmp_auth, self.transport, 0,
+                                     self.max_repetitions, tuple(columns),
+                                     (self.rows_received, None))
+        else:
+            self.cmdGen.asyncNextCmd(self.snmp_auth, self.transport,
+                                     tuple(columns),
+                                     (self.rows_received, None))
+
+    def rows_received(self, sendRequestHandle, errorIndication, errorStatus,
+                      errorIndex, varBindTable, cbCtx):
+        """Store a page of rows; returning True requests the next page."""
+        if errorIndication:
+            self.error = str(errorIndication)
+            return False
+        if errorStatus:
+            self.error = errorStatus.prettyPrint()
+            return False
+
+        # Keep walking while any column is still within its own subtree
+        in_scope = False
+        for varBinds in varBindTable:
+            self.varTable.append(varBinds)
+            for i, (oid, val) in enumerate(varBinds):
+                if not isinstance(val, univ.Null) and \
+                   oid.prettyPrint().startswith(self.prefixes[i]):
+                    in_scope = True
+        if not in_scope:
+            parse_tables(self.varTable, self.tables, self.v, self.results)
+        return in_scope
+
+def poll_hosts(snmp_auth, hosts, tables, max_repetitions, timeout, retries):
+    """Poll all hosts concurrently, returning their facts and errors by host."""
+    cmdGen = cmdgen.AsynCommandGenerator()
+    pollers = []
+    for host in hosts:
+        poller = HostPoller(cmdGen, snmp_auth, host, tables, max_repetitions,
+                            timeout, retries)
+        poller.start()
+        pollers.append(poller)
+
+    cmdGen.snmpEngine.transportDispatcher.runDispatcher()
+
+    host_facts = {}
+    failed_hosts = {}
+    for poller in pollers:
+        if poller.error:
+            failed_hosts[poller.host] = poller.error
+        else:
+            host_facts[poller.host] = poller.results
+    return host_facts, failed_hosts
+
 def main():
     module = AnsibleModule(
         argument_spec=dict(
-            host=dict(required=True),
+            host=dict(required=False),
+            hosts=dict(required=False, type='list'),
             version=dict(required=True, choices=['v2', 'v2c', 'v3']),
             community=dict(required=False, default=False),
             username=dict(required=False),
@@ -185,8 +486,14 @@ def main():
             privacy=dict(required=False, choices=['des', 'aes']),
             authkey=dict(required=False),
             privkey=dict(required=False),
+            max_repetitions=dict(required=False, type='int', default=25),
+            tables=dict(required=False, type='list', default=['interfaces', 'ipv4']),
+            timeout=dict(required=False, type='float', default=1),
+            retries=dict(required=False, type='int', default=5),
             removeplaceholder=dict(required=False)),
             required_together = ( ['username','level','integrity','authkey'],['privacy','privkey'],),
+            required_one_of = ( ['host','hosts'],),
+            mutually_exclusive = ( ['host','hosts'],),
         supports_check_mode=False)
 
     m_args = module.params
@@ -194,7 +501,12 @@ def main():
     if not has_pysnmp:
         module.fail_json(msg='Missing required pysnmp module (check docs)')
 
-    cmdGen = cmdgen.CommandGenerator()
+    tables = m_args['tables']
+    for table in tables:
+        if table not in TABLE_COLUMNS:
+            module.fail_json(msg='Unknown table %s, valid tables are: %s' % (table, ', '.join(sorted(TABLE_COLUMNS.keys()))))
+    if m_args['max_repetitions'] < 0:
+        module.fail_json(msg='max_repetitions must not be negative')
 
     # Verify that we receive a community when using snmp v2
     if m_args['version'] == "v2" or m_args['version'] == "v2c":
@@ -231,18 +543,30 @@ def main():
     else:
         snmp_auth = cmdgen.UsmUserData(m_args['username'], authKey=m_args['authkey'], privKey=m_args['privkey'], authProtocol=integrity_proto, privProtocol=privacy_proto)
 
+    if m_args['hosts']:
+        host_facts, failed_hosts = poll_hosts(snmp_auth, m_args['hosts'], tables,
+                                              m_args['max_repetitions'],
+                                              m_args['timeout'], m_args['retries'])
+        module.exit_json(ansible_facts=dict(snmp_hosts=host_facts),
+                         failed_hosts=failed_hosts)
+
+    cmdGen = cmdgen.CommandGenerator()
+
+    # One transport for all the requests to the host
+    transport = cmdgen.UdpTransportTarget((m_args['host'], 161),
+                                          timeout=m_args['timeout'],
+                                          retries=m_args['retries'])
+
     # Use p to prefix OIDs with a dot for polling
     p = DefineOid(dotprefix=True)
     # Use v without a prefix to use with return values
     v = DefineOid(dotprefix=False)
 
-    Tree = lambda: defaultdict(Tree)
-
     results = Tree()
 
     errorIndication, errorStatus, errorIndex, varBinds = cmdGen.getCmd(
         snmp_auth,
-        cmdgen.UdpTransportTarget((m_args['host'], 161)),
+        transport,
         cmdgen.MibVariable(p.sysDescr,),
         cmdgen.MibVariable(p.sysObjectId,),
         cmdgen.MibVariable(p.sysUpTime,),
@@ -256,110 +580,26 @@ def main():
     if errorIndication:
         module.fail_json(msg=str(errorIndication))
 
-    for oid, val in varBinds:
-        current_oid = oid.prettyPrint()
-        current_val = val.prettyPrint()
-        if current_oid == v.sysDescr:
-            results['ansible_sysdescr'] = decode_hex(current_val)
-        elif current_oid == v.sysObjectId:
-            results['ansible_sysobjectid'] = current_val
-        elif current_oid == v.sysUpTime:
-            results['ansible_sysuptime'] = current_val
-        elif current_oid == v.sysContact:
-            results['ansible_syscontact'] = current_val
-        elif current_oid == v.sysName:
-            results['ansible_sysname'] = current_val
-        elif current_oid == v.sysLocation:
-            results['ansible_syslocation'] = current_val
+    parse_system(varBinds, v, results)
+
+    columns = []
+    for table in tables:
+        for column in TABLE_COLUMNS[table]:
+            columns.append(cmdgen.MibVariable(getattr(p, column),))
 
-    errorIndication, errorStatus, errorIndex, varTable = cmdGen.nextCmd(
+    errorIndication, errorStatus, errorIndex, varTable = walk_columns(
+        cmdGen,
         snmp_auth,
-        cmdgen.UdpTransportTarget((m_args['host'], 161)),
-        cmdgen.MibVariable(p.ifIndex,),
-        cmdgen.MibVariable(p.ifDescr,),
-        cmdgen.MibVariable(p.ifMtu,),
-        cmdgen.MibVariable(p.ifSpeed,),
-        cmdgen.MibVariable(p.ifPhysAddress,),
-        cmdgen.MibVariable(p.ifAdminStatus,),
-        cmdgen.MibVariable(p.ifOperStatus,),
-        cmdgen.MibVariable(p.ipAdEntAddr,),
-        cmdgen.MibVariable(p.ipAdEntIfIndex,),
-        cmdgen.MibVariable(p.ipAdEntNetMask,),
-
-        cmdgen.MibVariable(p.ifAlias,),
-        lookupMib=False
+        transport,
+        columns,
+        m_args['max_repetitions']
     )
 
 
     if errorIndication:
         module.fail_json(msg=str(errorIndication))
 
-    interface_indexes = []
-
-    all_ipv4_addresses = []
-    ipv4_networks = Tree()
-
-    for varBinds in varTable:
-        for oid, val in varBinds:
-            current_oid = oid.prettyPrint()
-            current_val = val.prettyPrint()
-            if v.ifIndex in current_oid:
-                ifIndex = int(current_oid.rsplit('.', 1)[-1])
-                results['ansible_interfaces'][ifIndex]['ifindex'] = current_val
-                interface_indexes.append(ifIndex)
-            if v.ifDescr in current_oid:
-                ifIndex = int(current_oid.rsplit('.', 1)[-1])
-                results['ansible_interfaces'][ifIndex]['name'] = current_val
-            if v.ifMtu in current_oid:
-                ifIndex = int(current_oid.rsplit('.', 1)[-1])
-                results['ansible_interfaces'][ifIndex]['mtu'] = current_val
-            if v.ifMtu in current_oid:
-                ifIndex = int(current_oid.rsplit('.', 1)[-1])
-                results['ansible_interfaces'][ifIndex]['speed'] = current_val
-            if v.ifPhysAddress in current_oid:
-                ifIndex = int(current_oid.rsplit('.', 1)[-1])
-                results['ansible_interfaces'][ifIndex]['mac'] = decode_mac(current_val)
-            if v.ifAdminStatus in current_oid:
-                ifIndex = int(current_oid.rsplit('.', 1)[-1])
-                results['ansible_interfaces'][ifIndex]['adminstatus'] = lookup_adminstatus(int(current_val))
-            if v.ifOperStatus in current_oid:
-                ifIndex = int(current_oid.rsplit('.', 1)[-1])
-                results['ansible_interfaces'][ifIndex]['operstatus'] = lookup_operstatus(int(current_val))
-            if v.ipAdEntAddr in current_oid:
-                curIPList = current_oid.rsplit('.', 4)[-4:]
-                curIP = ".".join(curIPList)
-                ipv4_networks[curIP]['address'] = current_val
-                all_ipv4_addresses.append(current_val)
-            if v.ipAdEntIfIndex in current_oid:
-                curIPList = current_oid.rsplit('.', 4)[-4:]
-                curIP = ".".join(curIPList)
-                ipv4_networks[curIP]['interface'] = current_val
-            if v.ipAdEntNetMask in current_oid:
-                curIPList = current_oid.rsplit('.', 4)[-4:]
-                curIP = ".".join(curIPList)
-                ipv4_networks[curIP]['netmask'] = current_val
-
-            if v.ifAlias in current_oid:
-                ifIndex = int(current_oid.rsplit('.', 1)[-1])
-                results['ansible_interfaces'][ifIndex]['description'] = current_val
-
-    interface_to_ipv4 = {}
-    for ipv4_network in ipv4_networks:
-        current_interface = ipv4_networks[ipv4_network]['interface']
-        current_network = {
-                            'address':  ipv4_networks[ipv4_network]['address'],
-                            'netmask':  ipv4_networks[ipv4_network]['netmask']
-                          }
-        if not current_interface in interface_to_ipv4:
-            interface_to_ipv4[current_interface] = []
-            interface_to_ipv4[current_interface].append(current_network)
-        else:
-            interface_to_ipv4[current_interface].append(current_network)
-
-    for interface in interface_to_ipv4:
-        results['ansible_interfaces'][int(interface)]['ipv4'] = interface_to_ipv4[interface]
-
-    results['ansible_all_ipv4_addresses'] = all_ipv4_addresses
+    parse_tables(varTable, tables, v, results)
 
     module.exit_json(ansible_facts=results)
 
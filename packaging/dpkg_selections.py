@@ -28,31 +28,86 @@ options:
     name:
         description:
             - Name of the package
-        required: true
+            - One of I(name) or I(selections) is required.
+        required: false
     selection:
         description:
             - The selection state to set the package to.
+            - Required with I(name).
         choices: [ 'install', 'hold', 'deinstall', 'purge' ]
-        required: true
+        required: false
+    selections:
+        description:
+            - A mapping of package names to the selection state to set them to.
+            - All selections are read with a single --get-selections and all changes are applied with a single --set-selections.
+            - The changed packages are returned in C(changes), with their C(before) and C(after) selection.
+        required: false
+        version_added: "2.1"
 notes:
     - This module won't cause any packages to be installed/removed/purged, use the C(apt) module for that.
 '''
 EXAMPLES = '''
 # Prevent python from being upgraded.
 - dpkg_selections: name=python selection=hold
+
+# Hold several packages at once
+- dpkg_selections:
+    selections:
+      python: hold
+      openssl: hold
+      nginx: install
 '''
 
+SELECTIONS = ['install', 'hold', 'deinstall', 'purge']
+
+def get_selections(module, dpkg):
+    # Read the selections of all packages at once.
+    rc, out, err = module.run_command([dpkg, '--get-selections'], check_rc=True)
+    current = {}
+    for line in out.splitlines():
+        fields = line.split()
+        if len(fields) != 2:
+            continue
+        current[fields[0]] = fields[1]
+        # Multi-arch packages are listed as name:arch.
+        current.setdefault(fields[0].split(':')[0], fields[1])
+    return current
+
+def set_selections(module, dpkg, selections):
+    current = get_selections(module, dpkg)
+
+    changes = {}
+    for name, selection in sorted(selections.items()):
+        if selection not in SELECTIONS:
+            module.fail_json(msg="invalid selection %s for %s, expected one of %s" % (selection, name, ", ".join(SELECTIONS)))
+        before = current.get(name, 'not present')
+        if before != selection:
+            changes[name] = dict(before=before, after=selection)
+
+    if changes and not module.check_mode:
+        data = "".join(["%s %s\n" % (name, changes[name]['after']) for name in sorted(changes)])
+        module.run_command([dpkg, '--set-selections'], data=data, check_rc=True)
+
+    module.exit_json(changed=bool(changes), changes=changes)
+
 def main():
     module = AnsibleModule(
         argument_spec = dict(
-            name = dict(required=True),
-            selection = dict(choices=['install', 'hold', 'deinstall', 'purge'])
+            name = dict(),
+            selection = dict(choices=SELECTIONS),
+            selections = dict(type='dict'),
         ),
+        required_one_of = [['name', 'selections']],
+        mutually_exclusive = [['name', 'selections']],
+        required_together = [['name', 'selection']],
         supports_check_mode=True,
     )
 
     dpkg = module.get_bin_path('dpkg', True)
 
+    if module.params['selections']:
+        set_selections(module, dpkg, module.params['selections'])
+
     name = module.params['name']
     selection = module.params['selection']
 
@@ -64,6 +64,19 @@ options:
     description:
       - The version to be installed
     required: false
+  stamp:
+    description:
+      - Record a digest of bower.json, .bowerrc and the install options in the bower directory after a
+        successful run with I(state=present). Later runs with the same digest return the recorded
+        installed dependencies without running bower. C(outdated) dependencies are left out of the
+        stamp, and the stamp is not used with I(state=latest).
+    required: false
+    default: no
+    choices: [ "yes", "no" ]
+    version_added: "2.1"
+notes:
+  - The state found for each dependency, C(installed), C(missing) or C(outdated), is returned in
+    C(dependencies).
 '''
 
 EXAMPLES = '''
@@ -82,11 +95,22 @@ description: Install packages based on bower.json.
 description: Update packages based on bower.json to their latest version.
 - bower: path=/app/location state=latest
 
+description: Install packages based on bower.json, only running bower when it changed.
+- bower: path=/app/location stamp=yes
+
 description: install bower locally and run from there
 - npm: path=/app/location name=bower global=no
 - bower: path=/app/location relative_execpath=node_modules/.bin
 '''
 
+try:
+    from hashlib import sha1
+except ImportError:
+    from sha import sha as sha1
+
+# Files whose content decides the packages installed in a path
+BOWER_INPUT_FILES = ['bower.json', '.bowerrc']
+
 
 class Bower(object):
     def __init__(self, module, **kwargs):
@@ -174,6 +198,68 @@ class Bower(object):
     def uninstall(self):
         return self._exec(['uninstall'])
 
+    def _stamp_path(self):
+        # Packages go to the directory set in .bowerrc, if any
+        directory = 'bower_components'
+        try:
+            f = open(os.path.join(self.path, '.bowerrc'))
+            try:
+                directory = json.load(f).get('directory', directory)
+            finally:
+                f.close()
+        except (IOError, ValueError):
+            pass
+        return os.path.join(self.path, directory, '.ansible-bower-stamp')
+
+    def inputs_digest(self):
+        """Return a digest of the files and options deciding what is installed
+        in the path, or None if the path has no bower.json."""
+        if not os.path.isfile(os.path.join(self.path, 'bower.json')):
+            return None
+
+        digest = sha1()
+        for name in BOWER_INPUT_FILES:
+            input_file = os.path.join(self.path, name)
+            if os.path.isfile(input_file):
+                f = open(input_file, 'rb')
+                try:
+                    digest.update(name + '\0' + f.read() + '\0')
+                finally:
+                    f.close()
+        digest.update(json.dumps([self.name_version, self.production]))
+        return digest.hexdigest()
+
+    def read_stamp(self):
+        try:
+            f = open(self._stamp_path())
+        except IOError:
+            return None
+        try:
+            try:
+                return json.load(f)
+            except ValueError:
+                return None
+        finally:
+            f.close()
+
+    def write_stamp(self, digest, dependencies):
+        stamp_path = self._stamp_path()
+        if not os.path.isdir(os.path.dirname(stamp_path)):
+            os.makedirs(os.path.dirname(stamp_path))
+        f = open(stamp_path, 'w')
+        try:
+            json.dump(dict(inputs=digest, dependencies=dependencies), f)
+        finally:
+            f.close()
+
+
+def dependency_states(installed, missing, outdated):
+    """Return the state found for each dependency."""
+    states = dict((dep, 'installed') for dep in installed)
+    states.update((dep, 'outdated') for dep in outdated)
+    states.update((dep, 'missing') for dep in missing)
+    return states
+
 
 def main():
     arg_spec = dict(
@@ -184,6 +270,7 @@ def main():
         relative_execpath=dict(default=None, required=False, type='path'),
         state=dict(default='present', choices=['present', 'absent', 'latest', ]),
         version=dict(default=None),
+        stamp=dict(default='no', type='bool'),
     )
     module = AnsibleModule(
         argument_spec=arg_spec
@@ -196,6 +283,7 @@ def main():
     relative_execpath = module.params['relative_execpath']
     state = module.params['state']
     version = module.params['version']
+    stamp = module.params['stamp']
 
     if state == 'absent' and not name:
         module.fail_json(msg='uninstalling a package is only available for named packages')
@@ -204,10 +292,20 @@ def main():
 
     changed = False
     if state == 'present':
+        digest = None
+        if stamp:
+            digest = bower.inputs_digest()
+            recorded = bower.read_stamp()
+            if digest and recorded and recorded.get('inputs') == digest:
+                module.exit_json(changed=False, dependencies=recorded.get('dependencies', {}))
+
         installed, missing, outdated = bower.list()
         if len(missing):
             changed = True
             bower.install()
+        if digest:
+            # missing dependencies are installed by now, outdated ones are not recorded
+            bower.write_stamp(digest, dependency_states(installed + missing, [], []))
     elif state == 'latest':
         installed, missing, outdated = bower.list()
         if len(missing) or len(outdated):
@@ -219,7 +317,7 @@ def main():
             changed = True
             bower.uninstall()
 
-    module.exit_json(changed=changed)
+    module.exit_json(changed=changed, dependencies=dependency_states(installed, missing, outdated))
 
 # Import module snippets
 from ansible.module_utils.basic import *
@@ -98,6 +98,20 @@ options:
         default: "no"
         choices: [ "yes", "no" ]
         aliases: [ "ignore-platform-reqs" ]
+    cache_options:
+        version_added: "2.1"
+        description:
+            - Cache the options supported by I(command) in the composer cache directory, so that composer is only asked for them again when the composer executable changes.
+        required: false
+        default: "no"
+        choices: [ "yes", "no" ]
+    lock_check:
+        version_added: "2.1"
+        description:
+            - With I(command=install), compare the packages of composer.lock with vendor/composer/installed.json and return without running composer when every locked package is installed at its locked version and no other package is.
+        required: false
+        default: "no"
+        choices: [ "yes", "no" ]
 requirements:
     - php
     - composer installed in bin path (recommended /usr/local/bin)
@@ -114,6 +128,9 @@ EXAMPLES = '''
     arguments: "my/package"
     working_dir: "/path/to/project"
 
+# Install the libs of composer.lock, unless vendor already holds exactly those
+- composer: command=install working_dir=/path/to/project lock_check=yes
+
 # Clone project and install with all dependencies
 - composer:
     command: "create-project"
@@ -124,6 +141,12 @@ EXAMPLES = '''
 
 import os
 import re
+import tempfile
+
+try:
+    from hashlib import sha1
+except ImportError:
+    from sha import sha as sha1
 
 try:
     import json
@@ -141,19 +164,119 @@ def parse_out(string):
 def has_changed(string):
     return "Nothing to install or update" not in string
 
-def get_available_options(module, command='install'):
+def get_composer_paths(module):
+    php_path      = module.get_bin_path("php", True, ["/usr/local/bin"])
+    composer_path = module.get_bin_path("composer", True, ["/usr/local/bin"])
+    return php_path, composer_path
+
+def get_options_cache_file(paths, command):
+    # the options are cached per command and composer executable, an update
+    # of composer changes its size or modification time
+    digest = sha1()
+    for path in paths:
+        stat = os.stat(path)
+        digest.update("%s %s %s\n" % (path, stat.st_size, stat.st_mtime))
+    digest.update(command)
+
+    composer_home = os.environ.get('COMPOSER_HOME', os.path.expanduser('~/.composer'))
+    cache_dir = os.environ.get('COMPOSER_CACHE_DIR', os.path.join(composer_home, 'cache'))
+    return os.path.join(cache_dir, 'ansible-options', '%s.json' % digest.hexdigest())
+
+def get_available_options(module, command='install', paths=None, cache=False):
     # get all availabe options from a composer command using composer help to json
-    rc, out, err = composer_command(module, "help %s --format=json" % command)
+    if paths is None:
+        paths = get_composer_paths(module)
+
+    cache_file = None
+    if cache:
+        cache_file = get_options_cache_file(paths, command)
+        try:
+            f = open(cache_file)
+            try:
+                return json.load(f)
+            finally:
+                f.close()
+        except (IOError, ValueError):
+            pass
+
+    rc, out, err = composer_command(module, "help %s --format=json" % command, paths=paths)
     if rc != 0:
         output = parse_out(err)
         module.fail_json(msg=output)
 
     command_help_json = json.loads(out)
-    return command_help_json['definition']['options']
+    available_options = command_help_json['definition']['options']
 
-def composer_command(module, command, arguments = "", options=[]):
-    php_path      = module.get_bin_path("php", True, ["/usr/local/bin"])
-    composer_path = module.get_bin_path("composer", True, ["/usr/local/bin"])
+    if cache_file:
+        # the cache is an optimization, failing to write it is not an error
+        try:
+            if not os.path.isdir(os.path.dirname(cache_file)):
+                os.makedirs(os.path.dirname(cache_file))
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(cache_file))
+            f = os.fdopen(fd, 'w')
+            try:
+                json.dump(available_options, f)
+            finally:
+                f.close()
+            os.rename(tmp, cache_file)
+        except (IOError, OSError):
+            pass
+
+    return available_options
+
+def get_locked_packages(working_dir, no_dev):
+    # packages of composer.lock, or None if there is no lock file
+    try:
+        f = open(os.path.join(working_dir, 'composer.lock'))
+        try:
+            lock = json.load(f)
+        finally:
+            f.close()
+    except (IOError, ValueError):
+        return None
+
+    packages = lock.get('packages', [])
+    if not no_dev:
+        packages = packages + lock.get('packages-dev', [])
+    return package_set(packages)
+
+def get_installed_packages(working_dir):
+    # packages of vendor/composer/installed.json, or None if there is none
+    try:
+        f = open(os.path.join(working_dir, 'vendor', 'composer', 'installed.json'))
+        try:
+            installed = json.load(f)
+        finally:
+            f.close()
+    except (IOError, ValueError):
+        return None
+
+    # composer 2 wraps the packages in an object
+    if isinstance(installed, dict):
+        installed = installed.get('packages', [])
+    return package_set(installed)
+
+def package_set(packages):
+    result = set()
+    for package in packages:
+        reference = None
+        for origin in ('source', 'dist'):
+            if package.get(origin) and package[origin].get('reference'):
+                reference = package[origin]['reference']
+                break
+        result.add((package['name'].lower(), package.get('version'), reference))
+    return result
+
+def is_up_to_date(working_dir, no_dev):
+    locked = get_locked_packages(working_dir, no_dev)
+    if locked is None:
+        return False
+    return locked == get_installed_packages(working_dir)
+
+def composer_command(module, command, arguments = "", options=[], paths=None):
+    if paths is None:
+        paths = get_composer_paths(module)
+    php_path, composer_path = paths
     cmd           = "%s %s %s %s %s" % (php_path, composer_path, command, " ".join(options), arguments)
     return module.run_command(cmd)
 
@@ -170,6 +293,8 @@ def main():
             no_plugins           = dict(default="no", type="bool", aliases=["no-plugins"]),
             optimize_autoloader  = dict(default="yes", type="bool", aliases=["optimize-autoloader"]),
             ignore_platform_reqs = dict(default="no", type="bool", aliases=["ignore-platform-reqs"]),
+            cache_options        = dict(default="no", type="bool"),
+            lock_check           = dict(default="no", type="bool"),
         ),
         supports_check_mode=True
     )
@@ -180,7 +305,15 @@ def main():
         module.fail_json(msg="Use the 'arguments' param for passing arguments with the 'command'")
 
     arguments = module.params['arguments']
-    available_options = get_available_options(module=module, command=command)
+    working_dir = os.path.abspath(module.params['working_dir'])
+
+    # An up to date vendor directory does not need composer, nor php
+    if module.params['lock_check'] and command == 'install' and not arguments:
+        if is_up_to_date(working_dir, module.params['no_dev']):
+            module.exit_json(changed=False, msg="vendor is up to date with composer.lock")
+
+    paths = get_composer_paths(module)
+    available_options = get_available_options(module=module, command=command, paths=paths, cache=module.params['cache_options'])
 
     options = []
 
@@ -196,7 +329,7 @@ def main():
             option = "--%s" % option
             options.append(option)
 
-    options.extend(['--working-dir', os.path.abspath(module.params['working_dir'])])
+    options.extend(['--working-dir', working_dir])
 
     option_params = {
         'prefer_source':        'prefer-source',
@@ -216,7 +349,7 @@ def main():
     if module.check_mode:
         options.append('--dry-run')
 
-    rc, out, err = composer_command(module, command, arguments, options)
+    rc, out, err = composer_command(module, command, arguments, options, paths)
 
     if rc != 0:
         output = parse_out(err)
@@ -30,6 +30,7 @@ options:
   name:
     description:
       - The name of the Perl library to install. You may use the "full distribution path", e.g.  MIYAGAWA/Plack-0.99_05.tar.gz
+      - Several libraries may be given as a list, they are checked by a single perl process and the missing ones are installed by a single cpanm run.
     required: false
     default: null
     aliases: ["pkg"]
@@ -66,7 +67,7 @@ options:
     version_added: "2.0"
   version:
     description:
-      - minimum version of perl module to consider acceptable
+      - minimum version of perl module to consider acceptable, applies to every library of I(name)
     required: false
     default: false
     version_added: "2.1"
@@ -111,25 +112,26 @@ EXAMPLES = '''
 # install Dancer perl package into the system root path
 - cpanm: name=Dancer system_lib=yes
 
+# install the Dancer and Plack perl packages, checking and installing both at once
+- cpanm: name=Dancer,Plack
+
 # install Dancer if it's not already installed
 # OR the installed version is older than version 1.0
 - cpanm: name=Dancer version=1.0
 '''
 
-def _is_package_installed(module, name, locallib, cpanm, version):
-    cmd = ""
+# Prints each module name argument which can be loaded, with at least the
+# version given as first argument
+INSTALLED_SCRIPT = 'my $v = shift; for (@ARGV) { print "$_\\n" if /^\\w+(::\\w+)*$/ && eval "use $_ $v; 1" }'
+
+def _installed_packages(module, names, locallib, version):
+    # check every module in a single perl process
     if locallib:
         os.environ["PERL5LIB"] = "%s/lib/perl5" % locallib
-    cmd = "%s perl -e ' use %s" % (cmd, name)
-    if version:
-       cmd = "%s %s;'" % (cmd, version)
-    else:
-       cmd = "%s;'" % cmd
+    cmd = ['perl', '-e', INSTALLED_SCRIPT, version or ''] + names
     res, stdout, stderr = module.run_command(cmd, check_rc=False)
-    if res == 0:
-       return True
-    else:
-       return False
+    # modules may print when loaded, only keep the requested names
+    return [line for line in stdout.splitlines() if line in names]
 
 def _build_cmd_line(name, from_path, notest, locallib, mirror, mirror_only, installdeps, cpanm, use_sudo):
     # this code should use "%s" like everything else and just return early but not fixing all of it now.
@@ -169,7 +171,7 @@ def _get_cpanm_path(module):
 
 def main():
     arg_spec = dict(
-        name=dict(default=None, required=False, aliases=['pkg']),
+        name=dict(default=None, required=False, aliases=['pkg'], type='list'),
         from_path=dict(default=None, required=False),
         notest=dict(default=False, type='bool'),
         locallib=dict(default=None, required=False),
@@ -199,11 +201,14 @@ def main():
 
     changed   = False
 
-    installed = _is_package_installed(module, name, locallib, cpanm, version)
+    missing = []
+    if name:
+        installed = _installed_packages(module, name, locallib, version)
+        missing   = [n for n in name if n not in installed]
 
-    if not installed:
+    if missing or not name:
         out_cpanm = err_cpanm = ''
-        cmd       = _build_cmd_line(name, from_path, notest, locallib, mirror, mirror_only, installdeps, cpanm, use_sudo)
+        cmd       = _build_cmd_line(" ".join(missing), from_path, notest, locallib, mirror, mirror_only, installdeps, cpanm, use_sudo)
 
         rc_cpanm, out_cpanm, err_cpanm = module.run_command(cmd, check_rc=False)
 
@@ -213,6 +218,9 @@ def main():
         if err_cpanm and 'is up to date' not in err_cpanm:
             changed = True
 
+    # name is returned as given, a comma separated string
+    if name:
+        name = ','.join(name)
     module.exit_json(changed=changed, binary=cpanm, name=name)
 
 # import module snippets
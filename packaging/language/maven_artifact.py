@@ -24,7 +24,10 @@ __author__ = 'cschmidt'
 from lxml import etree
 import os
 import hashlib
-import sys
+import shutil
+import tempfile
+import threading
+import time
 
 DOCUMENTATION = '''
 ---
@@ -96,6 +99,52 @@ options:
         default: 'yes'
         choices: ['yes', 'no']
         version_added: "1.9.3"
+    checksum_algorithm:
+        description:
+            - The checksum published next to the artifact in the repository, with this algorithm as extension,
+              used to verify the artifact. It is computed while the artifact is downloaded.
+        required: false
+        default: sha1
+        choices: [md5, sha1, sha256]
+        version_added: "2.1"
+    download_segments:
+        description:
+            - Number of parallel range requests used to download large artifacts. Each segment is at least 4 MB
+              and segments are only used when the repository accepts range requests.
+        required: false
+        default: 1
+        version_added: "2.1"
+    cache_dir:
+        description:
+            - Directory of a local artifact cache, which can be shared between hosts over NFS. Artifacts are kept
+              in it by checksum, and the checksum of every artifact coordinate and version by repository. An
+              artifact found in the cache is copied or linked to I(dest) instead of being downloaded.
+        required: false
+        default: null
+        version_added: "2.1"
+    cache_mode:
+        description:
+            - How artifacts are placed from the cache to I(dest). With C(hardlink), I(dest) shares its data and
+              attributes with the cache entry, and artifacts are copied when I(dest) is on another file system.
+              Cached artifacts are verified against their checksum before they are used, and evicted on a mismatch.
+        required: false
+        default: copy
+        choices: [copy, hardlink]
+        version_added: "2.1"
+    metadata_cache_ttl:
+        description:
+            - Number of seconds C(maven-metadata.xml), used to resolve C(latest) and SNAPSHOT versions, is reused
+              from I(cache_dir) before it is downloaded again. C(0) always downloads it. Has no effect without
+              I(cache_dir).
+        required: false
+        default: 60
+        version_added: "2.1"
+notes:
+    - The artifact is downloaded to a C(.part) file next to I(dest), which is moved to I(dest) once its checksum
+      is verified. An interrupted download is resumed from that file by the next run when the repository accepts
+      range requests.
+    - Artifacts are verified with their SHA-1 checksum by default, earlier versions of this module verified the
+      MD5 checksum. Set I(checksum_algorithm=md5) for repositories that only publish MD5 checksums.
 '''
 
 EXAMPLES = '''
@@ -110,6 +159,12 @@ EXAMPLES = '''
 
 # Download a WAR File to the Tomcat webapps directory to be deployed
 - maven_artifact: group_id=com.company artifact_id=web-app extension=war repository_url=https://repo.company.com/maven dest=/var/lib/tomcat7/webapps/web-app.war
+
+# Download a large WAR File with 4 parallel requests, verified with its SHA-256 checksum
+- maven_artifact: group_id=com.company artifact_id=web-app extension=war repository_url=https://repo.company.com/maven dest=/var/lib/tomcat7/webapps/web-app.war download_segments=4 checksum_algorithm=sha256
+
+# Download the latest snapshot through an artifact cache shared over NFS
+- maven_artifact: group_id=com.company artifact_id=web-app version=1.0-SNAPSHOT extension=war repository_url=https://repo.company.com/maven dest=/var/lib/tomcat7/webapps/web-app.war cache_dir=/mnt/maven-cache cache_mode=hardlink
 '''
 
 class Artifact(object):
@@ -180,16 +235,58 @@ class Artifact(object):
 
 
 class MavenDownloader:
-    def __init__(self, module, base="http://repo1.maven.org/maven2"):
+    # Smallest segment of a parallel download, in bytes
+    SEGMENT_MIN_SIZE = 4 * 1024 * 1024
+
+    def __init__(self, module, base="http://repo1.maven.org/maven2", cache_dir=None, metadata_cache_ttl=0):
         self.module = module
         if base.endswith("/"):
             base = base.rstrip("/")
         self.base = base
         self.user_agent = "Maven Artifact Downloader/1.0"
+        self.cache_dir = cache_dir
+        self.metadata_cache_ttl = metadata_cache_ttl
+
+    def _cache_path(self, kind, path):
+        # Entries of different repositories are kept apart
+        repository = hashlib.sha1(self.base).hexdigest()[:12]
+        return os.path.join(self.cache_dir, kind, repository, path.lstrip("/"))
+
+    def _cache_write(self, cache_file, data):
+        # Write to a temporary file and rename it, hosts sharing the cache
+        # never read a partial entry
+        directory = os.path.dirname(cache_file)
+        if not os.path.isdir(directory):
+            try:
+                os.makedirs(directory)
+            except OSError:
+                if not os.path.isdir(directory):
+                    raise
+        fd, tmp = tempfile.mkstemp(dir=directory)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.rename(tmp, cache_file)
+
+    def _metadata(self, path):
+        """Return the parsed maven-metadata.xml at path.
+
+        It is read from the metadata cache while it is younger than the
+        metadata cache TTL, and downloaded into the cache otherwise.
+        """
+        if not self.cache_dir or not self.metadata_cache_ttl:
+            return self._request(self.base + path, "Failed to download maven-metadata.xml", lambda r, i: etree.parse(r))
+
+        cache_file = self._cache_path("metadata", path)
+        if os.path.exists(cache_file) and time.time() - os.path.getmtime(cache_file) < self.metadata_cache_ttl:
+            return etree.parse(cache_file)
+
+        data = self._request(self.base + path, "Failed to download maven-metadata.xml", lambda r, i: r.read())
+        self._cache_write(cache_file, data)
+        return etree.fromstring(data).getroottree()
 
     def _find_latest_version_available(self, artifact):
         path = "/%s/maven-metadata.xml" % (artifact.path(False))
-        xml = self._request(self.base + path, "Failed to download maven-metadata.xml", lambda r: etree.parse(r))
+        xml = self._metadata(path)
         v = xml.xpath("/metadata/versioning/versions/version[last()]/text()")
         if v:
             return v[0]
@@ -197,7 +294,7 @@ class MavenDownloader:
     def find_uri_for_artifact(self, artifact):
         if artifact.is_snapshot():
             path = "/%s/maven-metadata.xml" % (artifact.path())
-            xml = self._request(self.base + path, "Failed to download maven-metadata.xml", lambda r: etree.parse(r))
+            xml = self._metadata(path)
             timestamp = xml.xpath("/metadata/versioning/snapshot/timestamp/text()")[0]
             buildNumber = xml.xpath("/metadata/versioning/snapshot/buildNumber/text()")[0]
             return self._uri_for_artifact(artifact, artifact.version.replace("SNAPSHOT", timestamp + "-" + buildNumber))
@@ -214,17 +311,17 @@ class MavenDownloader:
 
         return self.base + "/" + artifact.path() + "/" + artifact.artifact_id + "-" + version + "." + artifact.extension
 
-    def _request(self, url, failmsg, f):
+    def _request(self, url, failmsg, f, headers=None, method=None, status=(200,)):
         # Hack to add parameters in the way that fetch_url expects
         self.module.params['url_username'] = self.module.params.get('username', '')
         self.module.params['url_password'] = self.module.params.get('password', '')
         self.module.params['http_agent'] = self.module.params.get('user_agent', None)
 
-        response, info = fetch_url(self.module, url)
-        if info['status'] != 200:
+        response, info = fetch_url(self.module, url, headers=headers, method=method)
+        if info['status'] not in status:
             raise ValueError(failmsg + " because of " + info['msg'] + "for URL " + url)
         else:
-            return f(response)
+            return f(response, info)
 
 
     def download(self, artifact, filename=None):
@@ -234,30 +331,198 @@ class MavenDownloader:
                                 artifact.classifier, artifact.extension)
 
         url = self.find_uri_for_artifact(artifact)
-        if not self.verify_md5(filename, url + ".md5"):
-            response = self._request(url, "Failed to download artifact " + str(artifact), lambda r: r)
-            if response:
-                with open(filename, 'w') as f:
-                    # f.write(response.read())
-                    self._write_chunks(response, f, report_hook=self.chunk_report)
+        remote_checksum = self._remote_checksum(url)
+        if not self.verify_checksum(filename, url, remote_checksum):
+            if self._copy_from_cache(remote_checksum, filename):
                 return True
-            else:
-                return False
+
+            # Download next to the destination, into a partial file which is
+            # resumed if a previous download was interrupted
+            part = filename + ".part"
+            resumed = bool(self._partial_files(part))
+            checksum = self._download(url, part)
+            if checksum.hexdigest() != remote_checksum and resumed:
+                # The interrupted download may be of a previous artifact, start over
+                self._remove_partial_files(part)
+                checksum = self._download(url, part)
+            if checksum.hexdigest() != remote_checksum:
+                self._remove_partial_files(part)
+                raise ValueError("Checksum mismatch for artifact " + str(artifact) + ": expected " +
+                                 remote_checksum + ", got " + checksum.hexdigest())
+            self.module.atomic_move(part, filename)
+            self._add_to_cache(filename, remote_checksum)
+            return True
         else:
             return True
 
-    def chunk_report(self, bytes_so_far, chunk_size, total_size):
-        percent = float(bytes_so_far) / total_size
-        percent = round(percent * 100, 2)
-        sys.stdout.write("Downloaded %d of %d bytes (%0.2f%%)\r" %
-                         (bytes_so_far, total_size, percent))
+    def _cache_object(self, checksum):
+        algorithm = self.module.params['checksum_algorithm']
+        return os.path.join(self.cache_dir, "objects", algorithm, checksum[:2], checksum)
 
-        if bytes_so_far >= total_size:
-            sys.stdout.write('\n')
-
-    def _write_chunks(self, response, file, chunk_size=8192, report_hook=None):
-        total_size = response.info().getheader('Content-Length').strip()
-        total_size = int(total_size)
+    def _link_or_copy(self, src, dest):
+        """Link or copy src to dest, returning whether dest is a hard link."""
+        if self.module.params.get('cache_mode', 'copy') == 'hardlink':
+            try:
+                os.link(src, dest)
+                return True
+            except OSError:
+                # Not supported or across file systems
+                pass
+        shutil.copyfile(src, dest)
+        return False
+
+    def _copy_from_cache(self, remote_checksum, filename):
+        """Place the artifact with remote_checksum from the cache into filename, if it is cached."""
+        if not self.cache_dir:
+            return False
+        cache_object = self._cache_object(remote_checksum)
+        if not os.path.exists(cache_object):
+            return False
+        checksum = self._new_checksum()
+        self._update_checksum(checksum, cache_object)
+        if checksum.hexdigest() != remote_checksum:
+            # Truncated or corrupted entry, evict it and download again
+            try:
+                os.remove(cache_object)
+            except OSError:
+                pass
+            return False
+        part = filename + ".part"
+        self._remove_partial_files(part)
+        if self._link_or_copy(cache_object, part):
+            # atomic_move would apply the attributes of an existing dest to
+            # the inode shared with the cache, a plain rename keeps them
+            os.rename(part, filename)
+        else:
+            self.module.atomic_move(part, filename)
+        return True
+
+    def _add_to_cache(self, filename, checksum):
+        if not self.cache_dir:
+            return
+        cache_object = self._cache_object(checksum)
+        if os.path.exists(cache_object):
+            return
+        directory = os.path.dirname(cache_object)
+        if not os.path.isdir(directory):
+            try:
+                os.makedirs(directory)
+            except OSError:
+                if not os.path.isdir(directory):
+                    raise
+        tmp = "%s.%s.tmp" % (cache_object, os.getpid())
+        self._link_or_copy(filename, tmp)
+        os.rename(tmp, cache_object)
+
+    def _new_checksum(self):
+        return hashlib.new(self.module.params['checksum_algorithm'])
+
+    def _download(self, url, part):
+        size = None
+        if self.module.params.get('download_segments', 1) > 1:
+            size = self._segmentable_size(url)
+        if size:
+            return self._download_segments(url, part, size, self.module.params['download_segments'])
+        else:
+            return self._download_resume(url, part)
+
+    def _partial_files(self, part):
+        directory = os.path.dirname(part) or '.'
+        name = os.path.basename(part)
+        return [os.path.join(directory, f) for f in os.listdir(directory)
+                if f == name or (f.startswith(name + ".") and f[len(name) + 1:].isdigit())]
+
+    def _remove_partial_files(self, part):
+        for f in self._partial_files(part):
+            os.remove(f)
+
+    def _download_resume(self, url, part):
+        """Download url into part, resuming after the bytes already in it.
+
+        Returns the checksum of the whole file, computed while writing it. Only
+        the bytes kept from an interrupted download are read back.
+        """
+        checksum = self._new_checksum()
+        offset = 0
+        if os.path.exists(part):
+            offset = self._update_checksum(checksum, part)
+
+        headers = {}
+        if offset:
+            headers['Range'] = "bytes=%d-" % offset
+        response, info = self._request(url, "Failed to download artifact", lambda r, i: (r, i),
+                                       headers=headers, status=(200, 206, 416))
+        if info['status'] == 416:
+            # The interrupted download was already complete
+            return checksum
+
+        mode = 'ab'
+        if info['status'] == 200:
+            # The range was ignored, start over
+            checksum = self._new_checksum()
+            mode = 'wb'
+        with open(part, mode) as f:
+            self._write_chunks(response, f, checksum)
+        return checksum
+
+    def _segmentable_size(self, url):
+        """Return the size of the artifact if it can be downloaded in ranges."""
+        info = self._request(url, "Failed to query artifact", lambda r, i: i, method='HEAD')
+        if info.get('accept-ranges', 'none').lower() != 'bytes':
+            return None
+        try:
+            size = int(info.get('content-length'))
+        except (TypeError, ValueError):
+            return None
+        if size < self.SEGMENT_MIN_SIZE * 2:
+            return None
+        return size
+
+    def _download_segments(self, url, part, size, segments):
+        """Download url into part with a range request per segment, in parallel.
+
+        Each segment goes to its own file, resumed like a single download, and
+        the segments are then joined into part. The checksum is computed while
+        joining, so every byte is read back once.
+        """
+        segments = min(segments, size // self.SEGMENT_MIN_SIZE)
+        bounds = [size * i // segments for i in range(segments + 1)]
+        errors = []
+
+        def fetch(index):
+            segment = "%s.%d" % (part, index)
+            start = bounds[index]
+            end = bounds[index + 1] - 1
+            try:
+                if os.path.exists(segment):
+                    start += os.path.getsize(segment)
+                if start > end:
+                    return
+                response = self._request(url, "Failed to download segment %d of artifact" % index, lambda r, i: r,
+                                         headers={'Range': "bytes=%d-%d" % (start, end)}, status=(206,))
+                with open(segment, 'ab') as f:
+                    self._write_chunks(response, f)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=fetch, args=(index,)) for index in range(segments)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if errors:
+            raise ValueError(str(errors[0]))
+
+        checksum = self._new_checksum()
+        with open(part, 'wb') as f:
+            for index in range(segments):
+                segment = "%s.%d" % (part, index)
+                with open(segment, 'rb') as s:
+                    self._write_chunks(s, f, checksum)
+                os.remove(segment)
+        return checksum
+
+    def _write_chunks(self, response, file, checksum=None, chunk_size=65536):
         bytes_so_far = 0
 
         while 1:
@@ -268,25 +533,47 @@ class MavenDownloader:
                 break
 
             file.write(chunk)
-            if report_hook:
-                report_hook(bytes_so_far, chunk_size, total_size)
+            if checksum:
+                checksum.update(chunk)
 
         return bytes_so_far
 
-    def verify_md5(self, file, remote_md5):
+    def _remote_checksum(self, url):
+        algorithm = self.module.params['checksum_algorithm']
+        # Artifact URLs hold a release or a unique snapshot version, so their
+        # checksums never change and are cached without expiry
+        cache_file = None
+        if self.cache_dir:
+            cache_file = self._cache_path("checksums", url[len(self.base):] + "." + algorithm)
+            if os.path.exists(cache_file):
+                with open(cache_file) as f:
+                    return f.read().strip()
+
+        remote = self._request(url + "." + algorithm, "Failed to download " + algorithm.upper() + " checksum",
+                               lambda r, i: r.read())
+        # The checksum can be followed by the file name
+        checksum = remote.strip().split(' ')[0].lower()
+        if cache_file:
+            self._cache_write(cache_file, checksum)
+        return checksum
+
+    def verify_checksum(self, file, url, remote_checksum=None):
         if not os.path.exists(file):
             return False
         else:
-            local_md5 = self._local_md5(file)
-            remote = self._request(remote_md5, "Failed to download MD5", lambda r: r.read())
-            return local_md5 == remote
-
-    def _local_md5(self, file):
-        md5 = hashlib.md5()
+            if remote_checksum is None:
+                remote_checksum = self._remote_checksum(url)
+            checksum = self._new_checksum()
+            self._update_checksum(checksum, file)
+            return checksum.hexdigest() == remote_checksum
+
+    def _update_checksum(self, checksum, file):
+        size = 0
         with open(file, 'rb') as f:
-            for chunk in iter(lambda: f.read(8192), ''):
-                md5.update(chunk)
-        return md5.hexdigest()
+            for chunk in iter(lambda: f.read(65536), ''):
+                checksum.update(chunk)
+                size += len(chunk)
+        return size
 
 
 def main():
@@ -303,6 +590,11 @@ def main():
             state = dict(default="present", choices=["present","absent"]), # TODO - Implement a "latest" state
             dest = dict(type="path", default=None),
             validate_certs = dict(required=False, default=True, type='bool'),
+            checksum_algorithm = dict(default='sha1', choices=['md5', 'sha1', 'sha256']),
+            download_segments = dict(default=1, type='int'),
+            cache_dir = dict(type="path", default=None),
+            cache_mode = dict(default='copy', choices=['copy', 'hardlink']),
+            metadata_cache_ttl = dict(default=60, type='int'),
         )
     )
 
@@ -321,7 +613,7 @@ def main():
         repository_url = "http://repo1.maven.org/maven2"
 
     #downloader = MavenDownloader(module, repository_url, repository_username, repository_password)
-    downloader = MavenDownloader(module, repository_url)
+    downloader = MavenDownloader(module, repository_url, module.params["cache_dir"], module.params["metadata_cache_ttl"])
 
     try:
         artifact = Artifact(group_id, artifact_id, version, classifier, extension)
@@ -334,7 +626,7 @@ def main():
     if os.path.lexists(dest):
         if not artifact.is_snapshot():
             prev_state = "present"
-        elif downloader.verify_md5(dest, downloader.find_uri_for_artifact(artifact) + '.md5'):
+        elif downloader.verify_checksum(dest, downloader.find_uri_for_artifact(artifact)):
             prev_state = "present"
     else:
         path = os.path.dirname(dest)
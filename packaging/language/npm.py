@@ -74,6 +74,19 @@ options:
     required: false
     default: present
     choices: [ "present", "absent", "latest" ]
+  stamp:
+    description:
+      - Record a digest of package.json, npm-shrinkwrap.json, package-lock.json and the install options
+        in node_modules/.ansible-npm-stamp after a successful run with I(state=present). Later runs with
+        the same digest return the recorded dependencies without running npm.
+      - Only used with I(path) and without I(global).
+    required: false
+    choices: [ "yes", "no" ]
+    default: no
+    version_added: "2.1"
+notes:
+  - The state found for each top level dependency, C(installed), C(missing) or C(outdated), is returned
+    in C(dependencies).
 '''
 
 EXAMPLES = '''
@@ -98,12 +111,20 @@ description: Install packages based on package.json.
 description: Update packages based on package.json to their latest version.
 - npm: path=/app/location state=latest
 
+description: Install packages based on package.json, only running npm when it or the lockfile changed.
+- npm: path=/app/location stamp=yes
+
 description: Install packages based on package.json using the npm installed with nvm v0.10.1.
 - npm: path=/app/location executable=/opt/nvm/v0.10.1/bin/npm state=present
 '''
 
 import os
 
+try:
+    from hashlib import sha1
+except ImportError:
+    from sha import sha as sha1
+
 try:
     import json
 except ImportError:
@@ -114,6 +135,10 @@ except ImportError:
         pass
 
 
+# Files whose content decides the packages installed in a path
+NPM_INPUT_FILES = ['package.json', 'npm-shrinkwrap.json', 'package-lock.json']
+
+
 class Npm(object):
     def __init__(self, module, **kwargs):
         self.module = module
@@ -166,7 +191,8 @@ class Npm(object):
         return ''
 
     def list(self):
-        cmd = ['list', '--json']
+        # Only the top level dependencies are reported, skip walking the tree
+        cmd = ['list', '--json', '--depth=0']
 
         installed = list()
         missing = list()
@@ -208,6 +234,60 @@ class Npm(object):
 
         return outdated
 
+    def _stamp_path(self):
+        path = os.path.abspath(os.path.expanduser(self.path))
+        return os.path.join(path, 'node_modules', '.ansible-npm-stamp')
+
+    def inputs_digest(self):
+        """Return a digest of the files and options deciding what is installed
+        in the path, or None if the path has no package.json."""
+        path = os.path.abspath(os.path.expanduser(self.path))
+        if not os.path.isfile(os.path.join(path, 'package.json')):
+            return None
+
+        digest = sha1()
+        for name in NPM_INPUT_FILES:
+            input_file = os.path.join(path, name)
+            if os.path.isfile(input_file):
+                f = open(input_file, 'rb')
+                try:
+                    digest.update(name + '\0' + f.read() + '\0')
+                finally:
+                    f.close()
+        digest.update(json.dumps([self.name_version, self.production, self.ignore_scripts, self.registry]))
+        return digest.hexdigest()
+
+    def read_stamp(self):
+        try:
+            f = open(self._stamp_path())
+        except IOError:
+            return None
+        try:
+            try:
+                return json.load(f)
+            except ValueError:
+                return None
+        finally:
+            f.close()
+
+    def write_stamp(self, digest, dependencies):
+        stamp_path = self._stamp_path()
+        if not os.path.isdir(os.path.dirname(stamp_path)):
+            os.makedirs(os.path.dirname(stamp_path))
+        f = open(stamp_path, 'w')
+        try:
+            json.dump(dict(inputs=digest, dependencies=dependencies), f)
+        finally:
+            f.close()
+
+
+def dependency_states(installed, missing, outdated=None):
+    """Return the state found for each dependency."""
+    states = dict((dep, 'installed') for dep in installed)
+    states.update((dep, 'outdated') for dep in outdated or [])
+    states.update((dep, 'missing') for dep in missing)
+    return states
+
 
 def main():
     arg_spec = dict(
@@ -219,6 +299,7 @@ def main():
         registry=dict(default=None),
         state=dict(default='present', choices=['present', 'absent', 'latest']),
         ignore_scripts=dict(default=False, type='bool'),
+        stamp=dict(default=False, type='bool'),
     )
     arg_spec['global'] = dict(default='no', type='bool')
     module = AnsibleModule(
@@ -235,6 +316,7 @@ def main():
     registry = module.params['registry']
     state = module.params['state']
     ignore_scripts = module.params['ignore_scripts']
+    stamp = module.params['stamp'] and path and not glbl
 
     if not path and not glbl:
         module.fail_json(msg='path must be specified when not using global')
@@ -246,23 +328,35 @@ def main():
 
     changed = False
     if state == 'present':
+        digest = None
+        if stamp:
+            digest = npm.inputs_digest()
+            recorded = npm.read_stamp()
+            if digest and recorded and recorded.get('inputs') == digest:
+                module.exit_json(changed=False, dependencies=recorded.get('dependencies', {}))
+
         installed, missing = npm.list()
+        dependencies = dependency_states(installed, missing)
         if len(missing):
             changed = True
             npm.install()
+        if digest and not module.check_mode:
+            npm.write_stamp(digest, dependency_states(installed + missing, []))
     elif state == 'latest':
         installed, missing = npm.list()
         outdated = npm.list_outdated()
+        dependencies = dependency_states(installed, missing, outdated)
         if len(missing) or len(outdated):
             changed = True
             npm.update()
     else: #absent
         installed, missing = npm.list()
+        dependencies = dependency_states(installed, missing)
         if name in installed:
             changed = True
             npm.uninstall()
 
-    module.exit_json(changed=changed)
+    module.exit_json(changed=changed, dependencies=dependencies)
 
 # import module snippets
 from ansible.module_utils.basic import *
@@ -58,114 +58,163 @@ EXAMPLES = '''
 '''
 
 import os
-
-def get_local_version(pear_output):
-    """Take pear remoteinfo output and get the installed version"""
-    lines = pear_output.split('\n')
-    for line in lines:
-        if 'Installed ' in line:
-            installed = line.rsplit(None, 1)[-1].strip()
-            if installed == '-': continue
-            return installed
-    return None
-
-def get_repository_version(pear_output):
-    """Take pear remote-info output and get the latest version"""
-    lines = pear_output.split('\n')
-    for line in lines:
-        if 'Latest ' in line:
-            return line.rsplit(None, 1)[-1].strip()
-    return None
-
-def query_package(module, name, state="present"):
-    """Query the package status in both the local system and the repository.
+import re
+
+def package_keys(channel, name, aliases):
+    """Return the names a package of a channel can be referred to by."""
+    name = name.lower()
+    channel = channel.lower()
+    keys = [name, '%s/%s' % (channel, name)]
+    # channels are also known by their alias, e.g. pecl for pecl.php.net
+    if aliases.get(channel):
+        keys.append('%s/%s' % (aliases[channel], name))
+    return keys
+
+def parse_tables(output):
+    """Return the rows of the tables printed by pear, as dicts indexed by the
+    upper-cased column headings. The headings follow the ==== line under the
+    table caption and give the offset of each column."""
+    rows = []
+    columns = None
+    lines = output.split('\n')
+    for i, line in enumerate(lines):
+        underlined = i + 1 < len(lines) and lines[i + 1].startswith('=')
+        if i > 0 and lines[i - 1].startswith('=') and line.strip():
+            columns = [(m.group(0).upper(), m.start()) for m in re.finditer(r'\S+', line)]
+        elif not line.strip() or line.startswith('=') or underlined:
+            # blank lines and table captions end a table
+            columns = None
+        elif columns and not [start for heading, start in columns if line[start - 1:start].strip()]:
+            # a row has a space before every column, other lines are messages
+            row = {}
+            for n, (heading, start) in enumerate(columns):
+                if n + 1 < len(columns):
+                    row[heading] = line[start:columns[n + 1][1]].strip()
+                else:
+                    row[heading] = line[start:].strip()
+            rows.append(row)
+    return rows
+
+def get_channel_aliases(module):
+    """Return the alias of every registered channel, from a single pear list-channels."""
+    rc, stdout, stderr = module.run_command("pear list-channels", check_rc=False)
+    if rc != 0:
+        module.fail_json(msg="failed to list channels", stdout=stdout, stderr=stderr)
+
+    aliases = {}
+    for row in parse_tables(stdout):
+        if row.get('CHANNEL') and row.get('ALIAS'):
+            aliases[row['CHANNEL'].lower()] = row['ALIAS'].lower()
+    return aliases
+
+def get_installed_packages(module, aliases):
+    """Return the installed packages of every channel, from a single pear list -a.
+    Packages are indexed by each of the names returned by package_keys."""
+    rc, stdout, stderr = module.run_command("pear list -a", check_rc=False)
+    if rc != 0:
+        module.fail_json(msg="failed to list installed packages", stderr=stderr)
+
+    installed = {}
+    channel = None
+    for line in stdout.split('\n'):
+        fields = line.split()
+        if line.startswith('INSTALLED PACKAGES, CHANNEL '):
+            channel = line[len('INSTALLED PACKAGES, CHANNEL '):].rstrip(':').strip()
+        elif channel and len(fields) >= 2 and fields[0] != 'PACKAGE' and line[0] not in '=(':
+            for key in package_keys(channel, fields[0], aliases):
+                installed[key] = fields[1]
+    return installed
+
+def get_upgradable_packages(module, aliases):
+    """Return the packages with an available upgrade, from a single pear list-upgrades,
+    indexed like get_installed_packages."""
+    rc, stdout, stderr = module.run_command("pear list-upgrades", check_rc=False)
+    if rc != 0:
+        module.fail_json(msg="failed to list package upgrades", stdout=stdout, stderr=stderr)
+
+    upgradable = {}
+    # CHANNEL PACKAGE LOCAL REMOTE SIZE
+    for row in parse_tables(stdout):
+        if row.get('CHANNEL') and row.get('PACKAGE'):
+            for key in package_keys(row['CHANNEL'], row['PACKAGE'], aliases):
+                upgradable[key] = True
+    return upgradable
+
+def query_package(module, name, installed, upgradable=None):
+    """Query the package status in the installed packages and upgrades,
+    as returned by get_installed_packages and get_upgradable_packages.
     Returns a boolean to indicate if the package is installed,
     and a second boolean to indicate if the package is up-to-date."""
-    if state == "present":
-        lcmd = "pear info %s" % (name)
-        lrc, lstdout, lstderr = module.run_command(lcmd, check_rc=False)
-        if lrc != 0:
-            # package is not installed locally
-            return False, False
-
-        rcmd = "pear remote-info %s" % (name)
-        rrc, rstdout, rstderr = module.run_command(rcmd, check_rc=False)
-
-        # get the version installed locally (if any)
-        lversion = get_local_version(rstdout)
-
-        # get the version in the repository
-        rversion = get_repository_version(rstdout)
-
-        if rrc == 0:
-            # Return True to indicate that the package is installed locally,
-            # and the result of the version number comparison
-            # to determine if the package is up-to-date.
-            return True, (lversion == rversion)
-
+    if name.lower() not in installed:
+        # package is not installed locally
         return False, False
 
+    return True, name.lower() not in (upgradable or {})
+
 
 def remove_packages(module, packages):
-    remove_c = 0
-    # Using a for loop incase of error, we can report the package that failed
-    for package in packages:
-        # Query the package first, to see if we even need to remove
-        installed, updated = query_package(module, package)
-        if not installed:
-            continue
+    installed = get_installed_packages(module, get_channel_aliases(module))
 
-        cmd = "pear uninstall %s" % (package)
+    # Query the packages first, to see if we even need to remove
+    to_remove = [package for package in packages if query_package(module, package, installed)[0]]
+
+    if to_remove:
+        cmd = "pear uninstall %s" % (" ".join(to_remove))
         rc, stdout, stderr = module.run_command(cmd, check_rc=False)
 
         if rc != 0:
-            module.fail_json(msg="failed to remove %s" % (package))
-
-        remove_c += 1
+            module.fail_json(msg="failed to remove %s" % (" ".join(to_remove)), stdout=stdout, stderr=stderr)
 
-    if remove_c > 0:
-
-        module.exit_json(changed=True, msg="removed %s package(s)" % remove_c)
+        module.exit_json(changed=True, msg="removed %s package(s)" % len(to_remove))
 
     module.exit_json(changed=False, msg="package(s) already absent")
 
 
 def install_packages(module, state, packages):
-    install_c = 0
+    aliases = get_channel_aliases(module)
+    installed = get_installed_packages(module, aliases)
+    upgradable = None
+    if state == 'latest':
+        upgradable = get_upgradable_packages(module, aliases)
 
-    for i, package in enumerate(packages):
+    to_install = []
+    for package in packages:
         # if the package is installed and state == present
         # or state == latest and is up-to-date then skip
-        installed, updated = query_package(module, package)
-        if installed and (state == 'present' or (state == 'latest' and updated)):
+        is_installed, updated = query_package(module, package, installed, upgradable)
+        if is_installed and (state == 'present' or (state == 'latest' and updated)):
             continue
+        to_install.append(package)
 
-        if state == 'present':
-            command = 'install'
+    if state == 'present':
+        command = 'install'
 
-        if state == 'latest':
-            command = 'upgrade'
+    if state == 'latest':
+        command = 'upgrade'
 
-        cmd = "pear %s %s" % (command, package)
+    if to_install:
+        cmd = "pear %s %s" % (command, " ".join(to_install))
         rc, stdout, stderr = module.run_command(cmd, check_rc=False)
 
         if rc != 0:
-            module.fail_json(msg="failed to install %s" % (package))
-
-        install_c += 1
+            module.fail_json(msg="failed to install %s" % (" ".join(to_install)), stdout=stdout, stderr=stderr)
 
-    if install_c > 0:
-        module.exit_json(changed=True, msg="installed %s package(s)" % (install_c))
+        module.exit_json(changed=True, msg="installed %s package(s)" % len(to_install))
 
     module.exit_json(changed=False, msg="package(s) already installed")
 
 
 def check_packages(module, packages, state):
     would_be_changed = []
+    aliases = get_channel_aliases(module)
+    installed = get_installed_packages(module, aliases)
+    upgradable = None
+    if state == 'latest':
+        upgradable = get_upgradable_packages(module, aliases)
     for package in packages:
-        installed, updated = query_package(module, package)
-        if ((state in ["present", "latest"] and not installed) or
-                (state == "absent" and installed) or
+        is_installed, updated = query_package(module, package, installed, upgradable)
+        if ((state in ["present", "latest"] and not is_installed) or
+                (state == "absent" and is_installed) or
                 (state == "latest" and not updated)):
             would_be_changed.append(package)
     if would_be_changed:
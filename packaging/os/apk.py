@@ -89,6 +89,8 @@ EXAMPLES = '''
 import os
 import re
 
+APK_INSTALLED_DB = '/lib/apk/db/installed'
+
 def update_package_db(module):
     cmd = "%s update" % (APK_PATH)
     rc, stdout, stderr = module.run_command(cmd, check_rc=False)
@@ -97,7 +99,31 @@ def update_package_db(module):
     else:
         module.fail_json(msg="could not update package db")
 
-def query_package(module, name):
+def get_installed_packages(module):
+    """ Returns a dict of installed package names and versions, read from the apk database, or None if it can not be read. """
+    try:
+        f = open(APK_INSTALLED_DB)
+    except IOError:
+        return None
+
+    packages = {}
+    name = None
+    try:
+        # records are separated by blank lines, with the name in P: and the version in V:
+        for line in f:
+            if line.startswith('P:'):
+                name = line[2:].strip()
+            elif line.startswith('V:') and name:
+                packages[name] = line[2:].strip()
+            elif not line.strip():
+                name = None
+    finally:
+        f.close()
+    return packages
+
+def query_package(module, name, installed=None):
+    if installed is not None:
+        return name in installed
     cmd = "%s -v info --installed %s" % (APK_PATH, name)
     rc, stdout, stderr = module.run_command(cmd, check_rc=False)
     if rc == 0:
@@ -105,14 +131,19 @@ def query_package(module, name):
     else:
         return False
 
-def query_latest(module, name):
-    cmd = "%s version %s" % (APK_PATH, name)
+def query_latest(module, names):
+    """ Returns the names of the packages which are not at the latest version, from a single apk version. """
+    if not names:
+        return []
+    cmd = "%s version %s" % (APK_PATH, " ".join(names))
     rc, stdout, stderr = module.run_command(cmd, check_rc=False)
-    search_pattern = "(%s)-[\d\.\w]+-[\d\w]+\s+(.)\s+[\d\.\w]+-[\d\w]+\s+" % (name)
-    match = re.search(search_pattern, stdout)
-    if match and match.group(2) == "<":
-        return False
-    return True
+    outdated = []
+    for name in names:
+        search_pattern = "(%s)-[\d\.\w]+-[\d\w]+\s+(.)\s+[\d\.\w]+-[\d\w]+\s+" % (re.escape(name))
+        match = re.search(search_pattern, stdout)
+        if match and match.group(2) == "<":
+            outdated.append(name)
+    return outdated
 
 def upgrade_packages(module):
     if module.check_mode:
@@ -129,14 +160,20 @@ def upgrade_packages(module):
 def install_packages(module, names, state):
     upgrade = False
     uninstalled = []
+    installed = []
+    index = get_installed_packages(module)
     for name in names:
-        if not query_package(module, name):
+        if not query_package(module, name, index):
             uninstalled.append(name)
-        elif state == 'latest' and not query_latest(module, name):
-            upgrade = True
+        else:
+            installed.append(name)
+    outdated = []
+    if state == 'latest':
+        outdated = query_latest(module, installed)
+        upgrade = bool(outdated)
     if not uninstalled and not upgrade:
         module.exit_json(changed=False, msg="package(s) already installed")
-    names = " ".join(uninstalled)
+    names = " ".join(uninstalled + outdated)
     if upgrade:
         if module.check_mode:
             cmd = "%s add --upgrade --simulate %s" % (APK_PATH, names)
@@ -154,8 +191,9 @@ def install_packages(module, names, state):
 
 def remove_packages(module, names):
     installed = []
+    index = get_installed_packages(module)
     for name in names:
-        if query_package(module, name):
+        if query_package(module, name, index):
             installed.append(name)
     if not installed:
         module.exit_json(changed=False, msg="package(s) already removed")
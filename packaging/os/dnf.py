@@ -82,7 +82,31 @@ options:
     choices: ["yes", "no"]
     aliases: []
 
-notes: []
+  check_installed:
+    description:
+      - Check the installed packages before loading any repository. When
+        they already satisfy I(state) the module returns without reading
+        the repository metadata. Only applies to package names with
+        I(state) C(present) or C(absent), groups and files always load the
+        repositories.
+    required: false
+    default: "no"
+    choices: ["yes", "no"]
+    version_added: "2.1"
+
+  metadata_max_age:
+    description:
+      - Maximum age in seconds of the cached repository metadata, and of
+        the solv cache built from it, before it is downloaded again.
+        Overrides C(metadata_expire) of the configuration and of every
+        enabled repository. Defaults to the dnf configuration.
+    required: false
+    default: null
+    version_added: "2.1"
+
+notes:
+  - C(list=installed) only loads the installed packages, without reading
+    the repository metadata.
 # informational: requirements for nodes
 requirements:
   - "python >= 2.6"
@@ -114,6 +138,12 @@ EXAMPLES = '''
 - name: install the 'Development tools' package group
   dnf: name="@Development tools" state=present
 
+- name: ensure httpd is installed, without loading the repositories if it is
+  dnf: name=httpd state=present check_installed=yes
+
+- name: install httpd, reusing repository metadata up to a day old
+  dnf: name=httpd state=present metadata_max_age=86400
+
 '''
 import os
 
@@ -132,7 +162,8 @@ def _fail_if_no_dnf(module):
             msg="`python-dnf` is not installed, but it is required for the Ansible dnf module.")
 
 
-def _configure_base(module, base, conf_file, disable_gpg_check):
+def _configure_base(module, base, conf_file, disable_gpg_check,
+                    metadata_max_age=None):
     """Configure the dnf Base object."""
     conf = base.conf
 
@@ -157,8 +188,13 @@ def _configure_base(module, base, conf_file, disable_gpg_check):
     # Read the configuration file
     conf.read()
 
+    # Reuse the cached metadata up to the given age
+    if metadata_max_age is not None:
+        conf.metadata_expire = metadata_max_age
+
 
-def _specify_repositories(base, disablerepo, enablerepo):
+def _specify_repositories(base, disablerepo, enablerepo,
+                          metadata_max_age=None):
     """Enable and disable repositories matching the provided patterns."""
     base.read_all_repos()
     repos = base.repos
@@ -173,14 +209,28 @@ def _specify_repositories(base, disablerepo, enablerepo):
         for repo in repos.get_matching(repo_pattern):
             repo.enable()
 
+    # Repositories may set their own metadata expiry
+    if metadata_max_age is not None:
+        for repo in repos.iter_enabled():
+            repo.metadata_expire = metadata_max_age
 
-def _base(module, conf_file, disable_gpg_check, disablerepo, enablerepo):
-    """Return a fully configured dnf Base object."""
+
+def _base(module, conf_file, disable_gpg_check, disablerepo, enablerepo,
+          metadata_max_age=None, load_available_repos=True):
+    """Return a fully configured dnf Base object.
+
+    Only the installed packages are loaded into the sack when
+    load_available_repos is false, the repositories are not read at all.
+    """
     _fail_if_no_dnf(module)
     base = dnf.Base()
-    _configure_base(module, base, conf_file, disable_gpg_check)
-    _specify_repositories(base, disablerepo, enablerepo)
-    base.fill_sack()
+    _configure_base(
+        module, base, conf_file, disable_gpg_check, metadata_max_age)
+    if load_available_repos:
+        _specify_repositories(
+            base, disablerepo, enablerepo, metadata_max_age)
+    base.fill_sack(
+        load_system_repo=True, load_available_repos=load_available_repos)
     return base
 
 
@@ -222,7 +272,34 @@ def list_items(module, base, command):
         packages = subject.Subject(command).get_best_query(base.sack)
         results = [_package_dict(package) for package in packages]
 
-    module.exit_json(results=results)
+    module.exit_json(changed=False, results=results)
+
+
+def _installed_state_satisfied(base, state, names):
+    """Return whether the installed packages already satisfy the state.
+
+    Only package specs are checked, groups, files and the latest state need
+    the repositories.
+    """
+    if state not in ['installed', 'present', 'absent', 'removed']:
+        return False
+
+    pkg_specs, group_specs, filenames = cli.commands.parse_spec_group_file(
+        names)
+    if group_specs or filenames:
+        return False
+
+    installed = base.sack.query().installed()
+    for pkg_spec in pkg_specs:
+        if state in ['installed', 'present']:
+            query = subject.Subject(pkg_spec).get_best_query(base.sack)
+            if not query.installed():
+                return False
+        # Removal matches the package name, like ensure
+        elif installed.filter(name=pkg_spec):
+            return False
+
+    return True
 
 
 def _mark_package_install(module, base, pkg_spec):
@@ -327,24 +404,41 @@ def main():
             list=dict(),
             conf_file=dict(default=None),
             disable_gpg_check=dict(default=False, type='bool'),
+            check_installed=dict(default=False, type='bool'),
+            metadata_max_age=dict(type='int'),
         ),
         required_one_of=[['name', 'list']],
         mutually_exclusive=[['name', 'list']],
         supports_check_mode=True)
     params = module.params
     if params['list']:
+        # The installed packages do not need the repositories
         base = _base(
             module, params['conf_file'], params['disable_gpg_check'],
-            params['disablerepo'], params['enablerepo'])
+            params['disablerepo'], params['enablerepo'],
+            params['metadata_max_age'],
+            load_available_repos=params['list'] != 'installed')
         list_items(module, base, params['list'])
     else:
         # Note: base takes a long time to run so we want to check for failure
         # before running it.
         if not util.am_i_root():
             module.fail_json(msg="This command has to be run under the root user.")
+
+        if params['check_installed']:
+            base = _base(
+                module, params['conf_file'], params['disable_gpg_check'],
+                params['disablerepo'], params['enablerepo'],
+                load_available_repos=False)
+            if _installed_state_satisfied(
+                    base, params['state'], params['name']):
+                module.exit_json(msg="Nothing to do")
+            base.close()
+
         base = _base(
             module, params['conf_file'], params['disable_gpg_check'],
-            params['disablerepo'], params['enablerepo'])
+            params['disablerepo'], params['enablerepo'],
+            params['metadata_max_age'])
 
         ensure(module, base, params['state'], params['name'])
 
@@ -95,6 +95,15 @@ EXAMPLES = '''
 import os.path
 import re
 
+try:
+    import json
+except ImportError:
+    try:
+        import simplejson as json
+    except ImportError:
+        # Let snippet from module_utils/basic.py return a proper error in this case
+        pass
+
 
 # exceptions -------------------------------------------------------------- {{{
 class HomebrewException(Exception):
@@ -340,6 +349,7 @@ class Homebrew(object):
         self.changed_count = 0
         self.unchanged_count = 0
         self.message = ''
+        self._installed = None
 
     def _setup_instance_vars(self, **kwargs):
         for key, val in kwargs.iteritems():
@@ -387,6 +397,63 @@ class Homebrew(object):
 
         return (failed, changed, message)
 
+    # snapshot ----------------------------------------------------- {{{
+    def _installed_packages(self):
+        '''
+        Index of every installed formula, built from a single
+        `brew info --json=v1 --installed` call and keyed by name, full
+        (tap-qualified) name and alias.
+        '''
+
+        if self._installed is not None:
+            return self._installed
+
+        rc, out, err = self.module.run_command([
+            self.brew_path,
+            'info',
+            '--json=v1',
+            '--installed',
+        ])
+        if rc != 0:
+            self.failed = True
+            self.message = err.strip()
+            raise HomebrewException(self.message)
+
+        try:
+            formulae = json.loads(out or '[]')
+        except ValueError:
+            self.failed = True
+            self.message = 'Unable to parse brew info output.'
+            raise HomebrewException(self.message)
+
+        installed = dict()
+        for formula in formulae:
+            if not formula.get('installed'):
+                continue
+
+            names = [formula.get('name'), formula.get('full_name')]
+            names.extend(formula.get('aliases') or [])
+            for name in names:
+                if name:
+                    installed[name] = formula
+
+        self._installed = installed
+        return self._installed
+
+    def _invalidate_installed_packages(self):
+        self._installed = None
+
+    def _current_package_info(self):
+        return self._installed_packages().get(self.current_package)
+
+    def _current_package_versions(self):
+        info = self._current_package_info() or {}
+        return [
+            keg.get('version') or ''
+            for keg in info.get('installed') or []
+        ]
+    # /snapshot ---------------------------------------------------- }}}
+
     # checks ------------------------------------------------------- {{{
     def _current_package_is_installed(self):
         if not self.valid_package(self.current_package):
@@ -394,32 +461,28 @@ class Homebrew(object):
             self.message = 'Invalid package: {0}.'.format(self.current_package)
             raise HomebrewException(self.message)
 
-        cmd = [
-            "{brew_path}".format(brew_path=self.brew_path),
-            "info",
-            self.current_package,
-        ]
-        rc, out, err = self.module.run_command(cmd)
-        for line in out.split('\n'):
-            if (
-                re.search(r'Built from source', line)
-                or re.search(r'Poured from bottle', line)
-            ):
-                return True
-
-        return False
+        return self._current_package_info() is not None
 
     def _current_package_is_outdated(self):
         if not self.valid_package(self.current_package):
             return False
 
-        rc, out, err = self.module.run_command([
-            self.brew_path,
-            'outdated',
-            self.current_package,
-        ])
+        info = self._current_package_info()
+        if info is None:
+            return False
 
-        return rc != 0
+        if 'outdated' in info:
+            return bool(info['outdated'])
+
+        # older brew releases do not report `outdated`, so compare the
+        # installed kegs (without their `_N` revision) with the stable version
+        versions = self._current_package_versions()
+        if any(version.startswith('HEAD') for version in versions):
+            return False
+
+        stable = (info.get('versions') or {}).get('stable')
+        kegs = [re.sub(r'_\d+$', '', version) for version in versions]
+        return bool(stable) and stable not in kegs
 
     def _current_package_is_installed_from_head(self):
         if not Homebrew.valid_package(self.current_package):
@@ -427,18 +490,10 @@ class Homebrew(object):
         elif not self._current_package_is_installed():
             return False
 
-        rc, out, err = self.module.run_command([
-            self.brew_path,
-            'info',
-            self.current_package,
-        ])
-
-        try:
-            version_info = [line for line in out.split('\n') if line][0]
-        except IndexError:
-            return False
-
-        return version_info.split(' ')[-1] == 'HEAD'
+        return any(
+            version.startswith('HEAD')
+            for version in self._current_package_versions()
+        )
     # /checks ------------------------------------------------------ }}}
 
     # commands ----------------------------------------------------- {{{
@@ -469,6 +524,7 @@ class Homebrew(object):
             self.brew_path,
             'update',
         ])
+        self._invalidate_installed_packages()
         if rc == 0:
             if out and isinstance(out, basestring):
                 already_updated = any(
@@ -495,6 +551,7 @@ class Homebrew(object):
             self.brew_path,
             'upgrade',
         ])
+        self._invalidate_installed_packages()
         if rc == 0:
             if not out:
                 self.message = 'Homebrew packages already upgraded.'
@@ -510,101 +567,77 @@ class Homebrew(object):
             raise HomebrewException(self.message)
     # /_upgrade_all -------------------------- }}}
 
-    # installed ------------------------------ {{{
-    def _install_current_package(self):
-        if not self.valid_package(self.current_package):
-            self.failed = True
-            self.message = 'Invalid package: {0}.'.format(self.current_package)
-            raise HomebrewException(self.message)
-
-        if self._current_package_is_installed():
-            self.unchanged_count += 1
-            self.message = 'Package already installed: {0}'.format(
-                self.current_package,
-            )
-            return True
-
-        if self.module.check_mode:
-            self.changed = True
-            self.message = 'Package would be installed: {0}'.format(
-                self.current_package
-            )
-            raise HomebrewException(self.message)
-
-        if self.state == 'head':
-            head = '--HEAD'
-        else:
-            head = None
-
+    # helpers ------------------------------ {{{
+    def _brew_packages(self, command, packages, *extra):
         opts = (
-            [self.brew_path, 'install']
+            [self.brew_path, command]
             + self.install_options
-            + [self.current_package, head]
+            + packages
+            + list(extra)
         )
         cmd = [opt for opt in opts if opt]
-        rc, out, err = self.module.run_command(cmd)
+        return self.module.run_command(cmd)
+
+    def _verify_packages(self, packages, check, action, err):
+        self._invalidate_installed_packages()
+
+        for package in packages:
+            self.current_package = package
+            if not check():
+                self.failed = True
+                self.message = err.strip() or 'Package could not be {0}: {1}.'.format(
+                    action, package,
+                )
+                raise HomebrewException(self.message)
 
-        if self._current_package_is_installed():
             self.changed_count += 1
             self.changed = True
-            self.message = 'Package installed: {0}'.format(self.current_package)
-            return True
-        else:
-            self.failed = True
-            self.message = err.strip()
-            raise HomebrewException(self.message)
+            self.message = 'Package {0}: {1}'.format(action, package)
+
+        return True
+    # /helpers ----------------------------- }}}
 
+    # installed ------------------------------ {{{
     def _install_packages(self):
+        pending = []
         for package in self.packages:
             self.current_package = package
-            self._install_current_package()
-
-        return True
-    # /installed ----------------------------- }}}
-
-    # upgraded ------------------------------- {{{
-    def _upgrade_current_package(self):
-        command = 'upgrade'
-
-        if not self.valid_package(self.current_package):
-            self.failed = True
-            self.message = 'Invalid package: {0}.'.format(self.current_package)
-            raise HomebrewException(self.message)
-
-        if not self._current_package_is_installed():
-            command = 'install'
+            if self._current_package_is_installed():
+                self.unchanged_count += 1
+                self.message = 'Package already installed: {0}'.format(
+                    package,
+                )
+            else:
+                pending.append(package)
 
-        if self._current_package_is_installed() and not self._current_package_is_outdated():
-            self.message = 'Package is already upgraded: {0}'.format(
-                self.current_package,
-            )
-            self.unchanged_count += 1
+        if not pending:
             return True
 
         if self.module.check_mode:
             self.changed = True
-            self.message = 'Package would be upgraded: {0}'.format(
-                self.current_package
+            self.message = 'Package would be installed: {0}'.format(
+                ', '.join(pending)
             )
             raise HomebrewException(self.message)
 
-        opts = (
-            [self.brew_path, command]
-            + self.install_options
-            + [self.current_package]
+        if self.state == 'head':
+            head = '--HEAD'
+        else:
+            head = None
+
+        rc, out, err = self._brew_packages('install', pending, head)
+
+        return self._verify_packages(
+            pending, self._current_package_is_installed, 'installed', err,
         )
-        cmd = [opt for opt in opts if opt]
-        rc, out, err = self.module.run_command(cmd)
+    # /installed ----------------------------- }}}
 
-        if self._current_package_is_installed() and not self._current_package_is_outdated():
-            self.changed_count += 1
-            self.changed = True
-            self.message = 'Package upgraded: {0}'.format(self.current_package)
-            return True
-        else:
-            self.failed = True
-            self.message = err.strip()
-            raise HomebrewException(self.message)
+    # upgraded ------------------------------- {{{
+    def _current_package_is_upgraded(self):
+        return (
+            self._current_package_is_installed()
+            and not self._current_package_is_outdated()
+        )
 
     def _upgrade_all_packages(self):
         opts = (
@@ -613,6 +646,7 @@ class Homebrew(object):
         )
         cmd = [opt for opt in opts if opt]
         rc, out, err = self.module.run_command(cmd)
+        self._invalidate_installed_packages()
 
         if rc == 0:
             self.changed = True
@@ -625,59 +659,78 @@ class Homebrew(object):
 
     def _upgrade_packages(self):
         if not self.packages:
-            self._upgrade_all_packages()
-        else:
-            for package in self.packages:
-                self.current_package = package
-                self._upgrade_current_package()
-            return True
-    # /upgraded ------------------------------ }}}
+            return self._upgrade_all_packages()
 
-    # uninstalled ---------------------------- {{{
-    def _uninstall_current_package(self):
-        if not self.valid_package(self.current_package):
-            self.failed = True
-            self.message = 'Invalid package: {0}.'.format(self.current_package)
-            raise HomebrewException(self.message)
+        missing = []
+        outdated = []
+        for package in self.packages:
+            self.current_package = package
+            if not self._current_package_is_installed():
+                missing.append(package)
+            elif self._current_package_is_outdated():
+                outdated.append(package)
+            else:
+                self.unchanged_count += 1
+                self.message = 'Package is already upgraded: {0}'.format(
+                    package,
+                )
 
-        if not self._current_package_is_installed():
-            self.unchanged_count += 1
-            self.message = 'Package already uninstalled: {0}'.format(
-                self.current_package,
-            )
+        pending = missing + outdated
+        if not pending:
             return True
 
         if self.module.check_mode:
             self.changed = True
-            self.message = 'Package would be uninstalled: {0}'.format(
-                self.current_package
+            self.message = 'Package would be upgraded: {0}'.format(
+                ', '.join(pending)
             )
             raise HomebrewException(self.message)
 
-        opts = (
-            [self.brew_path, 'uninstall']
-            + self.install_options
-            + [self.current_package]
+        errors = []
+        if missing:
+            rc, out, err = self._brew_packages('install', missing)
+            errors.append(err.strip())
+        if outdated:
+            rc, out, err = self._brew_packages('upgrade', outdated)
+            errors.append(err.strip())
+
+        return self._verify_packages(
+            pending, self._current_package_is_upgraded, 'upgraded',
+            '\n'.join(filter(None, errors)),
         )
-        cmd = [opt for opt in opts if opt]
-        rc, out, err = self.module.run_command(cmd)
+    # /upgraded ------------------------------ }}}
 
-        if not self._current_package_is_installed():
-            self.changed_count += 1
-            self.changed = True
-            self.message = 'Package uninstalled: {0}'.format(self.current_package)
-            return True
-        else:
-            self.failed = True
-            self.message = err.strip()
-            raise HomebrewException(self.message)
+    # uninstalled ---------------------------- {{{
+    def _current_package_is_uninstalled(self):
+        return not self._current_package_is_installed()
 
     def _uninstall_packages(self):
+        pending = []
         for package in self.packages:
             self.current_package = package
-            self._uninstall_current_package()
+            if self._current_package_is_installed():
+                pending.append(package)
+            else:
+                self.unchanged_count += 1
+                self.message = 'Package already uninstalled: {0}'.format(
+                    package,
+                )
 
-        return True
+        if not pending:
+            return True
+
+        if self.module.check_mode:
+            self.changed = True
+            self.message = 'Package would be uninstalled: {0}'.format(
+                ', '.join(pending)
+            )
+            raise HomebrewException(self.message)
+
+        rc, out, err = self._brew_packages('uninstall', pending)
+
+        return self._verify_packages(
+            pending, self._current_package_is_uninstalled, 'uninstalled', err,
+        )
     # /uninstalled ----------------------------- }}}
 
     # linked --------------------------------- {{{
@@ -265,6 +265,7 @@ class HomebrewCask(object):
         self.changed_count = 0
         self.unchanged_count = 0
         self.message = ''
+        self._installed = None
 
     def _setup_instance_vars(self, **kwargs):
         for key, val in kwargs.iteritems():
@@ -318,24 +319,35 @@ class HomebrewCask(object):
         return (failed, changed, message)
 
     # checks ------------------------------------------------------- {{{
-    def _current_cask_is_installed(self):
-        if not self.valid_cask(self.current_cask):
-            self.failed = True
-            self.message = 'Invalid cask: {0}.'.format(self.current_cask)
-            raise HomebrewCaskException(self.message)
+    def _installed_casks(self):
+        '''Set of installed casks, read once from `brew cask list`.'''
+
+        if self._installed is not None:
+            return self._installed
 
         cmd = [self.brew_path, 'cask', 'list']
         rc, out, err = self.module.run_command(cmd, path_prefix=self.path[0])
 
         if 'nothing to list' in err:
-            return False
+            self._installed = set()
         elif rc == 0:
-            casks = [cask_.strip() for cask_ in out.split('\n') if cask_.strip()]
-            return self.current_cask in casks
+            self._installed = set(
+                cask_.strip() for cask_ in out.split() if cask_.strip()
+            )
         else:
             self.failed = True
             self.message = err.strip()
             raise HomebrewCaskException(self.message)
+
+        return self._installed
+
+    def _current_cask_is_installed(self):
+        if not self.valid_cask(self.current_cask):
+            self.failed = True
+            self.message = 'Invalid cask: {0}.'.format(self.current_cask)
+            raise HomebrewCaskException(self.message)
+
+        return self.current_cask in self._installed_casks()
     # /checks ------------------------------------------------------ }}}
 
     # commands ----------------------------------------------------- {{{
@@ -374,94 +386,81 @@ class HomebrewCask(object):
             raise HomebrewCaskException(self.message)
     # /updated ------------------------------- }}}
 
+    # helpers ------------------------------ {{{
+    def _cask_command(self, command, casks):
+        cmd = [self.brew_path, 'cask', command] + casks
+        rc, out, err = self.module.run_command(cmd, path_prefix=self.path[0])
+        self._installed = None
+
+        return rc, out, err
+
+    def _verify_casks(self, casks, installed, action, err):
+        for cask in casks:
+            self.current_cask = cask
+            if self._current_cask_is_installed() != installed:
+                self.failed = True
+                self.message = err.strip() or 'Cask could not be {0}: {1}.'.format(
+                    action, cask,
+                )
+                raise HomebrewCaskException(self.message)
+
+            self.changed_count += 1
+            self.changed = True
+            self.message = 'Cask {0}: {1}'.format(action, cask)
+
+        return True
+    # /helpers ----------------------------- }}}
+
     # installed ------------------------------ {{{
-    def _install_current_cask(self):
-        if not self.valid_cask(self.current_cask):
-            self.failed = True
-            self.message = 'Invalid cask: {0}.'.format(self.current_cask)
-            raise HomebrewCaskException(self.message)
+    def _install_casks(self):
+        pending = []
+        for cask in self.casks:
+            self.current_cask = cask
+            if self._current_cask_is_installed():
+                self.unchanged_count += 1
+                self.message = 'Cask already installed: {0}'.format(cask)
+            else:
+                pending.append(cask)
 
-        if self._current_cask_is_installed():
-            self.unchanged_count += 1
-            self.message = 'Cask already installed: {0}'.format(
-                self.current_cask,
-            )
+        if not pending:
             return True
 
         if self.module.check_mode:
             self.changed = True
             self.message = 'Cask would be installed: {0}'.format(
-                self.current_cask
+                ', '.join(pending)
             )
             raise HomebrewCaskException(self.message)
 
-        cmd = [opt
-               for opt in (self.brew_path, 'cask', 'install', self.current_cask)
-               if opt]
-
-        rc, out, err = self.module.run_command(cmd, path_prefix=self.path[0])
+        rc, out, err = self._cask_command('install', pending)
 
-        if self._current_cask_is_installed():
-            self.changed_count += 1
-            self.changed = True
-            self.message = 'Cask installed: {0}'.format(self.current_cask)
-            return True
-        else:
-            self.failed = True
-            self.message = err.strip()
-            raise HomebrewCaskException(self.message)
-
-    def _install_casks(self):
-        for cask in self.casks:
-            self.current_cask = cask
-            self._install_current_cask()
-
-        return True
+        return self._verify_casks(pending, True, 'installed', err)
     # /installed ----------------------------- }}}
 
     # uninstalled ---------------------------- {{{
-    def _uninstall_current_cask(self):
-        if not self.valid_cask(self.current_cask):
-            self.failed = True
-            self.message = 'Invalid cask: {0}.'.format(self.current_cask)
-            raise HomebrewCaskException(self.message)
+    def _uninstall_casks(self):
+        pending = []
+        for cask in self.casks:
+            self.current_cask = cask
+            if self._current_cask_is_installed():
+                pending.append(cask)
+            else:
+                self.unchanged_count += 1
+                self.message = 'Cask already uninstalled: {0}'.format(cask)
 
-        if not self._current_cask_is_installed():
-            self.unchanged_count += 1
-            self.message = 'Cask already uninstalled: {0}'.format(
-                self.current_cask,
-            )
+        if not pending:
             return True
 
         if self.module.check_mode:
             self.changed = True
             self.message = 'Cask would be uninstalled: {0}'.format(
-                self.current_cask
+                ', '.join(pending)
             )
             raise HomebrewCaskException(self.message)
 
-        cmd = [opt
-               for opt in (self.brew_path, 'cask', 'uninstall', self.current_cask)
-               if opt]
-
-        rc, out, err = self.module.run_command(cmd, path_prefix=self.path[0])
-
-        if not self._current_cask_is_installed():
-            self.changed_count += 1
-            self.changed = True
-            self.message = 'Cask uninstalled: {0}'.format(self.current_cask)
-            return True
-        else:
-            self.failed = True
-            self.message = err.strip()
-            raise HomebrewCaskException(self.message)
-
-    def _uninstall_casks(self):
-        for cask in self.casks:
-            self.current_cask = cask
-            self._uninstall_current_cask()
+        rc, out, err = self._cask_command('uninstall', pending)
 
-        return True
+        return self._verify_casks(pending, False, 'uninstalled', err)
     # /uninstalled ----------------------------- }}}
     # /commands ---------------------------------------------------- }}}
 
@@ -59,7 +59,8 @@ EXAMPLES = '''
 - opkg: name=foo state=present force=overwrite
 '''
 
-import pipes
+# Locations of the opkg status file, which lists the installed packages
+OPKG_STATUS_FILES = ['/usr/lib/opkg/status', '/var/lib/opkg/status']
 
 def update_package_db(module, opkg_path):
     """ Updates packages list. """
@@ -70,16 +71,59 @@ def update_package_db(module, opkg_path):
         module.fail_json(msg="could not update package db")
 
 
-def query_package(module, opkg_path, name, state="present"):
+def get_installed_packages(module, opkg_path):
+    """ Returns a dict of installed package names and versions.
+
+    The opkg status file is read when it can be found, otherwise the
+    packages are listed by a single opkg list-installed. """
+
+    for status_file in OPKG_STATUS_FILES:
+        try:
+            f = open(status_file)
+        except IOError:
+            continue
+
+        packages = {}
+        name = version = None
+        try:
+            # records are separated by blank lines; removed packages are kept
+            # with a status other than "installed"
+            for line in f:
+                if line.startswith('Package:'):
+                    name = line.split(':', 1)[1].strip()
+                elif line.startswith('Version:'):
+                    version = line.split(':', 1)[1].strip()
+                elif line.startswith('Status:'):
+                    if name and line.split()[-1] == 'installed':
+                        packages[name] = version
+                elif not line.strip():
+                    name = version = None
+        finally:
+            f.close()
+        return packages
+
+    rc, out, err = module.run_command("%s list-installed" % opkg_path)
+    if rc != 0:
+        module.fail_json(msg="could not list installed packages", stderr=err)
+
+    packages = {}
+    for line in out.splitlines():
+        # name - version
+        fields = line.split(' - ')
+        if len(fields) >= 2:
+            packages[fields[0]] = fields[1]
+    return packages
+
+
+def query_package(module, opkg_path, name, state="present", installed=None):
     """ Returns whether a package is installed or not. """
 
     if state == "present":
 
-        rc, out, err = module.run_command("%s list-installed | grep -q \"^%s \"" % (pipes.quote(opkg_path), pipes.quote(name)), use_unsafe_shell=True)
-        if rc == 0:
-            return True
+        if installed is None:
+            installed = get_installed_packages(module, opkg_path)
 
-        return False
+        return name in installed
 
 
 def remove_packages(module, opkg_path, packages):
@@ -90,23 +134,20 @@ def remove_packages(module, opkg_path, packages):
     if force:
         force = "--force-%s" % force
 
-    remove_c = 0
-    # Using a for loop incase of error, we can report the package that failed
-    for package in packages:
-        # Query the package first, to see if we even need to remove
-        if not query_package(module, opkg_path, package):
-            continue
-
-        rc, out, err = module.run_command("%s remove %s %s" % (opkg_path, force, package))
-
-        if query_package(module, opkg_path, package):
-            module.fail_json(msg="failed to remove %s: %s" % (package, out))
+    # Query the packages first, to see if we even need to remove
+    installed = get_installed_packages(module, opkg_path)
+    to_remove = [package for package in packages if query_package(module, opkg_path, package, installed=installed)]
 
-        remove_c += 1
+    if to_remove:
+        rc, out, err = module.run_command("%s remove %s %s" % (opkg_path, force, " ".join(to_remove)))
 
-    if remove_c > 0:
+        # Report the packages which failed
+        installed = get_installed_packages(module, opkg_path)
+        failed = [package for package in to_remove if query_package(module, opkg_path, package, installed=installed)]
+        if failed:
+            module.fail_json(msg="failed to remove %s: %s" % (" ".join(failed), out))
 
-        module.exit_json(changed=True, msg="removed %s package(s)" % remove_c)
+        module.exit_json(changed=True, msg="removed %s package(s)" % len(to_remove))
 
     module.exit_json(changed=False, msg="package(s) already absent")
 
@@ -119,21 +160,19 @@ def install_packages(module, opkg_path, packages):
     if force:
         force = "--force-%s" % force
 
-    install_c = 0
-
-    for package in packages:
-        if query_package(module, opkg_path, package):
-            continue
-
-        rc, out, err = module.run_command("%s install %s %s" % (opkg_path, force, package))
+    installed = get_installed_packages(module, opkg_path)
+    to_install = [package for package in packages if not query_package(module, opkg_path, package, installed=installed)]
 
-        if not query_package(module, opkg_path, package):
-            module.fail_json(msg="failed to install %s: %s" % (package, out))
+    if to_install:
+        rc, out, err = module.run_command("%s install %s %s" % (opkg_path, force, " ".join(to_install)))
 
-        install_c += 1
+        # Report the packages which failed
+        installed = get_installed_packages(module, opkg_path)
+        failed = [package for package in to_install if not query_package(module, opkg_path, package, installed=installed)]
+        if failed:
+            module.fail_json(msg="failed to install %s: %s" % (" ".join(failed), out))
 
-    if install_c > 0:
-        module.exit_json(changed=True, msg="installed %s package(s)" % (install_c))
+        module.exit_json(changed=True, msg="installed %s package(s)" % len(to_install))
 
     module.exit_json(changed=False, msg="package(s) already present")
 
@@ -114,38 +114,53 @@ import os
 import re
 import sys
 
-def get_version(pacman_output):
-    """Take pacman -Qi or pacman -Si output and get the Version"""
-    lines = pacman_output.split('\n')
-    for line in lines:
-        if 'Version' in line:
-            return line.split(':')[1].strip()
-    return None
-
-def query_package(module, pacman_path, name, state="present"):
-    """Query the package status in both the local system and the repository. Returns a boolean to indicate if the package is installed, a second boolean to indicate if the package is up-to-date and a third boolean to indicate whether online information were available"""
-    if state == "present":
-        lcmd = "%s -Qi %s" % (pacman_path, name)
-        lrc, lstdout, lstderr = module.run_command(lcmd, check_rc=False)
-        if lrc != 0:
-            # package is not installed locally
-            return False, False, False
-
-        # get the version installed locally (if any)
-        lversion = get_version(lstdout)
-
-        rcmd = "%s -Si %s" % (pacman_path, name)
-        rrc, rstdout, rstderr = module.run_command(rcmd, check_rc=False)
-        # get the version in the repository
-        rversion = get_version(rstdout)
-
-        if rrc == 0:
-            # Return True to indicate that the package is installed locally, and the result of the version number comparison
-            # to determine if the package is up-to-date.
-            return True, (lversion == rversion), False
-        
+def get_installed_packages(module, pacman_path):
+    """Return a dict of the locally installed packages and their versions, from a single pacman -Q"""
+    cmd = "%s -Q" % (pacman_path)
+    rc, stdout, stderr = module.run_command(cmd, check_rc=False)
+    if rc != 0:
+        module.fail_json(msg="could not list installed packages", stderr=stderr)
+
+    installed = {}
+    for line in stdout.splitlines():
+        fields = line.split()
+        if len(fields) >= 2:
+            installed[fields[0]] = fields[1]
+    return installed
+
+def get_sync_packages(module, pacman_path):
+    """Return a dict of the packages in the sync databases and their versions, from a single pacman -Sl"""
+    cmd = "%s -Sl" % (pacman_path)
+    rc, stdout, stderr = module.run_command(cmd, check_rc=False)
+    if rc != 0:
+        module.fail_json(msg="could not list repository packages", stderr=stderr)
+
+    available = {}
+    for line in stdout.splitlines():
+        # repository name version [installed]
+        fields = line.split()
+        if len(fields) < 3:
+            continue
+        # repositories are listed by priority, the first one wins
+        if fields[1] not in available:
+            available[fields[1]] = fields[2]
+        available.setdefault('%s/%s' % (fields[0], fields[1]), fields[2])
+    return available
+
+def query_package(name, installed, available=None):
+    """Query the package status in both the local system and the repository, as returned by get_installed_packages and get_sync_packages. Returns a boolean to indicate if the package is installed, a second boolean to indicate if the package is up-to-date and a third boolean to indicate whether online information were available"""
+    lversion = installed.get(name.split('/')[-1])
+    if lversion is None:
+        # package is not installed locally
+        return False, False, False
+
+    if available is not None and name in available:
+        # Return True to indicate that the package is installed locally, and the result of the version number comparison
+        # to determine if the package is up-to-date.
+        return True, (lversion == available[name]), False
+
     # package is installed but cannot fetch remote Version. Last True stands for the error
-        return True, True, True
+    return True, True, True
 
 
 def update_package_db(module, pacman_path):
@@ -175,81 +190,88 @@ def upgrade(module, pacman_path):
         module.exit_json(changed=False, msg='Nothing to upgrade')
 
 def remove_packages(module, pacman_path, packages):
+    args = "R"
     if module.params["recurse"]:
-        args = "Rs"
-    else:
-        args = "R"
-
-def remove_packages(module, pacman_path, packages):
+        args += "s"
     if module.params["force"]:
-        args = "Rdd"
-    else:
-        args = "R"
+        args += "dd"
 
-    remove_c = 0
-    # Using a for loop incase of error, we can report the package that failed
+    # Query the packages first, to see if we even need to remove
+    installed = get_installed_packages(module, pacman_path)
+    to_remove = []
     for package in packages:
-        # Query the package first, to see if we even need to remove
-        installed, updated, unknown = query_package(module, pacman_path, package)
-        if not installed:
-            continue
+        if query_package(package, installed)[0]:
+            to_remove.append(package)
 
-        cmd = "%s -%s %s --noconfirm" % (pacman_path, args, package)
+    if to_remove:
+        cmd = "%s -%s --noconfirm %s" % (pacman_path, args, " ".join(to_remove))
         rc, stdout, stderr = module.run_command(cmd, check_rc=False)
 
         if rc != 0:
-            module.fail_json(msg="failed to remove %s" % (package))
-
-        remove_c += 1
+            module.fail_json(msg="failed to remove %s" % (" ".join(to_remove)), stdout=stdout, stderr=stderr)
 
-    if remove_c > 0:
-
-        module.exit_json(changed=True, msg="removed %s package(s)" % remove_c)
+        module.exit_json(changed=True, msg="removed %s package(s)" % len(to_remove))
 
     module.exit_json(changed=False, msg="package(s) already absent")
 
 
 def install_packages(module, pacman_path, state, packages, package_files):
-    install_c = 0
     package_err = []
     message = ""
 
+    installed = get_installed_packages(module, pacman_path)
+    available = None
+    if state == 'latest':
+        available = get_sync_packages(module, pacman_path)
+
+    to_install = []
+    to_install_files = []
     for i, package in enumerate(packages):
         # if the package is installed and state == present or state == latest and is up-to-date then skip
-        installed, updated, latestError = query_package(module, pacman_path, package)
+        is_installed, updated, latestError = query_package(package, installed, available)
         if latestError and state == 'latest':
             package_err.append(package)
-            
-        if installed and (state == 'present' or (state == 'latest' and updated)):
+
+        if is_installed and (state == 'present' or (state == 'latest' and updated)):
             continue
 
         if package_files[i]:
-            params = '-U %s' % package_files[i]
+            to_install_files.append(package_files[i])
         else:
-            params = '-S %s' % package
+            to_install.append(package)
+
+    # Install everything in one transaction per source, repositories and files
+    for params, targets in (('-S', to_install), ('-U', to_install_files)):
+        if not targets:
+            continue
 
-        cmd = "%s %s --noconfirm" % (pacman_path, params)
+        cmd = "%s %s --noconfirm %s" % (pacman_path, params, " ".join(targets))
         rc, stdout, stderr = module.run_command(cmd, check_rc=False)
 
         if rc != 0:
-            module.fail_json(msg="failed to install %s" % (package))
+            module.fail_json(msg="failed to install %s" % (" ".join(targets)), stdout=stdout, stderr=stderr)
+
+    install_c = len(to_install) + len(to_install_files)
 
-        install_c += 1
-    
     if state == 'latest' and len(package_err) > 0:
         message = "But could not ensure 'latest' state for %s package(s) as remote version could not be fetched." % (package_err)
-    
+
     if install_c > 0:
         module.exit_json(changed=True, msg="installed %s package(s). %s" % (install_c, message))
-        
+
     module.exit_json(changed=False, msg="package(s) already installed. %s" % (message))
-    
+
 def check_packages(module, pacman_path, packages, state):
     would_be_changed = []
+    installed = get_installed_packages(module, pacman_path)
+    available = None
+    if state == 'latest':
+        available = get_sync_packages(module, pacman_path)
+
     for package in packages:
-        installed, updated, unknown = query_package(module, pacman_path, package)
-        if ((state in ["present", "latest"] and not installed) or
-                (state == "absent" and installed) or
+        is_installed, updated, unknown = query_package(package, installed, available)
+        if ((state in ["present", "latest"] and not is_installed) or
+                (state == "absent" and is_installed) or
                 (state == "latest" and not updated)):
             would_be_changed.append(package)
     if would_be_changed:
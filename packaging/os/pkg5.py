@@ -61,6 +61,8 @@ EXAMPLES = '''
       - /text/gnu-grep
 '''
 
+import fnmatch
+
 
 def main():
     module = AnsibleModule(
@@ -113,17 +115,26 @@ def ensure(module, state, packages, params):
         'results': [],
         'msg': '',
     }
+    # Query the state of every package at once
+    installed = list_installed(module, packages)
+    upgradable = []
+    if state == 'latest':
+        upgradable = list_installed(module, packages, upgradable=True)
+
     behaviour = {
         'present': {
-            'filter': lambda p: not is_installed(module, p),
+            'filter': lambda p: not is_installed(module, p, installed),
             'subcommand': 'install',
         },
         'latest': {
-            'filter': lambda p: not is_latest(module, p),
+            'filter': lambda p: (
+                not is_installed(module, p, installed)
+                or not is_latest(module, p, upgradable)
+            ),
             'subcommand': 'install',
         },
         'absent': {
-            'filter': lambda p: is_installed(module, p),
+            'filter': lambda p: is_installed(module, p, installed),
             'subcommand': 'uninstall',
         },
     }
@@ -154,12 +165,57 @@ def ensure(module, state, packages, params):
     module.exit_json(**response)
 
 
-def is_installed(module, package):
+def list_installed(module, packages, upgradable=False):
+    """Return the stems of the installed packages matching any of packages,
+    from a single pkg list. With upgradable, only those having a newer
+    version available."""
+    command = ['pkg', 'list', '-H', '-v']
+    if upgradable:
+        command.append('-u')
+    rc, out, err = module.run_command(command + ['--'] + packages)
+    # pkg list fails when any package is not installed, but still lists the
+    # others
+    return [fmri_stem(line.split()[0]) for line in out.splitlines() if line]
+
+
+def fmri_stem(fmri):
+    """Return the package name of an FMRI, without scheme, publisher and
+    version."""
+    if fmri.startswith('pkg://'):
+        fmri = '/' + fmri[len('pkg://'):].split('/', 1)[-1]
+    elif fmri.startswith('pkg:/'):
+        fmri = fmri[len('pkg:'):]
+    return fmri.split('@')[0]
+
+
+def matches(package, stems):
+    """Return whether the package pattern matches any of the stems, like the
+    pkg command does."""
+    pattern = fmri_stem(package)
+    for stem in stems:
+        stem = stem.lstrip('/')
+        if pattern.startswith('/'):
+            if fnmatch.fnmatchcase(stem, pattern[1:]):
+                return True
+        elif (
+            fnmatch.fnmatchcase(stem, pattern)
+            or fnmatch.fnmatchcase(stem, '*/' + pattern)
+        ):
+            return True
+    return False
+
+
+def is_installed(module, package, installed=None):
+    # Versioned packages are checked by pkg itself
+    if installed is not None and '@' not in package:
+        return matches(package, installed)
     rc, out, err = module.run_command(['pkg', 'list', '--', package])
     return not bool(int(rc))
 
 
-def is_latest(module, package):
+def is_latest(module, package, upgradable=None):
+    if upgradable is not None and '@' not in package:
+        return not matches(package, upgradable)
     rc, out, err = module.run_command(['pkg', 'list', '-u', '--', package])
     return bool(int(rc))
 
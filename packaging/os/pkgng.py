@@ -85,12 +85,58 @@ EXAMPLES = '''
 '''
 
 
+import fnmatch
 import shlex
 import os
 import re
 import sys
 
-def query_package(module, pkgng_path, name, rootdir_arg):
+try:
+    import sqlite3
+    HAS_SQLITE3 = True
+except ImportError:
+    HAS_SQLITE3 = False
+
+def get_installed_packages(module, pkgng_path, rootdir_arg):
+    """Return a dict of installed package names and versions.
+
+    The local package database is read directly when it is available,
+    otherwise the packages are listed by a single pkg query."""
+
+    if HAS_SQLITE3:
+        dbdir = os.environ.get('PKG_DBDIR', '/var/db/pkg')
+        if module.params['rootdir']:
+            dbdir = os.path.join(module.params['rootdir'], dbdir.lstrip('/'))
+        dbpath = os.path.join(dbdir, 'local.sqlite')
+        if os.access(dbpath, os.R_OK):
+            try:
+                conn = sqlite3.connect(dbpath)
+                try:
+                    return dict(conn.execute('SELECT name, version FROM packages').fetchall())
+                finally:
+                    conn.close()
+            except sqlite3.Error:
+                pass
+
+    rc, out, err = module.run_command("%s %s query -a '%%n %%v'" % (pkgng_path, rootdir_arg))
+    if rc != 0:
+        module.fail_json(msg="could not list installed packages", stderr=err)
+
+    packages = {}
+    for line in out.splitlines():
+        fields = line.split()
+        if len(fields) == 2:
+            packages[fields[0]] = fields[1]
+    return packages
+
+def query_package(module, pkgng_path, name, rootdir_arg, installed=None):
+
+    if installed is not None:
+        # like pkg info -g, match the name or name-version as a glob
+        for pkgname, version in installed.items():
+            if fnmatch.fnmatchcase(pkgname, name) or fnmatch.fnmatchcase('%s-%s' % (pkgname, version), name):
+                return True
+        return False
 
     rc, out, err = module.run_command("%s %s info -g -e %s" % (pkgng_path, rootdir_arg, name))
 
@@ -117,33 +163,29 @@ def pkgng_older_than(module, pkgng_path, compare_version):
 
 
 def remove_packages(module, pkgng_path, packages, rootdir_arg):
-    
-    remove_c = 0
-    # Using a for loop incase of error, we can report the package that failed
-    for package in packages:
-        # Query the package first, to see if we even need to remove
-        if not query_package(module, pkgng_path, package, rootdir_arg):
-            continue
 
-        if not module.check_mode:
-            rc, out, err = module.run_command("%s %s delete -y %s" % (pkgng_path, rootdir_arg, package))
+    # Query the packages first, to see if we even need to remove
+    installed = get_installed_packages(module, pkgng_path, rootdir_arg)
+    to_remove = [package for package in packages if query_package(module, pkgng_path, package, rootdir_arg, installed)]
 
-        if not module.check_mode and query_package(module, pkgng_path, package, rootdir_arg):
-            module.fail_json(msg="failed to remove %s: %s" % (package, out))
-    
-        remove_c += 1
+    if to_remove and not module.check_mode:
+        rc, out, err = module.run_command("%s %s delete -y %s" % (pkgng_path, rootdir_arg, " ".join(to_remove)))
+
+        # Report the packages which failed
+        installed = get_installed_packages(module, pkgng_path, rootdir_arg)
+        failed = [package for package in to_remove if query_package(module, pkgng_path, package, rootdir_arg, installed)]
+        if failed:
+            module.fail_json(msg="failed to remove %s: %s" % (" ".join(failed), out))
 
-    if remove_c > 0:
+    if to_remove:
 
-        return (True, "removed %s package(s)" % remove_c)
+        return (True, "removed %s package(s)" % len(to_remove))
 
     return (False, "package(s) already absent")
 
 
 def install_packages(module, pkgng_path, packages, cached, pkgsite, rootdir_arg):
 
-    install_c = 0
-
     # as of pkg-1.1.4, PACKAGESITE is deprecated in favor of repository definitions
     # in /usr/local/etc/pkg/repos
     old_pkgng = pkgng_older_than(module, pkgng_path, [1, 1, 4])
@@ -164,21 +206,24 @@ def install_packages(module, pkgng_path, packages, cached, pkgsite, rootdir_arg)
         if rc != 0:
             module.fail_json(msg="Could not update catalogue")
 
-    for package in packages:
-        if query_package(module, pkgng_path, package, rootdir_arg):
-            continue
+    installed = get_installed_packages(module, pkgng_path, rootdir_arg)
+    to_install = [package for package in packages if not query_package(module, pkgng_path, package, rootdir_arg, installed)]
 
-        if not module.check_mode:
-            if old_pkgng:
-                rc, out, err = module.run_command("%s %s %s install -g -U -y %s" % (batch_var, pkgsite, pkgng_path, package))
-            else:
-                rc, out, err = module.run_command("%s %s %s install %s -g -U -y %s" % (batch_var, pkgng_path, rootdir_arg, pkgsite, package))
+    if to_install and not module.check_mode:
+        names = " ".join(to_install)
+        if old_pkgng:
+            rc, out, err = module.run_command("%s %s %s install -g -U -y %s" % (batch_var, pkgsite, pkgng_path, names))
+        else:
+            rc, out, err = module.run_command("%s %s %s install %s -g -U -y %s" % (batch_var, pkgng_path, rootdir_arg, pkgsite, names))
 
-        if not module.check_mode and not query_package(module, pkgng_path, package, rootdir_arg):
-            module.fail_json(msg="failed to install %s: %s" % (package, out), stderr=err)
+        # Report the packages which failed
+        installed = get_installed_packages(module, pkgng_path, rootdir_arg)
+        failed = [package for package in to_install if not query_package(module, pkgng_path, package, rootdir_arg, installed)]
+        if failed:
+            module.fail_json(msg="failed to install %s: %s" % (" ".join(failed), out), stderr=err)
+
+    install_c = len(to_install)
 
-        install_c += 1
-    
     if install_c > 0:
         return (True, "added %s package(s)" % (install_c))
 